@@ -6,7 +6,16 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 class Settings(BaseSettings):
     openai_api_key: str | None = None
     openai_model: str = "gpt-4o-mini"
+    openai_base_url: str = ""
+    openai_timeout_seconds: float = 60.0
+    openai_connect_timeout_seconds: float = 10.0
+    openai_max_retries: int = 2
+    openai_max_connections: int = 20
+    openai_max_keepalive_connections: int = 10
+    openai_keepalive_expiry_seconds: float = 60.0
     recognize_ensemble_passes: int = 3
+    recognize_adaptive_ensemble: bool = True
+    recognize_speculative_ensemble: bool = False
     image_ttl_hours: int = 24
     gcp_project: str | None = None
     gcs_bucket_name: str | None = None
@@ -17,6 +26,32 @@ class Settings(BaseSettings):
     cors_origins: str = ""
     max_image_bytes: int = 10 * 1024 * 1024
     anonymous_recognition_requests_per_minute: int = 20
+    rate_limit_max_keys: int = 10000
+    rate_limit_shared_path: str = ""
+    recognition_executor_workers: int = 4
+    recognition_executor_max_queue: int = 8
+    tflite_interpreter_pool_size: int = 2
+    tflite_use_int8: bool = True
+    segmentation_backend: str = "connected_components"
+    segmentation_max_side: int = 1600
+    segmentation_refine_pitch: bool = True
+    recognition_process_workers: int = 0
+    decode_target_tile_px: int = 112
+    recognition_cache_max_entries: int = 256
+    recognition_cache_max_bytes: int = 16 * 1024 * 1024
+    recognition_cache_ttl_seconds: int = 3600
+    local_top_k: int = 3
+    local_top_k_cumulative: float = 0.95
+    hybrid_remote_fallback: bool = True
+    hybrid_max_ambiguous_slots: int = 6
+    remote_pass_workers: int = 6
+    remote_pass_timeout_seconds: float = 60.0
+    remote_jpeg_quality: int = 85
+    remote_recognition_cache_path: str = ""
+    remote_recognition_cache_max_bytes: int = 64 * 1024 * 1024
+    model_refresh_source: str = ""
+    model_refresh_interval_seconds: int = 300
+    model_download_dir: str = "data/models"
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
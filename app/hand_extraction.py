@@ -1,18 +1,37 @@
 from __future__ import annotations
 
 import base64
+import contextvars
 import json
+import time
+from concurrent.futures import FIRST_COMPLETED, CancelledError, Future, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 from io import BytesIO
-from typing import Any, Callable
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Callable
 
+import numpy as np
 from openai import OpenAI
 from PIL import Image, ImageEnhance, ImageOps
 
 from app.config import settings
-from app.recognition_postprocess import DEFAULT_POLICY, merge_slot_estimates, pick_winning_tiles, slot_options
+from app.openai_client import get_openai_client
+from app.recognition_cache import pixel_digest, recognition_cache
+from app.recognition_metrics import recognition_metrics, timed_stage
+from app.recognition_postprocess import (
+    DEFAULT_POLICY,
+    RecognitionPolicy,
+    merge_slot_estimates,
+    pick_winning_tiles,
+    slot_options,
+)
+from app.remote_response_cache import get_remote_response_cache, response_key
 from app.schemas import HandInput
 from app.validators import validate_tile
 
+if TYPE_CHECKING:
+    from app.tile_recognizer_local import LocalRecognition
+
 
 SYSTEM_PROMPT = """You are a mahjong tile recognizer.
 Return JSON only.
@@ -21,6 +40,29 @@ Use tile codes: 1m-9m,1p-9p,1s-9s,E,S,W,N,P,F,C,5mr,5pr,5sr.
 For each slot, return top and up to 3 candidates with confidence [0,1]."""
 
 
+MOSAIC_PROMPT = """You are a mahjong tile recognizer.
+Return JSON only.
+The image is a strip of {count} separate mahjong tiles, left to right, divided by dark gaps.
+Use tile codes: 1m-9m,1p-9p,1s-9s,E,S,W,N,P,F,C,5mr,5pr,5sr.
+Return exactly {count} slots in strip order; for each, return top and up to 3 candidates with confidence [0,1]."""
+
+_USER_PROMPT = "Return strict JSON with keys: tiles_count, slots, warnings."
+
+_VISION_MAX_SIDE = 2048
+_VISION_SHORT_SIDE = 768
+_MOSAIC_TILE_HEIGHT = 192
+_MOSAIC_GAP = 16
+_MOSAIC_GAP_COLOR = (40, 40, 40)
+# Remote answers for the ambiguous slots outweigh the local classifier,
+# which is what found them ambiguous in the first place.
+_HYBRID_REMOTE_WEIGHT = 2.0
+
+
+_CANCEL_POLL_SECONDS = 0.1
+_remote_executor: ThreadPoolExecutor | None = None
+_remote_executor_lock = Lock()
+
+
 class RecognitionCancelledError(Exception):
     pass
 
@@ -55,25 +97,25 @@ def _parse_payload(output_text: str) -> dict[str, Any]:
     return payload
 
 
-def _jpeg_bytes(image: Image.Image) -> bytes:
+def _jpeg_bytes(image: Image.Image, quality: int = 95) -> bytes:
     buf = BytesIO()
-    image.convert("RGB").save(buf, format="JPEG", quality=95)
+    image.convert("RGB").save(buf, format="JPEG", quality=quality)
     return buf.getvalue()
 
 
+_FALLBACK_TILES = ["1m", "2m", "3m", "4p", "5p", "6p", "7s", "8s", "9s", "E", "E", "E", "2p", "2p"]
+_FALLBACK_CONFIDENCES = [0.55, 0.25, 0.20]
+_FALLBACK_WARNING_MARKERS = ("fallback result is used", "fallback was used")
+
+
 def _fallback_result(extra_warnings: list[str] | None = None, include_missing_api_key_warning: bool = True) -> dict[str, Any]:
-    tiles = ["1m", "2m", "3m", "4p", "5p", "6p", "7s", "8s", "9s", "E", "E", "E", "2p", "2p"]
     slots = []
-    for idx, tile in enumerate(tiles):
+    for idx, tile in enumerate(_FALLBACK_TILES):
         slots.append(
             {
                 "index": idx,
                 "top": tile,
-                "candidates": [
-                    {"tile": tile, "confidence": 0.55},
-                    {"tile": tile, "confidence": 0.25},
-                    {"tile": tile, "confidence": 0.20},
-                ],
+                "candidates": [{"tile": tile, "confidence": conf} for conf in _FALLBACK_CONFIDENCES],
                 "ambiguous": True,
             }
         )
@@ -85,6 +127,19 @@ def _fallback_result(extra_warnings: list[str] | None = None, include_missing_ap
     return {"tiles_count": 14, "slots": slots, "warnings": warnings}
 
 
+def is_fallback_result(result: dict[str, Any] | None) -> bool:
+    """Whether `result` is _fallback_result's placeholder hand rather than a
+    recognition: by its warnings, or by its fixed tiles and confidences."""
+    if not result:
+        return False
+    if any(marker in str(w) for w in result.get("warnings", []) for marker in _FALLBACK_WARNING_MARKERS):
+        return True
+    slots = result.get("slots") or []
+    return [slot.get("top") for slot in slots] == _FALLBACK_TILES and all(
+        [c.get("confidence") for c in slot.get("candidates", [])] == _FALLBACK_CONFIDENCES for slot in slots
+    )
+
+
 def _coerce_slots(raw_slots: Any) -> list[Any]:
     if isinstance(raw_slots, str):
         raw_slots = json.loads(raw_slots)
@@ -152,24 +207,66 @@ def _pick_winning_tiles(slots: list[dict[str, Any]], beam_width: int = 512) -> l
     return pick_winning_tiles(slots, policy=DEFAULT_POLICY)
 
 
-def _image_variants(image_bytes: bytes) -> list[tuple[str, bytes, float]]:
-    with Image.open(BytesIO(image_bytes)) as img:
-        rgb = img.convert("RGB")
-        variants = [
-            ("orig", _jpeg_bytes(rgb), 1.0),
-            ("autocontrast", _jpeg_bytes(ImageOps.autocontrast(rgb, cutoff=1)), 0.95),
-            (
-                "contrast_sharp",
-                _jpeg_bytes(
-                    ImageEnhance.Sharpness(ImageEnhance.Contrast(rgb).enhance(1.15)).enhance(1.2)
-                ),
-                0.9,
-            ),
-        ]
-    return variants
+def _vision_input_size(width: int, height: int) -> tuple[int, int]:
+    """Largest size the vision model keeps at high detail: it fits images
+    into 2048x2048 and then scales the short side down to 768, so sending
+    more pixels than that only costs upload time. Never upscales."""
+    scale = min(1.0, _VISION_MAX_SIDE / max(width, height))
+    scale = min(scale, _VISION_SHORT_SIDE / max(1, min(width, height) * scale) * scale)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def _remote_image(rgb: np.ndarray, hand_box: tuple[int, int, int, int] | None = None) -> Image.Image:
+    """The image remote passes see: cropped to `hand_box` (sy, ey, sx, ex)
+    when segmentation found the hand, and downscaled to _vision_input_size."""
+    if hand_box is not None:
+        sy, ey, sx, ex = hand_box
+        rgb = rgb[sy:ey, sx:ex]
+    image = Image.fromarray(np.ascontiguousarray(rgb))
+    size = _vision_input_size(image.width, image.height)
+    if size != image.size:
+        image = image.resize(size, Image.Resampling.LANCZOS)
+    return image
+
+
+_VARIANTS: list[tuple[str, Callable[[Image.Image], Image.Image], float]] = [
+    ("orig", lambda image: image, 1.0),
+    ("autocontrast", lambda image: ImageOps.autocontrast(image, cutoff=1), 0.95),
+    (
+        "contrast_sharp",
+        lambda image: ImageEnhance.Sharpness(ImageEnhance.Contrast(image).enhance(1.15)).enhance(1.2),
+        0.9,
+    ),
+]
+
+
+def _image_variants(image: Image.Image, names: list[str] | None = None) -> list[tuple[str, bytes, float]]:
+    """JPEG-encoded ensemble variants of `image` (all, or just `names`);
+    encoded only when a pass is about to be sent."""
+    quality = settings.remote_jpeg_quality
+    return [
+        (name, _jpeg_bytes(transform(image), quality), weight)
+        for name, transform, weight in _VARIANTS
+        if names is None or name in names
+    ]
+
+
+def _call_model_for_slots(client: OpenAI, image_bytes: bytes, system_prompt: str = SYSTEM_PROMPT) -> dict[str, Any]:
+    cache = get_remote_response_cache()
+    key = response_key(image_bytes, [system_prompt, _USER_PROMPT], settings.openai_model) if cache else ""
+    output_text = cache.get(key) if cache else None
+    if output_text is not None:
+        recognition_metrics.record_count("remote_cache.hit")
+        return _parse_payload(output_text)
+
+    output_text = _request_slots(client, image_bytes, system_prompt)
+    payload = _parse_payload(output_text)
+    if cache:
+        cache.put(key, output_text)
+    return payload
 
 
-def _call_model_for_slots(client: OpenAI, image_bytes: bytes) -> dict[str, Any]:
+def _request_slots(client: OpenAI, image_bytes: bytes, system_prompt: str) -> str:
     image_b64 = base64.b64encode(image_bytes).decode("ascii")
     if hasattr(client, "responses"):
         response = client.responses.create(
@@ -177,37 +274,209 @@ def _call_model_for_slots(client: OpenAI, image_bytes: bytes) -> dict[str, Any]:
             input=[
                 {
                     "role": "system",
-                    "content": [{"type": "input_text", "text": SYSTEM_PROMPT}],
+                    "content": [{"type": "input_text", "text": system_prompt}],
                 },
                 {
                     "role": "user",
                     "content": [
-                        {"type": "input_text", "text": "Return strict JSON with keys: tiles_count, slots, warnings."},
+                        {"type": "input_text", "text": _USER_PROMPT},
                         {"type": "input_image", "image_url": f"data:image/jpeg;base64,{image_b64}"},
                     ],
                 },
             ],
             temperature=0,
         )
-        output_text = response.output_text
+        return response.output_text
     else:
         response = client.chat.completions.create(
             model=settings.openai_model,
             temperature=0,
             response_format={"type": "json_object"},
             messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "system", "content": system_prompt},
                 {
                     "role": "user",
                     "content": [
-                        {"type": "text", "text": "Return strict JSON with keys: tiles_count, slots, warnings."},
+                        {"type": "text", "text": _USER_PROMPT},
                         {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{image_b64}"}},
                     ],
                 },
             ],
         )
-        output_text = response.choices[0].message.content or "{}"
-    return _parse_payload(output_text)
+        return response.choices[0].message.content or "{}"
+
+
+def _crop_mosaic(crops: list[np.ndarray]) -> bytes:
+    """JPEG of `crops` side by side at a common height, separated by gaps."""
+    tiles = []
+    for crop in crops:
+        image = Image.fromarray(crop)
+        width = max(1, round(image.width * _MOSAIC_TILE_HEIGHT / max(1, image.height)))
+        tiles.append(image.resize((width, _MOSAIC_TILE_HEIGHT), Image.Resampling.BICUBIC))
+    total_width = sum(tile.width for tile in tiles) + _MOSAIC_GAP * (len(tiles) + 1)
+    mosaic = Image.new("RGB", (total_width, _MOSAIC_TILE_HEIGHT + 2 * _MOSAIC_GAP), _MOSAIC_GAP_COLOR)
+    x = _MOSAIC_GAP
+    for tile in tiles:
+        mosaic.paste(tile, (x, _MOSAIC_GAP))
+        x += tile.width + _MOSAIC_GAP
+    return _jpeg_bytes(mosaic, settings.remote_jpeg_quality)
+
+
+def _hybrid_recognition(client: OpenAI, local: LocalRecognition) -> dict[str, Any] | None:
+    """Keep the confident local slots and re-recognize only the ambiguous
+    ones remotely, from a single mosaic of their crops. None when the
+    local slots can't be used this way (wrong tile count, nothing or too
+    much ambiguous) or the remote answer doesn't line up with the mosaic."""
+    from app.tile_recognizer_local import LOCAL_MODEL_NAME
+
+    slots = local.slots
+    if len(slots) not in (13, 14) or len(local.crops) != len(slots):
+        return None
+    ambiguous = [idx for idx, slot in enumerate(slots) if slot.get("ambiguous")]
+    if not ambiguous or len(ambiguous) > settings.hybrid_max_ambiguous_slots:
+        return None
+
+    mosaic = _crop_mosaic([local.crops[idx] for idx in ambiguous])
+    try:
+        with timed_stage("remote_hybrid"):
+            payload = _call_model_for_slots(client, mosaic, MOSAIC_PROMPT.format(count=len(ambiguous)))
+        remote_slots = _normalize_candidates(payload.get("slots", []))
+    except Exception:
+        return None
+    if len(remote_slots) != len(ambiguous):
+        return None
+
+    local_ambiguous = [slots[idx] for idx in ambiguous]
+    resolved = _merge_slot_estimates([(local_ambiguous, 1.0), (remote_slots, _HYBRID_REMOTE_WEIGHT)])
+    merged = [dict(slot) for slot in slots]
+    for idx, slot in zip(ambiguous, resolved):
+        merged[idx] = {**slot, "index": idx}
+
+    warnings = list(local.warnings)
+    warnings.append(f"Hybrid recognition: {len(ambiguous)} ambiguous slot(s) re-recognized remotely.")
+    for warning in list(payload.get("warnings", [])):
+        warnings.append(f"hybrid:{warning}")
+    return {
+        "tiles_count": len(merged),
+        "slots": merged,
+        "warnings": warnings,
+        "model_name": f"{LOCAL_MODEL_NAME}+{settings.openai_model}",
+    }
+
+
+def _is_confident_pass(outcome: dict[str, Any] | BaseException, policy: RecognitionPolicy = DEFAULT_POLICY) -> bool:
+    """Whether one remote pass is sure enough that further ensemble passes
+    would rarely change the hand (see RecognitionPolicy.early_stop_*)."""
+    if isinstance(outcome, BaseException):
+        return False
+    try:
+        slots = _normalize_candidates(outcome.get("slots", []))
+    except Exception:
+        return False
+    if len(slots) != 14:
+        return False
+    confidences = [
+        max((c["confidence"] for c in slot["candidates"] if c["tile"] == slot["top"]), default=0.0)
+        for slot in slots
+    ]
+    if sum(confidences) / len(confidences) < policy.early_stop_min_confidence:
+        return False
+    winning = pick_winning_tiles(slots, policy=policy)
+    if winning is None:
+        return False
+    agreement = sum(1 for slot, tile in zip(slots, winning) if slot["top"] == tile) / len(slots)
+    return agreement >= policy.early_stop_min_agreement
+
+
+def _remote_pass_workers() -> int:
+    """settings.remote_pass_workers, but at least enough threads for every
+    recognition the API runs at once to send all of its passes, so passes
+    don't queue behind other requests' passes."""
+    return max(1, settings.remote_pass_workers, settings.recognition_executor_workers * len(_VARIANTS))
+
+
+def _remote_pass_executor() -> ThreadPoolExecutor:
+    global _remote_executor
+    with _remote_executor_lock:
+        if _remote_executor is None:
+            _remote_executor = ThreadPoolExecutor(
+                max_workers=_remote_pass_workers(), thread_name_prefix="recognition-remote",
+            )
+        return _remote_executor
+
+
+def _remote_pass(client: OpenAI, image_bytes: bytes) -> dict[str, Any]:
+    recognition_metrics.record_count("remote.upload_bytes", len(image_bytes))
+    with timed_stage("remote"):
+        return _call_model_for_slots(client, image_bytes)
+
+
+def _run_remote_passes(
+    client: OpenAI,
+    images: list[bytes],
+    should_cancel: Callable[[], bool] | None,
+    stop_early: Callable[[dict[str, Any]], bool] | None = None,
+) -> list[dict[str, Any] | BaseException]:
+    """Issue one remote pass per image concurrently (on a pool shared by all
+    requests, see _remote_pass_workers) and return each pass's payload or
+    exception, in input order. A pass still running
+    settings.remote_pass_timeout_seconds after it started comes back as
+    TimeoutError; time spent queued for a pool thread doesn't count. Raises
+    RecognitionCancelledError as soon as `should_cancel` turns true.
+
+    With `stop_early`, if the first pass succeeds while others are still
+    pending and `stop_early(payload)` is true, the others are cancelled (or
+    abandoned, if already sent) and only the first outcome is returned."""
+    if should_cancel and should_cancel():
+        raise RecognitionCancelledError("recognition canceled")
+    executor = _remote_pass_executor()
+    timeout = settings.remote_pass_timeout_seconds
+    started: dict[int, float] = {}
+
+    def run_pass(index: int, image_bytes: bytes) -> dict[str, Any]:
+        started[index] = time.monotonic()
+        return _remote_pass(client, image_bytes)
+
+    # Each pass runs in a copy of this context so timed_stage() timings
+    # reach the caller's collect_stage_timings().
+    futures = [
+        executor.submit(contextvars.copy_context().run, run_pass, index, image_bytes)
+        for index, image_bytes in enumerate(images)
+    ]
+    pending = set(futures)
+    timed_out: set[Future] = set()
+    while pending:
+        now = time.monotonic()
+        deadlines = {future: started[i] + timeout for i, future in enumerate(futures) if future in pending and i in started}
+        timed_out |= {future for future, deadline in deadlines.items() if deadline <= now}
+        pending -= timed_out
+        if not pending:
+            break
+        wait_for = min([_CANCEL_POLL_SECONDS, *(deadlines[f] - now for f in pending if f in deadlines)])
+        _done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+        if should_cancel and should_cancel():
+            for future in futures:
+                future.cancel()
+            raise RecognitionCancelledError("recognition canceled")
+        first = futures[0]
+        if stop_early is not None and pending and first.done() and first not in timed_out and first.exception() is None:
+            check, stop_early = stop_early, None  # decide once
+            if check(first.result()):
+                for future in futures[1:]:
+                    future.cancel()
+                recognition_metrics.record_count("ensemble.abandoned_passes", sum(1 for i in started if i > 0))
+                return [first.result()]
+
+    outcomes: list[dict[str, Any] | BaseException] = []
+    for future in futures:
+        if future in timed_out:
+            future.cancel()
+            outcomes.append(TimeoutError(f"timed out after {timeout:g}s"))
+        elif future.exception() is not None:
+            outcomes.append(future.exception())
+        else:
+            outcomes.append(future.result())
+    return outcomes
 
 
 def _merge_slot_estimates(estimates: list[tuple[list[dict[str, Any]], float]]) -> list[dict[str, Any]]:
@@ -217,36 +486,161 @@ def _merge_slot_estimates(estimates: list[tuple[list[dict[str, Any]], float]]) -
     return merged
 
 
-def extract_hand_from_image(image_bytes: bytes, should_cancel: Callable[[], bool] | None = None) -> dict[str, Any]:
-    """Image -> hand-shape candidates. This module must not score."""
-    if should_cancel and should_cancel():
-        raise RecognitionCancelledError("recognition canceled")
+def _recognize_locally(
+    rgb: np.ndarray,
+    should_cancel: Callable[[], bool] | None,
+    segmentation_backend: str | None,
+) -> LocalRecognition | None:
+    """Local TFLite recognition, in the recognition process pool when one is
+    configured (settings.recognition_process_workers) and in-process
+    otherwise. Any failure returns None so the caller falls through to the
+    OpenAI API; cancellation is re-raised."""
+    try:
+        from app.recognition_process_pool import discard_broken_pool, get_recognition_process_pool
+        from app.tile_recognizer_local import recognize_tiles_rgb_detailed
 
-    # Try local TFLite recognition first
+        pool = get_recognition_process_pool()
+        if pool is None:
+            return recognize_tiles_rgb_detailed(rgb, segmentation_backend=segmentation_backend)
+        try:
+            return pool.recognize(rgb, segmentation_backend, should_cancel=should_cancel)
+        except BrokenProcessPool:
+            discard_broken_pool(pool)
+            raise
+    except CancelledError as exc:
+        raise RecognitionCancelledError("recognition canceled") from exc
+    except Exception:
+        return None
+
+
+def _decode_for_recognition(image_bytes: bytes) -> np.ndarray | None:
     try:
-        from app.tile_recognizer_local import recognize_tiles_local
+        from app.tile_recognizer_local import decode_rgb
 
-        local_result = recognize_tiles_local(image_bytes)
-        if local_result is not None:
-            return local_result
+        return decode_rgb(image_bytes)
     except Exception:
-        pass  # Fall through to OpenAI API
+        return None
+
+
+def _recognizer_version() -> str:
+    """Everything whose change should invalidate cached results."""
+    from app.tile_recognizer_local import model_version
+
+    return f"local={model_version()};remote={settings.openai_model}"
+
+
+def _cache_key(rgb: np.ndarray, segmentation_backend: str | None) -> str:
+    """The pixels plus every setting that changes the result computed for
+    them, so a config change doesn't serve results from the old one."""
+    return "|".join(
+        [
+            pixel_digest(rgb),
+            f"segmentation={segmentation_backend or settings.segmentation_backend}",
+            f"segmentation_scale={settings.segmentation_max_side},{settings.segmentation_refine_pitch}",
+            f"local_top_k={settings.local_top_k},{settings.local_top_k_cumulative}",
+            f"hybrid={settings.hybrid_remote_fallback},{settings.hybrid_max_ambiguous_slots}",
+            f"passes={settings.recognize_ensemble_passes}",
+            f"adaptive={settings.recognize_adaptive_ensemble},{settings.recognize_speculative_ensemble}",
+            repr(DEFAULT_POLICY),
+        ]
+    )
+
+
+def extract_hand_from_image(
+    image_bytes: bytes,
+    should_cancel: Callable[[], bool] | None = None,
+    segmentation_backend: str | None = None,
+) -> dict[str, Any]:
+    """Image -> hand-shape candidates. This module must not score.
+
+    `segmentation_backend` overrides settings.segmentation_backend for the
+    local recognizer (see app/tile_recognizer_local.py). Results are cached
+    by decoded pixel content (see app/recognition_cache.py); fallback and
+    partially failed results are not cached."""
+    if should_cancel and should_cancel():
+        raise RecognitionCancelledError("recognition canceled")
+
+    rgb = _decode_for_recognition(image_bytes)
+    cache_key = version = None
+    if rgb is not None and recognition_cache.enabled:
+        cache_key, version = _cache_key(rgb, segmentation_backend), _recognizer_version()
+        cached = recognition_cache.get(cache_key, version)
+        if cached is not None:
+            return cached
+
+    result, cacheable = _extract_uncached(rgb, should_cancel, segmentation_backend)
+    if cache_key is not None and version is not None and cacheable:
+        recognition_cache.put(cache_key, version, result)
+    return result
+
+
+def _extract_uncached(
+    rgb: np.ndarray | None,
+    should_cancel: Callable[[], bool] | None,
+    segmentation_backend: str | None,
+) -> tuple[dict[str, Any], bool]:
+    """extract_hand_from_image without the cache; also returns whether the
+    result may be cached."""
+    # Try local TFLite recognition first
+    local = _recognize_locally(rgb, should_cancel, segmentation_backend) if rgb is not None else None
+    if local is not None and local.result is not None:
+        return local.result, True
 
     if not settings.openai_api_key:
-        return _fallback_result()
+        return _fallback_result(), False
+    if rgb is None:
+        return _fallback_result(
+            extra_warnings=["Image could not be decoded; fallback was used."],
+            include_missing_api_key_warning=False,
+        ), False
 
-    client = OpenAI(api_key=settings.openai_api_key)
-    variants = _image_variants(image_bytes)
-    passes = max(1, min(settings.recognize_ensemble_passes, len(variants)))
+    client = get_openai_client()
+    if local is not None and settings.hybrid_remote_fallback:
+        if should_cancel and should_cancel():
+            raise RecognitionCancelledError("recognition canceled")
+        hybrid = _hybrid_recognition(client, local)
+        if hybrid is not None:
+            return hybrid, True
+
+    remote_image = _remote_image(rgb, local.hand_box if local is not None else None)
+    passes = max(1, min(settings.recognize_ensemble_passes, len(_VARIANTS)))
+    names = [name for name, _transform, _w in _VARIANTS[:passes]]
     collected: list[tuple[list[dict[str, Any]], float]] = []
     warnings: list[str] = []
     tiles_count_votes: list[int] = []
 
-    for name, variant_bytes, weight in variants[:passes]:
-        if should_cancel and should_cancel():
-            raise RecognitionCancelledError("recognition canceled")
+    # Adaptive: the first pass is sent alone, and the remaining passes are
+    # sent (concurrently) only when it isn't confident, so a confident image
+    # costs one pass. Speculative: every pass is sent at once and the others
+    # are dropped as soon as the first one is confident; that saves the
+    # second round trip but not the cost of passes already in flight.
+    variants = _image_variants(remote_image, names)
+    adaptive = settings.recognize_adaptive_ensemble and passes > 1
+    speculative = adaptive and settings.recognize_speculative_ensemble
+    started = time.perf_counter()
+    if adaptive and not speculative:
+        outcomes = _run_remote_passes(client, [variants[0][1]], should_cancel)
+        if not _is_confident_pass(outcomes[0]):
+            outcomes += _run_remote_passes(client, [data for _name, data, _w in variants[1:]], should_cancel)
+    else:
+        outcomes = _run_remote_passes(
+            client,
+            [data for _name, data, _w in variants],
+            should_cancel,
+            stop_early=_is_confident_pass if speculative else None,
+        )
+    stopped_early = len(outcomes) < len(variants)
+    if stopped_early:
+        warnings.append(f"Adaptive ensemble: stopped after 1 of {passes} passes.")
+    recognition_metrics.record_timing(
+        "ensemble.stopped_early" if stopped_early else "ensemble.all_passes", time.perf_counter() - started,
+    )
+    recognition_metrics.record_count(f"ensemble.passes_{len(outcomes)}")
+    for (name, _variant_bytes, weight), outcome in zip(variants, outcomes):
         try:
-            payload = _call_model_for_slots(client, variant_bytes)
+            if isinstance(outcome, BaseException):
+                raise outcome
+            payload = outcome
             slots = _normalize_candidates(payload.get("slots", []))
             if not slots:
                 raise ValueError("slots is empty")
@@ -262,7 +656,7 @@ def extract_hand_from_image(image_bytes: bytes, should_cancel: Callable[[], bool
             extra_warnings=warnings + ["All recognition passes failed; fallback was used."],
             include_missing_api_key_warning=False,
         )
-        return fallback
+        return fallback, False
 
     if len(collected) == 1:
         merged_slots = collected[0][0]
@@ -271,11 +665,12 @@ def extract_hand_from_image(image_bytes: bytes, should_cancel: Callable[[], bool
         warnings.append(f"Ensemble merge applied across {len(collected)} passes.")
 
     tiles_count = max(set(tiles_count_votes), key=tiles_count_votes.count) if tiles_count_votes else len(merged_slots)
-    return {
+    result = {
         "tiles_count": int(tiles_count),
         "slots": merged_slots,
         "warnings": warnings,
     }
+    return result, len(collected) == len(outcomes)
 
 
 def hand_shape_from_estimate(estimate: dict[str, Any]) -> HandInput:
@@ -1,13 +1,13 @@
 from __future__ import annotations
 
 import json
-import time
-from collections import defaultdict, deque
+from contextlib import asynccontextmanager
 from io import BytesIO
 from pathlib import Path
 from uuid import UUID
 
 from fastapi import Depends, FastAPI, File, Form, HTTPException, Query, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
@@ -17,8 +17,16 @@ from app.config import settings
 from app.auth import get_current_user, require_admin
 from app.gcs_feedback_store import GCSFeedbackStore
 from app.hand_extraction import extract_hand_from_image, hand_shape_from_estimate_with_warnings
+from app.recognition_cache import recognition_cache
+from app.recognition_executor import RecognitionExecutorSaturated, recognition_executor
 from app.recognition_feedback_store import RecognitionFeedbackStore
 from app.recognition_job_manager import RecognitionJobManager
+from app.recognition_metrics import recognition_metrics
+from app.model_refresher import create_model_refresher
+from app.openai_client import close_openai_client, get_openai_client
+from app.rate_limiter import create_rate_limiter, retry_after_header
+from app.recognition_process_pool import recycle_recognition_process_pool, shutdown_recognition_process_pool
+from app.remote_response_cache import close_remote_response_cache
 from app.hand_scoring import score_hand_shape
 from app.repository import InMemoryRepository
 from app.schemas import (
@@ -48,7 +56,28 @@ try:  # pragma: no cover
 except Exception:  # pragma: no cover
     HEIC_ENABLED = False
 
-app = FastAPI(title="Mahjong Hand Score PoC", version="0.1.0")
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # Recognition workers load the newly installed model when they restart.
+    model_refresher = create_model_refresher(on_installed=lambda _version: recycle_recognition_process_pool())
+    if model_refresher is not None:
+        model_refresher.restore()
+        model_refresher.start()
+    if settings.openai_api_key:
+        get_openai_client()
+    recognition_executor.start()
+    yield
+    if model_refresher is not None:
+        model_refresher.stop()
+    shutdown_recognition_process_pool()
+    close_openai_client()
+    close_remote_response_cache()
+    recognition_rate_limiter.close()
+    recognition_executor.shutdown()
+
+
+app = FastAPI(title="Mahjong Hand Score PoC", version="0.1.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -67,7 +96,16 @@ recognition_feedback_store = RecognitionFeedbackStore()
 
 from app.training_data_store import TrainingDataStore
 training_data_store = TrainingDataStore()
-_recognition_rate_windows: dict[str, deque[float]] = defaultdict(deque)
+recognition_rate_limiter = create_rate_limiter()
+
+
+@app.exception_handler(RecognitionExecutorSaturated)
+async def recognition_saturated(_request: Request, exc: RecognitionExecutorSaturated) -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "recognition is busy, retry later"},
+        headers={"Retry-After": str(exc.retry_after_seconds)},
+    )
 
 
 @app.middleware("http")
@@ -79,13 +117,14 @@ async def limit_anonymous_recognition(request: Request, call_next):
         "/api/v1/recognize-and-score",
     }:
         key = request.client.host if request.client else "unknown"
-        now = time.monotonic()
-        window = _recognition_rate_windows[key]
-        while window and now - window[0] >= 60:
-            window.popleft()
-        if len(window) >= settings.anonymous_recognition_requests_per_minute:
-            return JSONResponse(status_code=429, content={"detail": "recognition rate limit exceeded"})
-        window.append(now)
+        # The SQLite limiter waits on a write lock shared across workers.
+        wait_seconds = await run_in_threadpool(recognition_rate_limiter.acquire, key)
+        if wait_seconds > 0:
+            return JSONResponse(
+                status_code=429,
+                content={"detail": "recognition rate limit exceeded"},
+                headers={"Retry-After": retry_after_header(wait_seconds)},
+            )
     return await call_next(request)
 
 
@@ -135,10 +174,13 @@ def score_dataset() -> FileResponse:
     return FileResponse(STATIC_DIR / "score_dataset.html")
 
 
-def _to_recognition_image_bytes(upload: UploadFile, image_bytes: bytes) -> tuple[int, int, bytes]:
+def _image_size(upload: UploadFile, image_bytes: bytes) -> tuple[int, int]:
+    """Validate the upload and return its size. Reads the header only: the
+    recognizer decodes the original bytes once, EXIF orientation included
+    (see tile_recognizer_local.decode_rgb)."""
     try:
-        img = Image.open(BytesIO(image_bytes))
-        width, height = img.size
+        with Image.open(BytesIO(image_bytes)) as img:
+            return img.size
     except Exception as exc:  # pragma: no cover
         filename = (upload.filename or "").lower()
         content_type = (upload.content_type or "").lower()
@@ -149,10 +191,25 @@ def _to_recognition_image_bytes(upload: UploadFile, image_bytes: bytes) -> tuple
             ) from exc
         raise HTTPException(status_code=400, detail="invalid image file") from exc
 
-    rgb = img.convert("RGB")
-    out = BytesIO()
-    rgb.save(out, format="JPEG", quality=95)
-    return width, height, out.getvalue()
+
+def _recognize_upload(
+    upload: UploadFile, image_bytes: bytes, segmentation_backend: str | None,
+) -> tuple[int, int, dict]:
+    width, height = _image_size(upload, image_bytes)
+    return width, height, extract_hand_from_image(image_bytes, segmentation_backend=segmentation_backend)
+
+
+def _checked_segmentation_backend(name: str | None) -> str | None:
+    """`name` if it is a known local segmentation backend; None (use
+    SEGMENTATION_BACKEND) when empty."""
+    if not name:
+        return None
+    from app.tile_recognizer_local import segmentation_backend_names
+
+    names = segmentation_backend_names()
+    if name not in names:
+        raise HTTPException(status_code=422, detail=f"segmentation_backend must be one of: {', '.join(names)}")
+    return name
 
 
 async def _read_limited_image(upload: UploadFile) -> bytes:
@@ -192,28 +249,44 @@ def _build_recognize_response(width: int, height: int, game_id: str | None, payl
 
 
 @app.post("/api/v1/recognize", response_model=RecognizeResponse)
-async def recognize(image: UploadFile = File(...), game_id: str | None = Form(None)) -> RecognizeResponse:
+async def recognize(
+    image: UploadFile = File(...),
+    game_id: str | None = Form(None),
+    segmentation_backend: str | None = Form(None),
+) -> RecognizeResponse:
+    segmentation_backend = _checked_segmentation_backend(segmentation_backend)
     image_bytes = await _read_limited_image(image)
-
-    width, height, recognition_image_bytes = _to_recognition_image_bytes(image, image_bytes)
-    payload = extract_hand_from_image(recognition_image_bytes)
+    # Decode and recognition block for seconds; keep them off the event loop.
+    width, height, payload = await recognition_executor.run(
+        _recognize_upload, image, image_bytes, segmentation_backend,
+    )
     return _build_recognize_response(width=width, height=height, game_id=game_id, payload=payload)
 
 
 @app.post("/api/v1/recognize-only", response_model=RecognizeResponse)
-async def recognize_only(image: UploadFile = File(...), game_id: str | None = Form(None)) -> RecognizeResponse:
+async def recognize_only(
+    image: UploadFile = File(...),
+    game_id: str | None = Form(None),
+    segmentation_backend: str | None = Form(None),
+) -> RecognizeResponse:
     """Dedicated image-recognition endpoint."""
-    return await recognize(image=image, game_id=game_id)
+    return await recognize(image=image, game_id=game_id, segmentation_backend=segmentation_backend)
 
 
 @app.post("/api/v1/recognize-only/jobs", response_model=RecognizeJobCreateResponse)
-async def create_recognize_job(image: UploadFile = File(...), game_id: str | None = Form(None)) -> RecognizeJobCreateResponse:
+async def create_recognize_job(
+    image: UploadFile = File(...),
+    game_id: str | None = Form(None),
+    segmentation_backend: str | None = Form(None),
+) -> RecognizeJobCreateResponse:
+    segmentation_backend = _checked_segmentation_backend(segmentation_backend)
     image_bytes = await _read_limited_image(image)
-    width, height, recognition_image_bytes = _to_recognition_image_bytes(image, image_bytes)
+    width, height = _image_size(image, image_bytes)
     job = recognition_jobs.create_job(
-        image_bytes=recognition_image_bytes,
+        image_bytes=image_bytes,
         width=width,
         height=height,
+        segmentation_backend=segmentation_backend,
         game_id=game_id,
     )
     return RecognizeJobCreateResponse(job_id=job.id, status=job.status, cancel_requested=job.cancel_requested)
@@ -253,6 +326,19 @@ def cancel_recognize_job(job_id: UUID) -> RecognizeJobStatusResponse:
     )
 
 
+@app.get("/api/v1/recognition/metrics")
+def get_recognition_metrics(_admin: dict = Depends(require_admin)) -> dict:
+    from app.tile_recognizer_local import interpreter_pool_stats
+
+    return {
+        "timings": recognition_metrics.snapshot(),
+        "counts": recognition_metrics.counts(),
+        "interpreter_pool": interpreter_pool_stats(),
+        "recognition_cache": recognition_cache.stats(),
+        "executor": recognition_executor.stats(),
+    }
+
+
 @app.post("/api/v1/score", response_model=ScoreResponse)
 def score(req: ScoreRequest) -> ScoreResponse:
     validate_score_request(req)
@@ -279,8 +365,9 @@ async def recognize_and_score(
     image: UploadFile = File(...),
     context_json: str = Form(...),
     rules_json: str = Form(...),
+    segmentation_backend: str | None = Form(None),
 ) -> RecognizeAndScoreResponse:
-    recognized = await recognize(image=image)
+    recognized = await recognize(image=image, segmentation_backend=segmentation_backend)
     try:
         context = ContextInput.model_validate(json.loads(context_json))
         rules = RuleSet.model_validate(json.loads(rules_json))
@@ -0,0 +1,231 @@
+"""Hot reload of the approved tile classifier.
+
+Approving a candidate (/api/v1/model/candidates/{version}/approve) rewrites
+`models/latest.json`. A ModelRefresher polls that pointer, downloads the
+version's files (same layout ml/train.py uploads: models/<version>/...)
+into settings.model_download_dir, and installs them with
+tile_recognizer_local.install_model. Requests in flight finish on the old
+interpreters.
+
+The source is a `gs://bucket` URI or a local directory laid out like the
+bucket (for development and tests). The last installed version is recorded
+in <model_download_dir>/current.json, so restarts and recognition worker
+processes start from it without downloading again.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+from threading import Event, Lock, Thread
+from typing import Callable, Protocol
+
+from app.config import settings
+from app.recognition_metrics import recognition_metrics
+
+logger = logging.getLogger(__name__)
+
+_POINTER = "models/latest.json"
+_REQUIRED_FILES = ("tile_classifier.tflite", "labels.txt")
+_OPTIONAL_FILES = ("tile_classifier_int8.tflite",)
+_CURRENT_FILE = "current.json"
+_KEEP_VERSIONS = 2
+
+
+class _ModelSource(Protocol):
+    def read_bytes(self, name: str) -> bytes | None:
+        """Object `name` (bucket-relative), or None if it doesn't exist."""
+
+
+class _LocalModelSource:
+    def __init__(self, root: Path) -> None:
+        self._root = root
+
+    def read_bytes(self, name: str) -> bytes | None:
+        path = self._root / name
+        return path.read_bytes() if path.is_file() else None
+
+
+class _GCSModelSource:
+    def __init__(self, bucket_name: str) -> None:
+        self._bucket_name = bucket_name
+        self._bucket = None
+
+    def read_bytes(self, name: str) -> bytes | None:
+        if self._bucket is None:
+            from google.cloud import storage
+
+            self._bucket = storage.Client(project=settings.gcp_project).bucket(self._bucket_name)
+        blob = self._bucket.blob(name)
+        if not blob.exists():
+            return None
+        return blob.download_as_bytes()
+
+
+def _model_source(uri: str) -> _ModelSource:
+    if uri.startswith("gs://"):
+        return _GCSModelSource(uri[len("gs://"):].strip("/"))
+    return _LocalModelSource(Path(uri))
+
+
+def _is_safe_version(version: str) -> bool:
+    return bool(version) and version.replace("-", "").replace("_", "").isalnum()
+
+
+class ModelRefresher:
+    def __init__(
+        self,
+        source: _ModelSource,
+        download_dir: Path,
+        interval_seconds: float,
+        on_installed: Callable[[str], None] | None = None,
+    ) -> None:
+        self._source = source
+        self._download_dir = download_dir
+        self._interval_seconds = interval_seconds
+        self._on_installed = on_installed
+        self._installed_version: str | None = None
+        self._check_lock = Lock()
+        self._stop = Event()
+        self._thread: Thread | None = None
+
+    @property
+    def installed_version(self) -> str | None:
+        return self._installed_version
+
+    def restore(self) -> bool:
+        """Install the version recorded in current.json, if any."""
+        version = read_current_version(self._download_dir)
+        if version is None:
+            return False
+        try:
+            self._install(version)
+        except Exception as exc:
+            logger.warning("Could not restore model %s: %s", version, exc)
+            return False
+        return True
+
+    def check_once(self) -> bool:
+        """Poll the pointer once; True if a new version was installed."""
+        with self._check_lock:
+            raw = self._source.read_bytes(_POINTER)
+            if raw is None:
+                return False
+            version = str(json.loads(raw)["version"])
+            if version == self._installed_version:
+                return False
+            if not _is_safe_version(version):
+                raise ValueError(f"invalid model version in {_POINTER}: {version!r}")
+            self._download(version)
+            self._install(version)
+            _write_current_version(self._download_dir, version)
+            self._prune()
+            return True
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._run, name="model-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.check_once()
+            except Exception as exc:
+                recognition_metrics.record_count("model_refresh.failed")
+                logger.warning("Model refresh failed: %s", exc)
+            self._stop.wait(self._interval_seconds)
+
+    def _download(self, version: str) -> None:
+        target = self._download_dir / version
+        if target.is_dir():
+            return
+        self._download_dir.mkdir(parents=True, exist_ok=True)
+        staging = self._download_dir / f".{version}.partial"
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir()
+        try:
+            for name in _REQUIRED_FILES + _OPTIONAL_FILES:
+                data = self._source.read_bytes(f"models/{version}/{name}")
+                if data is None:
+                    if name in _REQUIRED_FILES:
+                        raise FileNotFoundError(f"models/{version}/{name} not found")
+                    continue
+                (staging / name).write_bytes(data)
+            # Complete or absent: the version dir only appears via rename.
+            staging.rename(target)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def _install(self, version: str) -> None:
+        from app.tile_recognizer_local import install_model
+
+        install_model(self._download_dir / version, version)
+        self._installed_version = version
+        recognition_metrics.record_count("model_refresh.installed")
+        if self._on_installed is not None:
+            self._on_installed(version)
+
+    def _prune(self) -> None:
+        versions = sorted(
+            (p for p in self._download_dir.iterdir() if p.is_dir() and not p.name.startswith(".")),
+            key=lambda p: p.stat().st_mtime,
+            reverse=True,
+        )
+        for stale in versions[_KEEP_VERSIONS:]:
+            if stale.name != self._installed_version:
+                shutil.rmtree(stale, ignore_errors=True)
+
+
+def read_current_version(download_dir: Path) -> str | None:
+    try:
+        version = str(json.loads((download_dir / _CURRENT_FILE).read_text())["version"])
+    except (OSError, ValueError, KeyError):
+        return None
+    if not _is_safe_version(version) or not (download_dir / version).is_dir():
+        return None
+    return version
+
+
+def _write_current_version(download_dir: Path, version: str) -> None:
+    tmp = download_dir / f".{_CURRENT_FILE}.tmp"
+    tmp.write_text(json.dumps({"version": version}))
+    os.replace(tmp, download_dir / _CURRENT_FILE)
+
+
+def restore_installed_model() -> None:
+    """Install the last refreshed model, if refreshing is configured; for
+    processes that don't run the refresher themselves (recognition
+    workers)."""
+    if not settings.model_refresh_source:
+        return
+    download_dir = Path(settings.model_download_dir)
+    version = read_current_version(download_dir)
+    if version is None:
+        return
+    from app.tile_recognizer_local import install_model
+
+    install_model(download_dir / version, version)
+
+
+def create_model_refresher(on_installed: Callable[[str], None] | None = None) -> ModelRefresher | None:
+    """ModelRefresher for settings.model_refresh_source, or None if unset."""
+    if not settings.model_refresh_source:
+        return None
+    return ModelRefresher(
+        source=_model_source(settings.model_refresh_source),
+        download_dir=Path(settings.model_download_dir),
+        interval_seconds=settings.model_refresh_interval_seconds,
+        on_installed=on_installed,
+    )
@@ -0,0 +1,79 @@
+"""Process-wide OpenAI client.
+
+One long-lived client keeps its HTTP connection pool (keep-alive, no
+repeated TLS handshakes) across recognitions. Connection limits, timeouts
+and the SDK's retry/backoff count come from settings, capped so that all
+attempts of one remote pass fit in REMOTE_PASS_TIMEOUT_SECONDS (see
+_request_budget); OPENAI_BASE_URL points it at a stand-in server. Tests and benchmarks can swap the client out
+entirely with set_openai_client_override.
+"""
+
+from __future__ import annotations
+
+from threading import Lock
+from typing import Any
+
+import httpx
+from openai import DefaultHttpxClient, OpenAI
+
+from app.config import settings
+
+_client: OpenAI | None = None
+_override: Any | None = None
+_lock = Lock()
+
+
+def _request_budget() -> tuple[httpx.Timeout, int]:
+    """Per-attempt timeout and retry count. A pass abandoned at
+    remote_pass_timeout_seconds should not keep its thread busy much longer
+    (backoff sleeps between retries come on top), so each attempt gets at
+    most an equal share of the pass timeout."""
+    max_retries = max(0, settings.openai_max_retries)
+    attempt = min(settings.openai_timeout_seconds, settings.remote_pass_timeout_seconds / (1 + max_retries))
+    return httpx.Timeout(attempt, connect=min(settings.openai_connect_timeout_seconds, attempt)), max_retries
+
+
+def _new_client() -> OpenAI:
+    timeout, max_retries = _request_budget()
+    http_client = DefaultHttpxClient(
+        limits=httpx.Limits(
+            max_connections=settings.openai_max_connections,
+            max_keepalive_connections=settings.openai_max_keepalive_connections,
+            keepalive_expiry=settings.openai_keepalive_expiry_seconds,
+        ),
+        timeout=timeout,
+    )
+    return OpenAI(
+        api_key=settings.openai_api_key,
+        base_url=settings.openai_base_url or None,
+        max_retries=max_retries,
+        timeout=timeout,
+        http_client=http_client,
+    )
+
+
+def get_openai_client() -> Any:
+    """The override if one is set, else the shared client (created on first
+    use). Callers must check settings.openai_api_key first."""
+    global _client
+    if _override is not None:
+        return _override
+    with _lock:
+        if _client is None:
+            _client = _new_client()
+        return _client
+
+
+def set_openai_client_override(client: Any | None) -> None:
+    """Serve `client` (anything with the OpenAI `responses` or
+    `chat.completions` surface) instead of the shared one; None restores it."""
+    global _override
+    _override = client
+
+
+def close_openai_client() -> None:
+    global _client
+    with _lock:
+        client, _client = _client, None
+    if client is not None:
+        client.close()
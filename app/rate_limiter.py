@@ -0,0 +1,140 @@
+"""Per-client token buckets for the recognition endpoints.
+
+Each client key (the remote address) gets a bucket holding up to
+`requests_per_minute` tokens and refilling at requests_per_minute / 60 per
+second, so the state per client is two numbers. In memory, the least
+recently used keys are evicted beyond `max_keys`. A dropped bucket would
+have refilled to full anyway once it sat idle, so eviction only matters for
+clients that are active right now.
+
+With settings.rate_limit_shared_path set, buckets live in a SQLite table
+instead, so every uvicorn worker on the host enforces one shared limit.
+Each request's bucket update runs in its own write transaction. Buckets
+idle long enough to be full again are pruned.
+"""
+
+from __future__ import annotations
+
+import math
+import sqlite3
+import time
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Protocol
+
+from app.config import settings
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    key TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+_PRUNE_EVERY = 256
+_FULL_REFILL_SECONDS = 60  # an empty bucket refills completely in a minute
+
+
+class RateLimiter(Protocol):
+    def acquire(self, key: str) -> float:
+        """Take one token for `key`: 0.0 if allowed, otherwise the seconds
+        until a token is available. May block (see SQLiteRateLimiter)."""
+
+    def close(self) -> None:
+        """Release the limiter's resources."""
+
+
+def _wait_seconds(tokens: float, rate: float) -> float:
+    return (1 - tokens) / rate if rate > 0 else float(_FULL_REFILL_SECONDS)
+
+
+def _refill(tokens: float, elapsed: float, capacity: float, rate: float) -> float:
+    return min(capacity, tokens + max(0.0, elapsed) * rate)
+
+
+class MemoryRateLimiter:
+    def __init__(
+        self,
+        requests_per_minute: int,
+        max_keys: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._capacity = float(requests_per_minute)
+        self._rate = requests_per_minute / _FULL_REFILL_SECONDS
+        self._max_keys = max(1, max_keys)
+        self._clock = clock
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = Lock()
+
+    def acquire(self, key: str) -> float:
+        now = self._clock()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (self._capacity, now))
+            tokens = _refill(tokens, now - updated_at, self._capacity, self._rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self._max_keys:
+                self._buckets.popitem(last=False)
+        return 0.0 if allowed else _wait_seconds(tokens, self._rate)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteRateLimiter:
+    def __init__(self, path: Path, requests_per_minute: int, clock: Callable[[], float] = time.time) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._capacity = float(requests_per_minute)
+        self._rate = requests_per_minute / _FULL_REFILL_SECONDS
+        self._clock = clock
+        # Autocommit mode; transactions are opened explicitly in acquire().
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, timeout=5, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self._calls = 0
+        self._lock = Lock()
+
+    def acquire(self, key: str) -> float:
+        with self._lock:
+            now = self._clock()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT tokens, updated_at FROM buckets WHERE key = ?", (key,)).fetchone()
+                tokens, updated_at = row if row is not None else (self._capacity, now)
+                tokens = _refill(tokens, now - updated_at, self._capacity, self._rate)
+                allowed = tokens >= 1
+                if allowed:
+                    tokens -= 1
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO buckets (key, tokens, updated_at) VALUES (?, ?, ?)",
+                    (key, tokens, now),
+                )
+                self._calls += 1
+                if self._calls % _PRUNE_EVERY == 0:
+                    self._conn.execute("DELETE FROM buckets WHERE updated_at < ?", (now - _FULL_REFILL_SECONDS,))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return 0.0 if allowed else _wait_seconds(tokens, self._rate)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def retry_after_header(wait_seconds: float) -> str:
+    return str(max(1, math.ceil(wait_seconds)))
+
+
+def create_rate_limiter() -> RateLimiter:
+    requests_per_minute = settings.anonymous_recognition_requests_per_minute
+    if settings.rate_limit_shared_path:
+        return SQLiteRateLimiter(Path(settings.rate_limit_shared_path), requests_per_minute)
+    return MemoryRateLimiter(requests_per_minute, settings.rate_limit_max_keys)
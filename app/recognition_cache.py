@@ -0,0 +1,130 @@
+"""Recognition result cache keyed by decoded pixel content.
+
+Users re-upload the same photo (retries, /recognize followed by
+/recognize-and-score, the job endpoint after a timeout). Keying on a hash of
+the decoded pixels — not the upload bytes — also catches the same photo
+re-encoded by the client. Entries are tied to the recognizer version (local
+model + remote model); the first lookup under a new version drops every
+entry, so a model swap invalidates the cache without a restart.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Callable
+
+import numpy as np
+
+from app.config import settings
+
+
+def pixel_digest(rgb: np.ndarray) -> str:
+    """Content hash of a decoded image, shape included."""
+    rgb = np.ascontiguousarray(rgb)
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(repr((rgb.shape, rgb.dtype.str)).encode())
+    digest.update(rgb.data)
+    return digest.hexdigest()
+
+
+@dataclass
+class _Entry:
+    payload: str  # JSON, so every get() hands out an independent copy
+    expires_at: float
+
+
+class RecognitionCache:
+    """LRU + TTL cache of slot-estimate payloads with an entry-count and a
+    byte cap (payload JSON length). Thread-safe."""
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._bytes = 0
+        self._version: str | None = None
+        self._hits = 0
+        self._misses = 0
+        self._lock = Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_entries > 0 and self._max_bytes > 0
+
+    def get(self, key: str, version: str) -> dict[str, Any] | None:
+        if not self.enabled:
+            return None
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= self._clock():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            payload = entry.payload
+        return json.loads(payload)
+
+    def put(self, key: str, version: str, value: dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        payload = json.dumps(value, ensure_ascii=False)
+        if len(payload) > self._max_bytes:
+            return
+        with self._lock:
+            self._check_version(version)
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(payload=payload, expires_at=self._clock() + self._ttl_seconds)
+            self._bytes += len(payload)
+            while len(self._entries) > self._max_entries or self._bytes > self._max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "version": self._version,
+            }
+
+    def _check_version(self, version: str) -> None:
+        if version != self._version:
+            self._entries.clear()
+            self._bytes = 0
+            self._version = version
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry.payload)
+
+
+recognition_cache = RecognitionCache(
+    max_entries=settings.recognition_cache_max_entries,
+    max_bytes=settings.recognition_cache_max_bytes,
+    ttl_seconds=settings.recognition_cache_ttl_seconds,
+)
@@ -0,0 +1,114 @@
+"""Bounded thread pool for blocking recognition work called from async endpoints.
+
+The recognition endpoints are `async def`. Decoding, TFLite inference and
+the OpenAI round trips block for seconds, so running them inline would stall
+the event loop, and with it every other request on the worker, /health
+included. They run here instead: at most `max_workers` at a time, with up to
+`max_queue` more waiting. Beyond that, submissions are rejected with
+RecognitionExecutorSaturated rather than queued. The API turns that into
+503 with Retry-After, so latency stays bounded under overload.
+
+The thread pool is created on start() (or the first run()) and dropped on
+shutdown(), so the app can start again in the same process.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Callable, TypeVar
+
+from app.config import settings
+from app.recognition_metrics import recognition_metrics
+
+T = TypeVar("T")
+
+_DURATION_SMOOTHING = 0.2
+
+
+class RecognitionExecutorSaturated(Exception):
+    def __init__(self, retry_after_seconds: int) -> None:
+        super().__init__("recognition capacity exhausted")
+        self.retry_after_seconds = retry_after_seconds
+
+
+class RecognitionExecutor:
+    def __init__(self, max_workers: int, max_queue: int, initial_duration_seconds: float = 2.0) -> None:
+        self._max_workers = max(1, max_workers)
+        self._max_queue = max(0, max_queue)
+        self._executor: ThreadPoolExecutor | None = None
+        self._in_flight = 0
+        self._rejected = 0
+        self._mean_duration = initial_duration_seconds
+        self._lock = Lock()
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run `fn(*args)` on the pool and await it; raise
+        RecognitionExecutorSaturated if the workers and the queue are full."""
+        with self._lock:
+            if self._in_flight >= self._max_workers + self._max_queue:
+                self._rejected += 1
+                recognition_metrics.record_count("executor.rejected")
+                raise RecognitionExecutorSaturated(self._retry_after())
+            self._in_flight += 1
+        submitted = time.perf_counter()
+        try:
+            future = self.start().submit(contextvars.copy_context().run, self._timed, submitted, fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        # Also runs when the job is cancelled while queued (the awaiting
+        # request went away), in which case _timed never starts.
+        future.add_done_callback(lambda _future: self._release())
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "max_workers": self._max_workers,
+                "max_queue": self._max_queue,
+                "in_flight": self._in_flight,
+                "rejected": self._rejected,
+                "mean_duration_seconds": self._mean_duration,
+            }
+
+    def start(self) -> ThreadPoolExecutor:
+        """The thread pool, created if there is none yet (or after shutdown)."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="recognition")
+            return self._executor
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _timed(self, submitted: float, fn: Callable[..., T], *args: Any) -> T:
+        started = time.perf_counter()
+        recognition_metrics.record_timing("executor.queue_wait", started - submitted)
+        try:
+            return fn(*args)
+        finally:
+            duration = time.perf_counter() - started
+            with self._lock:
+                self._mean_duration += _DURATION_SMOOTHING * (duration - self._mean_duration)
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def _retry_after(self) -> int:
+        # Time for the current backlog to drain at the observed pace.
+        return max(1, math.ceil(self._mean_duration * self._in_flight / self._max_workers))
+
+
+recognition_executor = RecognitionExecutor(
+    max_workers=settings.recognition_executor_workers,
+    max_queue=settings.recognition_executor_max_queue,
+)
@@ -24,6 +24,7 @@ class RecognitionJob:
     width: int
     height: int
     image_bytes: bytes = field(repr=False)
+    segmentation_backend: str | None = None
     cancel_requested: bool = False
     result: dict[str, Any] | None = None
     error: str | None = None
@@ -40,7 +41,14 @@ class RecognitionJobManager:
     def _now(self) -> datetime:
         return datetime.now(timezone.utc)
 
-    def create_job(self, image_bytes: bytes, width: int, height: int, game_id: str | None) -> RecognitionJob:
+    def create_job(
+        self,
+        image_bytes: bytes,
+        width: int,
+        height: int,
+        game_id: str | None,
+        segmentation_backend: str | None = None,
+    ) -> RecognitionJob:
         now = self._now()
         job = RecognitionJob(
             id=uuid4(),
@@ -51,6 +59,7 @@ class RecognitionJobManager:
             width=width,
             height=height,
             image_bytes=image_bytes,
+            segmentation_backend=segmentation_backend,
         )
         with self._lock:
             self._jobs[job.id] = job
@@ -73,6 +82,7 @@ class RecognitionJobManager:
             payload = extract_hand_from_image(
                 job.image_bytes,
                 should_cancel=lambda: self.is_cancel_requested(job_id),
+                segmentation_backend=job.segmentation_backend,
             )
             if self.is_cancel_requested(job_id):
                 self._set_canceled(job_id)
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from threading import Lock
+from typing import Iterator
+
+
+@dataclass
+class TimingStats:
+    count: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def merge(self, other: TimingStats) -> None:
+        self.count += other.count
+        self.total_seconds += other.total_seconds
+        self.max_seconds = max(self.max_seconds, other.max_seconds)
+
+    def as_dict(self) -> dict[str, float]:
+        mean = self.total_seconds / self.count if self.count else 0.0
+        return {
+            "count": self.count,
+            "total_ms": self.total_seconds * 1000,
+            "mean_ms": mean * 1000,
+            "max_ms": self.max_seconds * 1000,
+        }
+
+
+class RecognitionMetrics:
+    """Process-local timing counters for the recognition pipeline."""
+
+    def __init__(self) -> None:
+        self._timings: dict[str, TimingStats] = {}
+        self._counts: dict[str, int] = {}
+        self._lock = Lock()
+
+    def record_timing(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self._timings.setdefault(name, TimingStats()).add(seconds)
+
+    def record_count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._counts[name] = self._counts.get(name, 0) + n
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            return {name: stats.as_dict() for name, stats in sorted(self._timings.items())}
+
+    def counts(self) -> dict[str, int]:
+        with self._lock:
+            return dict(sorted(self._counts.items()))
+
+    def drain(self) -> tuple[dict[str, TimingStats], dict[str, int]]:
+        """Take everything recorded so far and start over (a recognition
+        worker hands its share to the parent process this way)."""
+        with self._lock:
+            timings, self._timings = self._timings, {}
+            counts, self._counts = self._counts, {}
+        return timings, counts
+
+    def merge(self, timings: dict[str, TimingStats], counts: dict[str, int]) -> None:
+        with self._lock:
+            for name, stats in timings.items():
+                self._timings.setdefault(name, TimingStats()).merge(stats)
+            for name, n in counts.items():
+                self._counts[name] = self._counts.get(name, 0) + n
+
+    def reset(self) -> None:
+        with self._lock:
+            self._timings.clear()
+            self._counts.clear()
+
+
+recognition_metrics = RecognitionMetrics()
+
+# Per-call stage breakdown for whoever opened collect_stage_timings() in the
+# current context (thread / task); None when nobody is collecting.
+_stage_sink: ContextVar[dict[str, float] | None] = ContextVar("recognition_stage_sink", default=None)
+
+
+@contextmanager
+def timed_stage(name: str) -> Iterator[None]:
+    """Time one pipeline stage: recorded as "stage.<name>" in
+    recognition_metrics, and added to the active collect_stage_timings()
+    dict if there is one."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        recognition_metrics.record_timing(f"stage.{name}", elapsed)
+        sink = _stage_sink.get()
+        if sink is not None:
+            sink[name] = sink.get(name, 0.0) + elapsed
+
+
+def add_stage_timings(stages: dict[str, float]) -> None:
+    """Add stage seconds measured elsewhere (e.g. in a recognition worker
+    process) to the active collect_stage_timings() dict, if there is one."""
+    sink = _stage_sink.get()
+    if sink is not None:
+        for name, seconds in stages.items():
+            sink[name] = sink.get(name, 0.0) + seconds
+
+
+@contextmanager
+def collect_stage_timings() -> Iterator[dict[str, float]]:
+    """Collect the timed_stage() seconds spent in this context, by stage name."""
+    sink: dict[str, float] = {}
+    token = _stage_sink.set(sink)
+    try:
+        yield sink
+    finally:
+        _stage_sink.reset(token)
@@ -22,6 +22,11 @@ class RecognitionPolicy:
     adjacency_same_suit_bonus: float = 0.12
     adjacency_far_penalty: float = 0.05
     beam_width: int = 512
+    # Adaptive ensemble: stop after the first remote pass when its 14 slots
+    # average at least this top-1 confidence and at least this fraction of
+    # them agree with the winning hand pick_winning_tiles derives.
+    early_stop_min_confidence: float = 0.85
+    early_stop_min_agreement: float = 1.0
 
 
 DEFAULT_POLICY = RecognitionPolicy()
@@ -0,0 +1,187 @@
+"""Dedicated worker processes for CPU-heavy local tile recognition.
+
+Local recognition (OpenCV segmentation, TFLite inference, NumPy post-
+processing) holds the GIL for long stretches, so running it on threads
+inside the uvicorn worker stalls request handling. This pool runs it in
+separate processes instead. Each worker loads its own TFLite interpreters
+and tile-weight model once, at start-up. Decoded images are handed over
+through `multiprocessing.shared_memory` — only the segment name, shape and
+dtype are pickled — so a 12 MP image is copied once into shared memory
+rather than serialized through a pipe. Timings and counts a task records in
+the worker's recognition_metrics travel back with its result and are merged
+into the parent's, so /api/v1/recognition/metrics and collect_stage_timings()
+see them as if recognition had run in-process.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import time
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from multiprocessing.shared_memory import SharedMemory
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Callable
+
+import numpy as np
+
+from app.config import settings
+from app.recognition_metrics import (
+    TimingStats,
+    add_stage_timings,
+    collect_stage_timings,
+    recognition_metrics,
+)
+
+if TYPE_CHECKING:
+    from app.tile_recognizer_local import LocalRecognition
+
+logger = logging.getLogger(__name__)
+
+_CANCEL_POLL_SECONDS = 0.1
+
+
+def _init_worker() -> None:
+    """Warm the per-process models so the first task doesn't pay for it."""
+    from app.model_refresher import restore_installed_model
+    from app.tile_recognizer_local import _load_model
+    from app.tile_weighting import build_tile_weight_model
+
+    try:
+        restore_installed_model()
+        _load_model()
+    except Exception as exc:  # model-less deployments still serve remote recognition
+        logger.warning("TFLite model not available in recognition worker: %s", exc)
+    build_tile_weight_model()
+
+
+_WorkerOutcome = tuple[Any, dict[str, float], dict[str, TimingStats], dict[str, int]]
+
+
+def _run_on_shared_image(
+    fn: Callable[..., Any], shm_name: str, shape: tuple[int, ...], dtype: str, args: tuple[Any, ...],
+) -> _WorkerOutcome:
+    """`fn`'s result, with the stage timings and the metrics the worker
+    recorded since its last task (a worker runs one task at a time)."""
+    shm = SharedMemory(name=shm_name)
+    try:
+        image = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+        try:
+            with collect_stage_timings() as stages:
+                result = fn(image, *args)
+        finally:
+            # Every view into shm.buf must be gone before close().
+            del image
+    finally:
+        shm.close()
+    timings, counts = recognition_metrics.drain()
+    return result, stages, timings, counts
+
+
+class RecognitionProcessPool:
+    def __init__(self, max_workers: int) -> None:
+        # "spawn" rather than fork: the parent runs threads (job manager,
+        # uvicorn) and may already hold TFLite/OpenCV state that is not
+        # fork-safe.
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+
+    def run(
+        self,
+        fn: Callable[..., Any],
+        image: np.ndarray,
+        *args: Any,
+        should_cancel: Callable[[], bool] | None = None,
+    ) -> Any:
+        """Run `fn(image_view, *args)` in a worker, where image_view is a
+        read-only-by-convention view of a shared-memory copy of `image`.
+        `fn` must be a picklable module-level function. Raises
+        concurrent.futures.CancelledError if `should_cancel` turns true
+        while waiting (the worker's task itself runs to completion)."""
+        started = time.perf_counter()
+        image = np.ascontiguousarray(image)
+        shm = SharedMemory(create=True, size=max(1, image.nbytes))
+        try:
+            shared = np.ndarray(image.shape, dtype=image.dtype, buffer=shm.buf)
+            shared[...] = image
+            del shared
+            future = self._executor.submit(
+                _run_on_shared_image, fn, shm.name, image.shape, image.dtype.str, args,
+            )
+            while True:
+                try:
+                    result, stages, timings, counts = future.result(timeout=_CANCEL_POLL_SECONDS)
+                except FutureTimeoutError:
+                    if should_cancel and should_cancel():
+                        future.cancel()
+                        raise CancelledError("recognition canceled")
+                    continue
+                recognition_metrics.merge(timings, counts)
+                add_stage_timings(stages)
+                return result
+        finally:
+            shm.close()
+            shm.unlink()
+            recognition_metrics.record_timing("process_pool.round_trip", time.perf_counter() - started)
+
+    def recognize(
+        self,
+        rgb: np.ndarray,
+        segmentation_backend: str | None = None,
+        should_cancel: Callable[[], bool] | None = None,
+    ) -> LocalRecognition | None:
+        from app.tile_recognizer_local import recognize_tiles_rgb_detailed
+
+        return self.run(recognize_tiles_rgb_detailed, rgb, segmentation_backend, should_cancel=should_cancel)
+
+    def shutdown(self, cancel_futures: bool = True) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=cancel_futures)
+
+
+_pool: RecognitionProcessPool | None = None
+_pool_lock = Lock()
+
+
+def get_recognition_process_pool() -> RecognitionProcessPool | None:
+    """The process-wide pool, created on first use; None when
+    settings.recognition_process_workers is 0 (recognize in-process)."""
+    global _pool
+    if settings.recognition_process_workers <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = RecognitionProcessPool(settings.recognition_process_workers)
+        return _pool
+
+
+def discard_broken_pool(pool: RecognitionProcessPool) -> None:
+    """Drop `pool` (e.g. after a worker crashed with BrokenProcessPool) so
+    the next get_recognition_process_pool() starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown()
+
+
+def recycle_recognition_process_pool() -> None:
+    """Retire the current pool without failing its queued work, so the
+    next request starts fresh workers (e.g. after a model swap)."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(cancel_futures=False)
+
+
+def shutdown_recognition_process_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
+
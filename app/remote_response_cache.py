@@ -0,0 +1,155 @@
+"""Disk-backed cache of raw OpenAI recognition responses.
+
+Keyed by a hash of the image bytes sent, the prompts and the model name, so
+the same variant sent to the same model is answered from disk: after a
+restart, across workers sharing the file, and when the evaluation scripts
+replay an eval set (scripts/evaluate_recognition_set.py --remote-cache).
+The raw output text is stored, not the parsed payload, so parser changes
+apply to cached answers too. Least recently used rows are evicted once the
+stored text exceeds the byte cap.
+
+Each instance keeps a running byte total (read once when the file is
+opened) instead of summing the table on every write, so with several
+processes sharing the file the cap is enforced per process's view of it.
+Hits update last_used in batches, flushed on the next write, every
+_TOUCH_BATCH hits, or on close.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import time
+from pathlib import Path
+from threading import Lock
+from typing import Any, Callable
+
+from app.config import settings
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    output_text TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_last_used ON responses(last_used);
+"""
+
+_TOUCH_BATCH = 64
+
+
+def response_key(image_bytes: bytes, prompts: list[str], model: str) -> str:
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(image_bytes)
+    for part in [*prompts, model]:
+        digest.update(b"\0")
+        digest.update(part.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class RemoteResponseCache:
+    """SQLite cache of output texts with LRU eviction by total size.
+    Thread-safe; one connection per instance."""
+
+    def __init__(self, path: Path, max_bytes: int, clock: Callable[[], float] = time.time) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._max_bytes = max_bytes
+        self._clock = clock
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+        (self._total,) = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+        self._touched: dict[str, float] = {}  # key -> last_used not yet written
+        self._hits = 0
+        self._misses = 0
+        self._lock = Lock()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute("SELECT output_text FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._misses += 1
+                return None
+            self._touched[key] = self._clock()
+            if len(self._touched) >= _TOUCH_BATCH:
+                self._flush_touched()
+                self._conn.commit()
+            self._hits += 1
+            return row[0]
+
+    def put(self, key: str, output_text: str) -> None:
+        size = len(output_text.encode("utf-8"))
+        if size > self._max_bytes:
+            return
+        with self._lock:
+            self._flush_touched()
+            old = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, output_text, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, output_text, size, self._clock()),
+            )
+            self._total += size - (old[0] if old else 0)
+            self._evict()
+            self._conn.commit()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+            return {"entries": entries, "bytes": self._total, "hits": self._hits, "misses": self._misses}
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_touched()
+            self._conn.commit()
+            self._conn.close()
+
+    def _flush_touched(self) -> None:
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE responses SET last_used = ? WHERE key = ?",
+                [(last_used, key) for key, last_used in self._touched.items()],
+            )
+            self._touched.clear()
+
+    def _evict(self) -> None:
+        if self._total <= self._max_bytes:
+            return
+        stale: list[str] = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_used ASC"):
+            if self._total <= self._max_bytes:
+                break
+            stale.append(key)
+            self._total -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", [(key,) for key in stale])
+
+
+_cache: RemoteResponseCache | None = None
+_cache_path: str | None = None
+_lock = Lock()
+
+
+def get_remote_response_cache() -> RemoteResponseCache | None:
+    """The cache at settings.remote_recognition_cache_path, or None when the
+    setting is empty. Reopened if the path changes (scripts set it at
+    startup)."""
+    global _cache, _cache_path
+    path = settings.remote_recognition_cache_path
+    if not path:
+        return None
+    with _lock:
+        if _cache is None or _cache_path != path:
+            if _cache is not None:
+                _cache.close()
+            _cache = RemoteResponseCache(Path(path), settings.remote_recognition_cache_max_bytes)
+            _cache_path = path
+        return _cache
+
+
+def close_remote_response_cache() -> None:
+    global _cache, _cache_path
+    with _lock:
+        cache, _cache, _cache_path = _cache, None, None
+    if cache is not None:
+        cache.close()
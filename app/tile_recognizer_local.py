@@ -2,28 +2,46 @@
 
 Uses MobileNetV2 TFLite model to classify individual tiles from a hand image.
 Tile segmentation uses connected-component analysis on a white-pixel mask,
-followed by autocorrelation-based pitch detection to split a merged run of
-touching tiles into individual tiles. Supports a single linear run of tiles
-(horizontal row or vertical stack); scattered/non-linear arrangements are not
-handled.
+followed by autocorrelation-based pitch detection (app/periodicity.py) to
+split a merged run of touching tiles into individual tiles. Supports a single
+linear run of tiles (horizontal row or vertical stack); scattered/non-linear
+arrangements are not handled.
 """
 
 from __future__ import annotations
 
 import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from io import BytesIO
 from pathlib import Path
-from typing import Any
+from threading import Condition, Lock
+from typing import Any, Callable, Generic, Iterator, Protocol, TypeVar
 
 import cv2
 import numpy as np
-from PIL import Image, ImageOps
+from PIL import ExifTags, Image
+
+from app.config import settings
+from app.periodicity import estimate_pitch
+from app.recognition_postprocess import pick_winning_tiles
+from app.recognition_metrics import recognition_metrics, timed_stage
 
 logger = logging.getLogger(__name__)
 
 _MODEL_DIR = Path(__file__).resolve().parent.parent / "ml" / "output"
 _TFLITE_PATH = _MODEL_DIR / "tile_classifier.tflite"
+# Full-integer export; ml/train.py only writes it when it passes the
+# int8-vs-float16 validation accuracy gate.
+_TFLITE_INT8_PATH = _MODEL_DIR / "tile_classifier_int8.tflite"
+# YOLOv8n tile detector exported by ml/yolo/convert_to_tflite.py.
+_DETECTOR_PATH = _MODEL_DIR / "tile_detector.tflite"
 _LABELS_PATH = _MODEL_DIR / "labels.txt"
 
+# MobileNetV2 preprocessing: pixel / 127.5 - 1.0 maps [0, 255] to [-1, 1].
+_INPUT_SCALE = 1.0 / 127.5
+
 # Label-to-tile-code mapping
 _LABEL_TO_TILE: dict[str, str] = {
     "dots-1": "1p", "dots-2": "2p", "dots-3": "3p", "dots-4": "4p",
@@ -36,109 +54,322 @@ _LABEL_TO_TILE: dict[str, str] = {
     "honors-red": "C", "honors-green": "F", "honors-white": "P",
 }
 
-_interpreter = None
-_labels: list[str] = []
-
+LOCAL_MODEL_NAME = "tflite-mobilenetv2"
+
+_PoolItem = TypeVar("_PoolItem")
+
+
+def _input_lookup_table(dtype: Any, quantization: tuple[float, int]) -> np.ndarray:
+    """Map every possible uint8 pixel value straight to the value the model's
+    input tensor expects: the MobileNetV2-normalized float for float models,
+    or that float re-quantized with the tensor's (scale, zero_point) for
+    full-integer models. Normalization (and quantization) then costs a
+    single table lookup per pixel."""
+    normalized = np.arange(256, dtype=np.float64) * _INPUT_SCALE - 1.0
+    dtype = np.dtype(dtype)
+    if dtype.kind == "f":
+        return normalized.astype(dtype)
+    scale, zero_point = quantization
+    info = np.iinfo(dtype)
+    quantized = np.round(normalized / scale + zero_point)
+    return np.clip(quantized, info.min, info.max).astype(dtype)
+
+
+class _PooledInterpreter:
+    """One TFLite interpreter plus its tensor metadata and the scratch state
+    that must never be shared across threads.
+
+    Input/output tensor indices, the model's input shape and the tensors'
+    quantization parameters are resolved once here, at creation, rather than
+    via get_input_details() / get_output_details() on every classification."""
+
+    def __init__(self, interpreter: Any) -> None:
+        self.interpreter = interpreter
+        input_detail = interpreter.get_input_details()[0]
+        output_detail = interpreter.get_output_details()[0]
+        self.input_index = int(input_detail["index"])
+        self.output_index = int(output_detail["index"])
+        self.batch_size, self.input_h, self.input_w, self.input_c = (int(d) for d in input_detail["shape"])
+        self.input_lut = _input_lookup_table(
+            input_detail.get("dtype", np.float32), input_detail.get("quantization", (0.0, 0)),
+        )
+        self.output_quantization: tuple[float, int] | None = None
+        if np.dtype(output_detail.get("dtype", np.float32)).kind != "f":
+            scale, zero_point = output_detail["quantization"]
+            self.output_quantization = (float(scale), int(zero_point))
+        self.resize_buffer = np.empty((self.input_h, self.input_w, self.input_c), dtype=np.uint8)
+
+    def ensure_batch_size(self, n: int) -> None:
+        """Resize the input tensor to batch `n`. A no-op when the interpreter
+        is already allocated for `n` (the common 13/14-tile case repeats)."""
+        if n == self.batch_size:
+            return
+        self.interpreter.resize_tensor_input(
+            self.input_index, [n, self.input_h, self.input_w, self.input_c],
+        )
+        self.interpreter.allocate_tensors()
+        self.batch_size = n
+
+    def fill_input(self, tile_images: list[np.ndarray]) -> None:
+        """Resize each crop into the reusable uint8 scratch buffer and write
+        its normalized (or quantized) pixels straight into the interpreter's
+        own input tensor, so no per-tile arrays are allocated. The tensor view
+        must be released before invoke() — TFLite refuses to run while a
+        numpy view into its internal buffers is alive."""
+        input_view = self.interpreter.tensor(self.input_index)()
+        scratch = self.resize_buffer
+        for i, tile_img in enumerate(tile_images):
+            cv2.resize(tile_img, (self.input_w, self.input_h), dst=scratch)
+            # mode="clip" lets take() write into `out` unbuffered; uint8
+            # indices are always within the 256-entry table anyway.
+            np.take(self.input_lut, scratch, out=input_view[i], mode="clip")
+        del input_view
+
+    def probabilities(self) -> np.ndarray:
+        """The output tensor as float class probabilities, dequantized for
+        full-integer models."""
+        output_data = self.interpreter.get_tensor(self.output_index)
+        if self.output_quantization is None:
+            return output_data
+        scale, zero_point = self.output_quantization
+        return (output_data.astype(np.float32) - zero_point) * scale
+
+
+class _InterpreterPool(Generic[_PoolItem]):
+    """Bounded pool of TFLite interpreters with checkout/return semantics.
+
+    TFLite interpreters are not thread-safe, and recognition runs both on
+    the RecognitionJobManager thread pool and on synchronous request
+    threads. Each checkout gets exclusive use of one interpreter;
+    interpreters are created lazily (up to `max_size`) the first time every
+    existing one is busy, and a caller beyond `max_size` blocks until one is
+    returned. Time spent waiting for a checkout is recorded in
+    `recognition_metrics` under `wait_metric`."""
+
+    def __init__(
+        self, factory: Callable[[], _PoolItem], max_size: int, wait_metric: str = "tflite_pool_wait",
+    ) -> None:
+        self._factory = factory
+        self._max_size = max(1, max_size)
+        self._wait_metric = wait_metric
+        self._idle: list[_PoolItem] = []
+        self._created = 0
+        self._in_use = 0
+        self._waits = 0
+        self._cond = Condition()
+
+    @contextmanager
+    def checkout(self) -> Iterator[_PoolItem]:
+        started = time.perf_counter()
+        item: _PoolItem | None = None
+        with self._cond:
+            if not self._idle and self._created >= self._max_size:
+                self._waits += 1
+            while not self._idle and self._created >= self._max_size:
+                self._cond.wait()
+            if self._idle:
+                item = self._idle.pop()
+            else:
+                self._created += 1
+            self._in_use += 1
+        if item is None:
+            try:
+                item = self._factory()
+            except BaseException:
+                with self._cond:
+                    self._created -= 1
+                    self._in_use -= 1
+                    self._cond.notify()
+                raise
+        recognition_metrics.record_timing(self._wait_metric, time.perf_counter() - started)
+        try:
+            yield item
+        finally:
+            with self._cond:
+                self._idle.append(item)
+                self._in_use -= 1
+                self._cond.notify()
+
+    def warm(self, prepare: Callable[[_PoolItem], None] | None = None) -> None:
+        """Create every interpreter the pool may hold, running `prepare` on
+        each, so no checkout pays for creation. Meant for a pool nobody has
+        checked out of yet (see install_model)."""
+        items = [self._factory() for _ in range(self._max_size - self._created)]
+        if prepare is not None:
+            for item in items:
+                prepare(item)
+        with self._cond:
+            self._idle.extend(items)
+            self._created += len(items)
+            self._cond.notify_all()
+
+    def stats(self) -> dict[str, int]:
+        with self._cond:
+            return {
+                "max_size": self._max_size,
+                "created": self._created,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "waits": self._waits,
+            }
+
+
+@dataclass
+class _LoadedModel:
+    """One served classifier: labels and interpreter pool are swapped
+    together (see install_model), never individually."""
+
+    version: str
+    labels: list[str]
+    pool: _InterpreterPool[_PooledInterpreter]
+
+
+_model: _LoadedModel | None = None
+_load_lock = Lock()
+
+
+def _model_path(model_dir: Path = _MODEL_DIR) -> Path:
+    """The classifier to serve: the gated int8 export when present and
+    enabled (see ml/train.py), otherwise the float16 model."""
+    int8_path = model_dir / _TFLITE_INT8_PATH.name
+    if settings.tflite_use_int8 and int8_path.exists():
+        return int8_path
+    return model_dir / _TFLITE_PATH.name
+
+
+def _file_version(path: Path) -> str:
+    try:
+        stat = path.stat()
+    except OSError:
+        return "none"
+    return f"{path.name}:{stat.st_size}:{stat.st_mtime_ns}"
 
-def _load_model() -> None:
-    """Lazily load the TFLite interpreter and labels."""
-    global _interpreter, _labels
 
-    if _interpreter is not None:
-        return
+def model_version() -> str:
+    """Identifies the served classifier, so callers can key caches on it:
+    the installed version (see install_model), else the bundled file's
+    name/size/mtime; "none" without a model."""
+    model = _model
+    if model is not None:
+        return model.version
+    return _file_version(_model_path())
 
-    if not _TFLITE_PATH.exists() or not _LABELS_PATH.exists():
-        raise FileNotFoundError(f"TFLite model not found at {_TFLITE_PATH}")
 
+def _new_interpreter(model_path: Path) -> _PooledInterpreter:
     try:
         import tflite_runtime.interpreter as tflite
-        _interpreter = tflite.Interpreter(model_path=str(_TFLITE_PATH))
+        interpreter = tflite.Interpreter(model_path=str(model_path))
     except ImportError:
         import tensorflow as tf
-        _interpreter = tf.lite.Interpreter(model_path=str(_TFLITE_PATH))
+        interpreter = tf.lite.Interpreter(model_path=str(model_path))
+
+    interpreter.allocate_tensors()
+    return _PooledInterpreter(interpreter)
+
+
+def _build_model(model_dir: Path, version: str | None = None) -> _LoadedModel:
+    model_path = _model_path(model_dir)
+    labels_path = model_dir / _LABELS_PATH.name
+    if not model_path.exists() or not labels_path.exists():
+        raise FileNotFoundError(f"TFLite model not found at {model_path}")
+    pool = _InterpreterPool(lambda: _new_interpreter(model_path), settings.tflite_interpreter_pool_size)
+    return _LoadedModel(
+        version=version or _file_version(model_path),
+        labels=labels_path.read_text().strip().splitlines(),
+        pool=pool,
+    )
 
-    _interpreter.allocate_tensors()
-    _labels = _LABELS_PATH.read_text().strip().splitlines()
 
+def _load_model() -> None:
+    """Lazily set up the bundled model (ml/output) unless one was already
+    loaded or installed. Interpreters themselves are created on first
+    checkout (see _InterpreterPool)."""
+    global _model
+
+    if _model is not None:
+        return
 
-def _classify_tile(tile_img: np.ndarray) -> tuple[str, float]:
-    """Classify a single tile image. Returns (label, confidence)."""
+    with _load_lock:
+        if _model is not None:
+            return
+        _model = _build_model(_MODEL_DIR)
+        logger.info("TFLite classifier: %s", _model.version)
+
+
+def install_model(model_dir: Path, version: str) -> None:
+    """Load the classifier in `model_dir`, warm every interpreter of its
+    pool (allocated and run once at hand-sized batch), then swap it in as
+    the served model, so requests right after the swap don't pay for
+    interpreter creation. Requests already classifying finish on the
+    interpreter they checked out of the previous pool, which is dropped
+    once they return it. Raises (leaving the current model in place) if
+    the files are missing or an interpreter can't be built."""
+    global _model
+
+    model = _build_model(model_dir, version)
+    model.pool.warm(_warm_interpreter)
+    with _load_lock:
+        _model = model
+    logger.info("TFLite classifier installed: %s", version)
+
+
+def _warm_interpreter(pooled: _PooledInterpreter) -> None:
+    pooled.ensure_batch_size(max(_HAND_SIZES))
+    pooled.interpreter.invoke()
+
+
+def interpreter_pool_stats() -> dict[str, int] | None:
+    """Checkout/creation counters of the interpreter pool, or None if the
+    model has not been loaded yet."""
+    model = _model
+    return model.pool.stats() if model is not None else None
+
+
+def _classify_tiles_top_k(
+    tile_images: list[np.ndarray], top_k: int, cumulative: float,
+) -> list[list[tuple[str, float]]]:
+    """Per input crop, the most probable (label, probability) pairs, best
+    first: at most `top_k`, stopping once their probabilities sum to
+    `cumulative` (always at least one).
+
+    The interpreter's input is resized to batch N only when N differs from
+    the batch it was last allocated for (13 vs 14 tiles), and all crops are
+    written into that one (N x H x W x 3) input tensor (see
+    _PooledInterpreter.fill_input) instead of N separate set_tensor/invoke
+    round-trips."""
     _load_model()
-    assert _interpreter is not None
-
-    input_details = _interpreter.get_input_details()
-    output_details = _interpreter.get_output_details()
-
-    # Resize to model input size (224x224)
-    h, w = input_details[0]["shape"][1], input_details[0]["shape"][2]
-    resized = cv2.resize(tile_img, (w, h))
-    input_data = np.expand_dims(resized, axis=0).astype(np.float32) / 127.5 - 1.0
-
-    _interpreter.set_tensor(input_details[0]["index"], input_data)
-    _interpreter.invoke()
-    output_data = _interpreter.get_tensor(output_details[0]["index"])[0]
-
-    idx = int(np.argmax(output_data))
-    confidence = float(output_data[idx])
-    label = _labels[idx] if idx < len(_labels) else "unknown"
-    return label, confidence
-
-
-def _find_local_maxima(seg: np.ndarray, prominence: float = 0.02) -> list[int]:
-    """Find interior local-maxima indices in a 1-D array with a simple
-    prominence filter against the nearest valleys on each side. Avoids a
-    scipy dependency (scipy is not in requirements.txt)."""
-    peaks: list[int] = []
-    for i in range(1, len(seg) - 1):
-        if seg[i] > seg[i - 1] and seg[i] >= seg[i + 1]:
-            left_min = seg[max(0, i - 10):i].min()
-            right_min = seg[i + 1:i + 11].min() if i + 1 < len(seg) else seg[i]
-            if seg[i] - max(left_min, right_min) >= prominence:
-                peaks.append(i)
-    return peaks
-
-
-def _estimate_pitch(profile: np.ndarray, dim: int) -> tuple[int | None, float]:
-    """Detect the repeat period (tile pitch) in a 1-D white-fraction profile
-    via autocorrelation. Returns (pitch_px, confidence), or (None, 0.0) if no
-    genuine interior periodicity is found (i.e. this blob is a single tile)."""
-    sig = profile - profile.mean()
-    if sig.std() < 1e-6:
-        return None, 0.0
-    ac = np.correlate(sig, sig, mode="full")
-    ac = ac[len(ac) // 2:]
-    if ac[0] <= 0:
-        return None, 0.0
-    ac = ac / ac[0]
-    lo, hi = max(3, dim // 20), max(3, dim // 2)
-    if hi <= lo + 2:
-        return None, 0.0
-    seg = ac[lo:hi]
-    peaks = _find_local_maxima(seg, prominence=0.02)
-    if not peaks:
-        return None, 0.0
-    tallest = peaks[int(np.argmax(seg[peaks]))]
-    tallest_val = seg[tallest]
-
-    # The tallest autocorrelation peak is occasionally a harmonic (2x, 3x the
-    # true tile pitch) rather than the fundamental. Only override it with a
-    # sub-divided candidate when that candidate is ALSO an independently
-    # qualifying peak (passed its own prominence check) and nearly as strong
-    # as the tallest peak — this avoids mistaking a merely-present but weaker
-    # harmonic for the true fundamental, which over-splits well-behaved cases.
-    best = tallest
-    for divisor in range(2, 7):
-        candidate_target = tallest / divisor
-        if candidate_target < 1:
-            break
-        nearby = [p for p in peaks if abs(p - candidate_target) <= max(1, 0.1 * candidate_target)]
-        if not nearby:
-            continue
-        candidate = max(nearby, key=lambda p: seg[p])
-        if seg[candidate] >= 0.85 * tallest_val:
-            best = candidate
+    model = _model  # one snapshot: a concurrent install_model can't mix labels and pool
+    assert model is not None
 
-    return lo + best, float(ac[lo + best])
+    if not tile_images:
+        return []
+
+    with model.pool.checkout() as pooled:
+        pooled.ensure_batch_size(len(tile_images))
+        pooled.fill_input(tile_images)
+        pooled.interpreter.invoke()
+        output_data = pooled.probabilities()
+
+    labels = model.labels
+    k = max(1, min(top_k, output_data.shape[1]))
+    top = np.argpartition(-output_data, k - 1, axis=1)[:, :k]
+    top_probs = np.take_along_axis(output_data, top, axis=1)
+    order = np.argsort(-top_probs, axis=1, kind="stable")
+    top = np.take_along_axis(top, order, axis=1)
+    top_probs = np.take_along_axis(top_probs, order, axis=1)
+    # Keep candidate j while the mass of candidates before it is < cutoff.
+    mass_before = np.cumsum(top_probs, axis=1) - top_probs
+    keep = mass_before < cumulative
+    keep[:, 0] = True
+
+    results: list[list[tuple[str, float]]] = []
+    for indices, probs, kept in zip(top.tolist(), top_probs.tolist(), keep.tolist()):
+        results.append([
+            (labels[idx] if idx < len(labels) else "unknown", prob)
+            for idx, prob, keep_it in zip(indices, probs, kept)
+            if keep_it
+        ])
+    return results
 
 
 _CENTERLINE_ROW_COVERAGE_THRESHOLD = 0.15
@@ -174,38 +405,53 @@ def _blob_centerline(
     if not vertical:
         sub = sub.T
     run_dim, cross_dim = sub.shape
-
-    centers = np.full(run_dim, np.nan)
-    widths: list[float] = []
-    cross_idx = np.arange(cross_dim)
-    for r in range(run_dim):
-        xs = cross_idx[sub[r]]
-        if xs.size < _CENTERLINE_ROW_COVERAGE_THRESHOLD * cross_dim:
-            continue
-        centers[r] = (x if vertical else y) + float(np.median(xs))
-        widths.append(float(xs[-1] - xs[0] + 1))
-
-    extent = float(np.median(widths)) if widths else float(cross_dim)
-
-    valid_idx = np.flatnonzero(~np.isnan(centers))
-    if valid_idx.size == 0:
-        fallback = (x if vertical else y) + cross_dim / 2
-        return np.full(run_dim, fallback), extent
-
-    # np.interp clamps to the boundary value outside [valid_idx[0],
-    # valid_idx[-1]] by default, i.e. edge-hold before the first / after the
-    # last valid row, and linearly interpolates the gaps in between.
-    all_idx = np.arange(run_dim)
-    centers = np.interp(all_idx, valid_idx, centers[valid_idx])
-
-    half = _CENTERLINE_SMOOTH_WINDOW // 2
-    smoothed = np.empty(run_dim)
-    for r in range(run_dim):
-        lo = max(0, r - half)
-        hi = min(run_dim, r + half + 1)
-        smoothed[r] = np.median(centers[lo:hi])
-
-    return smoothed, extent
+    offset = x if vertical else y
+
+    # Per-row median of the covered column indices, without a Python loop:
+    # the k-th covered column (0-based) of a row is the number of columns
+    # whose running count of covered pixels is still <= k. The median is the
+    # mean of the (c-1)//2-th and c//2-th covered columns (equal for odd c).
+    counts = sub.sum(axis=1)
+    trusted = (counts > 0) & (counts >= _CENTERLINE_ROW_COVERAGE_THRESHOLD * cross_dim)
+    rows = np.flatnonzero(trusted)
+    if rows.size == 0:
+        fallback = offset + cross_dim / 2
+        return np.full(run_dim, fallback), float(cross_dim)
+
+    covered = sub[rows]
+    running = np.cumsum(covered, axis=1, dtype=np.int32)
+    row_counts = counts[rows]
+    lower = ((running <= ((row_counts - 1) // 2)[:, None]).sum(axis=1))
+    upper = ((running <= (row_counts // 2)[:, None]).sum(axis=1))
+    first = np.argmax(covered, axis=1)
+    last = cross_dim - 1 - np.argmax(covered[:, ::-1], axis=1)
+
+    extent = float(np.median((last - first + 1).astype(np.float64)))
+
+    # np.interp clamps to the boundary value outside [rows[0], rows[-1]] by
+    # default, i.e. edge-hold before the first / after the last valid row,
+    # and linearly interpolates the gaps in between.
+    centers = np.interp(np.arange(run_dim), rows, offset + (lower + upper) / 2)
+
+    return _moving_median(centers, _CENTERLINE_SMOOTH_WINDOW), extent
+
+
+def _moving_median(values: np.ndarray, window: int) -> np.ndarray:
+    """Centered moving median whose window is truncated at the array ends
+    (so the first/last window//2 outputs use fewer samples). Interior
+    windows are evaluated together through a sliding-window view; only the
+    truncated edge windows are computed individually."""
+    n = values.size
+    half = window // 2
+    smoothed = np.empty(n)
+    if n >= window:
+        smoothed[half:n - half] = np.median(np.lib.stride_tricks.sliding_window_view(values, window), axis=1)
+        edges = [*range(half), *range(n - half, n)]
+    else:
+        edges = range(n)
+    for r in edges:
+        smoothed[r] = np.median(values[max(0, r - half):min(n, r + half + 1)])
+    return smoothed
 
 
 def _blob_pitch(
@@ -223,7 +469,7 @@ def _blob_pitch(
     else:
         profile = sub.mean(axis=0)
         dim = w
-    pitch, confidence = _estimate_pitch(profile, dim)
+    pitch, confidence = estimate_pitch(profile, dim)
     return pitch, confidence, dim
 
 
@@ -256,6 +502,55 @@ def _pitch_count_costs(dim: float, pitches: list[float]) -> dict[int, float]:
     return costs
 
 
+def _min_cost_combination(per_blob_costs: list[dict[int, float]]) -> tuple[list[int] | None, float]:
+    """Pick one tile count per blob (from that blob's {n: cost} options) so
+    the counts sum to a valid hand size at minimum total cost. Returns
+    (counts, cost), or (None, inf) when no combination reaches 13 or 14.
+
+    Knapsack-style dynamic program over (blob index, running tile total
+    <= 14): after each blob, `frontier[t]` holds the cheapest way to reach
+    total t, and a back-pointer per (blob, total) records the count chosen
+    and the total it came from, so the work is O(blobs x 15 x options)
+    instead of exponential in the number of blobs (cluttered photos can
+    produce many). Cost ties go to the lexicographically first sequence of
+    per-blob options in dict order — the same combination an exhaustive
+    depth-first search in that order keeps. Sequences reaching one blob are
+    all the same length, so that order is tracked as each state's rank
+    among its step's states rather than by comparing whole sequences."""
+    max_total = max(_HAND_SIZES)
+    # total -> (cost, lexicographic rank of its option sequence)
+    frontier: dict[int, tuple[float, int]] = {0: (0.0, 0)}
+    # per blob: total -> (previous total, count chosen for this blob)
+    back_pointers: list[dict[int, tuple[int, int]]] = []
+    for costs in per_blob_costs:
+        # reached -> (cost, previous rank, option index, previous total, count)
+        next_frontier: dict[int, tuple[float, int, int, int, int]] = {}
+        for total, (cost_so_far, rank) in frontier.items():
+            for k, (n, cost) in enumerate(costs.items()):
+                reached = total + n
+                if reached > max_total:
+                    continue
+                candidate = (cost_so_far + cost, rank, k, total, n)
+                incumbent = next_frontier.get(reached)
+                if incumbent is None or candidate[:3] < incumbent[:3]:
+                    next_frontier[reached] = candidate
+        by_sequence = sorted(next_frontier, key=lambda t: next_frontier[t][1:3])
+        frontier = {t: (next_frontier[t][0], rank) for rank, t in enumerate(by_sequence)}
+        back_pointers.append({t: (state[3], state[4]) for t, state in next_frontier.items()})
+
+    finals = [t for t in _HAND_SIZES if t in frontier]
+    if not finals:
+        return None, float("inf")
+    total = min(finals, key=lambda t: frontier[t])
+    cost = frontier[total][0]
+    chosen: list[int] = []
+    for pointers in reversed(back_pointers):
+        total, n = pointers[total]
+        chosen.append(n)
+    chosen.reverse()
+    return chosen, cost
+
+
 def _resolve_tile_counts(
     dims: list[float], blob_pitches: list[tuple[int | None, float, int]],
 ) -> list[int]:
@@ -286,23 +581,7 @@ def _resolve_tile_counts(
             costs[0] = max(_DROP_MIN_COST, _DROP_COST_MULTIPLIER * min(costs.values()))
         per_blob_costs.append(costs)
 
-    best_combo: list[int] | None = None
-    best_cost = float("inf")
-
-    def _search(i: int, chosen: list[int], cost_so_far: float) -> None:
-        nonlocal best_combo, best_cost
-        if cost_so_far >= best_cost:
-            return
-        if i == len(per_blob_costs):
-            if sum(chosen) in _HAND_SIZES:
-                best_combo, best_cost = list(chosen), cost_so_far
-            return
-        for n, cost in per_blob_costs[i].items():
-            if sum(chosen) + n > max(_HAND_SIZES):
-                continue
-            _search(i + 1, chosen + [n], cost_so_far + cost)
-
-    _search(0, [], 0.0)
+    best_combo, best_cost = _min_cost_combination(per_blob_costs)
 
     if best_combo is not None and best_cost <= _MAX_TOTAL_COST:
         return best_combo
@@ -320,25 +599,87 @@ def _resolve_tile_counts(
     return resolved
 
 
+def _white_mask(image: np.ndarray) -> np.ndarray:
+    """HSV white-pixel mask: low saturation, high value."""
+    hsv = cv2.cvtColor(image, cv2.COLOR_RGB2HSV)
+    lower_white = np.array([0, 0, 160])
+    upper_white = np.array([180, 80, 255])
+    return cv2.inRange(hsv, lower_white, upper_white)
+
+
+def _segmentation_scale(image_h: int, image_w: int, max_side: int) -> float:
+    """Downscale factor for the coarse segmentation pass: shrink so the long
+    side is at most `max_side` (never upscale; 0 disables)."""
+    long_side = max(image_h, image_w)
+    if max_side <= 0 or long_side <= max_side:
+        return 1.0
+    return max_side / long_side
+
+
+def _to_full_resolution(
+    blob: tuple[int, int, int, int, int], scale: float, image_h: int, image_w: int,
+) -> tuple[int, int, int, int]:
+    """Map a blob's (x, y, w, h, area) bbox found on the downscaled copy back
+    to an (x, y, w, h) bbox in full-resolution pixels, rounding outwards."""
+    x, y, w, h, _area = blob
+    if scale == 1.0:
+        return int(x), int(y), int(w), int(h)
+    x0 = max(0, int(np.floor(x / scale)))
+    y0 = max(0, int(np.floor(y / scale)))
+    x1 = min(image_w, int(np.ceil((x + w) / scale)))
+    y1 = min(image_h, int(np.ceil((y + h) / scale)))
+    return x0, y0, x1 - x0, y1 - y0
+
+
+def _centerline_to_full_resolution(
+    centers: np.ndarray, extent: float, scale: float, run: tuple[int, int, int],
+) -> tuple[np.ndarray, float]:
+    """Resample a centerline computed on the downscaled mask onto the
+    full-resolution run axis. `run` is (full_start, small_start, full_len)
+    along the run axis; center values are absolute cross-axis coordinates
+    and are rescaled along with the extent."""
+    full_start, small_start, full_len = run
+    positions = (full_start + np.arange(full_len) + 0.5) * scale - 0.5 - small_start
+    resampled = np.interp(positions, np.arange(centers.size), centers)
+    return (resampled + 0.5) / scale - 0.5, extent / scale
+
+
 def _segment_tiles(image: np.ndarray) -> list[np.ndarray]:
     """Crop each box from `_segment_tile_boxes(image)` out of `image`. See
     that function for the segmentation algorithm itself; this thin wrapper
-    exists only so callers that just want classifiable tile images (the
-    only production use so far) don't have to do the cropping themselves."""
+    exists only so callers that just want classifiable tile images don't
+    have to do the cropping themselves."""
+    return _crop_boxes(image, _segment_tile_boxes(image))
+
+
+def _crop_boxes(image: np.ndarray, boxes: list[tuple[int, int, int, int]]) -> list[np.ndarray]:
+    """Views of `image` for each non-empty (sy, ey, sx, ex) box."""
     tiles: list[np.ndarray] = []
-    for sy, ey, sx, ex in _segment_tile_boxes(image):
+    for sy, ey, sx, ex in boxes:
         tile_img = image[sy:ey, sx:ex]
         if tile_img.shape[0] > 0 and tile_img.shape[1] > 0:
             tiles.append(tile_img)
     return tiles
 
 
-def _segment_tile_boxes(image: np.ndarray) -> list[tuple[int, int, int, int]]:
+def _segment_tile_boxes(
+    image: np.ndarray, max_side: int | None = None,
+) -> list[tuple[int, int, int, int]]:
     """Segment individual tiles from a single linear run (horizontal row or
     vertical stack) using connected-component analysis plus pitch detection.
     Returns each tile's box as (sy, ey, sx, ex) in `image`'s own pixel
     coordinate space.
 
+    Blob finding (steps 1-5 and the centerline in step 7) runs on a copy
+    downscaled so its long side is at most `max_side` (default
+    settings.segmentation_max_side), since a full-resolution phone photo
+    carries far more pixels than finding a handful of white blobs needs.
+    Pitch detection (step 6) needs the thin seams between touching tiles,
+    which downscaling blurs away, so by default it re-reads the raw mask at
+    full resolution — but only inside each kept blob's bounding box
+    (settings.segmentation_refine_pitch). Boxes are mapped back to full
+    resolution, so callers crop from the original image.
+
     Steps:
     1. HSV white-pixel mask (kept raw, pre-morphology, for later pitch
        detection) + morphological cleanup for connected-component finding
@@ -358,29 +699,37 @@ def _segment_tile_boxes(image: np.ndarray) -> list[tuple[int, int, int, int]]:
        blob's fixed bbox, so a curved (non-straight, bent) row doesn't
        drift slots away from the true tiles
     """
-    hsv = cv2.cvtColor(image, cv2.COLOR_RGB2HSV)
+    image_h, image_w = image.shape[:2]
+    if max_side is None:
+        max_side = settings.segmentation_max_side
+    scale = _segmentation_scale(image_h, image_w, max_side)
+    with timed_stage("mask"):
+        if scale < 1.0:
+            small_size = (max(1, round(image_w * scale)), max(1, round(image_h * scale)))
+            small = cv2.resize(image, small_size, interpolation=cv2.INTER_AREA)
+        else:
+            small = image
+        small_h, small_w = small.shape[:2]
 
-    # White pixel mask: low saturation, high value
-    lower_white = np.array([0, 0, 160])
-    upper_white = np.array([180, 80, 255])
-    mask_raw = cv2.inRange(hsv, lower_white, upper_white)
+        mask_raw = _white_mask(small)
 
     # Morphological cleanup (component-finding only; mask_raw is kept intact
     # for pitch detection, since CLOSE bridges the thin gaps between tiles)
-    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5))
-    mask = cv2.morphologyEx(mask_raw, cv2.MORPH_CLOSE, kernel)
-    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
+    with timed_stage("morphology"):
+        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5))
+        mask = cv2.morphologyEx(mask_raw, cv2.MORPH_CLOSE, kernel)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
 
     # Connected components
-    num_labels, _labels, stats, _ = cv2.connectedComponentsWithStats(mask)
+    with timed_stage("connected_components"):
+        num_labels, _labels, stats, _ = cv2.connectedComponentsWithStats(mask)
     if num_labels <= 1:
         return []
 
-    image_h, image_w = image.shape[:2]
-    image_area = image_h * image_w
-    min_area = max(300, int(0.003 * image_area))
-    min_dim_w = 0.015 * image_w
-    min_dim_h = 0.015 * image_h
+    small_area = small_h * small_w
+    min_area = max(300 * scale * scale, int(0.003 * small_area))
+    min_dim_w = 0.015 * small_w
+    min_dim_h = 0.015 * small_h
 
     components: list[tuple[int, int, int, int, int]] = []  # x, y, w, h, area
     for i in range(1, num_labels):  # skip background (label 0)
@@ -434,12 +783,29 @@ def _segment_tile_boxes(image: np.ndarray) -> list[tuple[int, int, int, int]]:
     # single blob's own signal can resolve alone (harmonic-locked
     # autocorrelation, or a blob with no periodicity of its own, e.g. an
     # unrelated object in frame).
-    blob_pitches = [_blob_pitch(mask_raw, x, y, w, h, vertical) for x, y, w, h, _area in kept]
+    blobs = [
+        (small_blob, _to_full_resolution(small_blob, scale, image_h, image_w))
+        for small_blob in kept
+    ]
+    with timed_stage("pitch"):
+        if scale == 1.0:
+            blob_pitches = [_blob_pitch(mask_raw, x, y, w, h, vertical) for x, y, w, h, _area in kept]
+        elif settings.segmentation_refine_pitch:
+            blob_pitches = []
+            for _small_blob, (x, y, w, h) in blobs:
+                region_mask = _white_mask(image[y:y + h, x:x + w])
+                blob_pitches.append(_blob_pitch(region_mask, 0, 0, w, h, vertical))
+        else:
+            blob_pitches = []
+            for (bx, by, bw, bh, _area), (_x, _y, w, h) in blobs:
+                pitch, confidence, _dim = _blob_pitch(mask_raw, bx, by, bw, bh, vertical)
+                blob_pitches.append((pitch / scale if pitch else None, confidence, h if vertical else w))
     dims = [dim for _p, _c, dim in blob_pitches]
-    tile_counts = _resolve_tile_counts(dims, blob_pitches)
+    with timed_stage("counts"):
+        tile_counts = _resolve_tile_counts(dims, blob_pitches)
 
     boxes: list[tuple[int, int, int, int]] = []
-    for (x, y, w, h, _area), n_sub in zip(kept, tile_counts):
+    for ((bx, by, bw, bh, _area), (x, y, w, h)), n_sub in zip(blobs, tile_counts):
         if n_sub <= 0:
             continue
 
@@ -447,7 +813,11 @@ def _segment_tile_boxes(image: np.ndarray) -> list[tuple[int, int, int, int]]:
         # centerline (see _blob_centerline) rather than the blob's own
         # fixed bbox, so a curved (non-straight) tile row doesn't drift
         # slots away from the true tiles.
-        centers, extent = _blob_centerline(mask, x, y, w, h, vertical)
+        centers, extent = _blob_centerline(mask, bx, by, bw, bh, vertical)
+        if scale < 1.0:
+            centers, extent = _centerline_to_full_resolution(
+                centers, extent, scale, (y, by, h) if vertical else (x, bx, w),
+            )
         half_extent = extent / 2
 
         if vertical:
@@ -480,12 +850,336 @@ def _segment_tile_boxes(image: np.ndarray) -> list[tuple[int, int, int, int]]:
     return boxes
 
 
-def recognize_tiles_local(image_bytes: bytes) -> dict[str, Any] | None:
+def _nms(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float) -> list[int]:
+    """Greedy non-maximum suppression. `boxes` is (N, 4) as (x1, y1, x2, y2).
+    Returns kept indices, highest score first."""
+    order = np.argsort(-scores, kind="stable")
+    areas = np.maximum(0.0, boxes[:, 2] - boxes[:, 0]) * np.maximum(0.0, boxes[:, 3] - boxes[:, 1])
+    keep: list[int] = []
+    while order.size:
+        i = int(order[0])
+        keep.append(i)
+        rest = order[1:]
+        ix1 = np.maximum(boxes[i, 0], boxes[rest, 0])
+        iy1 = np.maximum(boxes[i, 1], boxes[rest, 1])
+        ix2 = np.minimum(boxes[i, 2], boxes[rest, 2])
+        iy2 = np.minimum(boxes[i, 3], boxes[rest, 3])
+        inter = np.maximum(0.0, ix2 - ix1) * np.maximum(0.0, iy2 - iy1)
+        union = areas[i] + areas[rest] - inter
+        iou = np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+        order = rest[iou <= iou_threshold]
+    return keep
+
+
+class _SegmentationBackend(Protocol):
+    name: str
+
+    def segment_boxes(self, image: np.ndarray) -> list[tuple[int, int, int, int]]:
+        """Individual tile boxes, as (sy, ey, sx, ex) in `image`'s pixel
+        space and in reading order along the run, in an RGB image."""
+
+
+class _ConnectedComponentsBackend:
+    """Classic-CV white-blob segmentation (see _segment_tile_boxes)."""
+
+    name = "connected_components"
+
+    def segment_boxes(self, image: np.ndarray) -> list[tuple[int, int, int, int]]:
+        return _segment_tile_boxes(image)
+
+
+class _YoloInterpreter:
+    """A YOLOv8 detector interpreter and its tensor metadata, resolved once."""
+
+    def __init__(self, interpreter: Any) -> None:
+        self.interpreter = interpreter
+        input_detail = interpreter.get_input_details()[0]
+        output_detail = interpreter.get_output_details()[0]
+        self.input_index = int(input_detail["index"])
+        self.output_index = int(output_detail["index"])
+        _, self.input_h, self.input_w, _ = (int(d) for d in input_detail["shape"])
+        self.letterbox = np.empty((self.input_h, self.input_w, 3), dtype=np.uint8)
+
+
+class _YoloTFLiteBackend:
+    """YOLOv8n tile detector (ml/yolo, exported as tile_detector.tflite).
+
+    The image is letterboxed to the model's square input (aspect preserved,
+    padded with gray 114 as in Ultralytics), detections below
+    `conf_threshold` are dropped, overlapping ones suppressed with NumPy
+    NMS, and at most 14 of the highest-scoring boxes are kept. Boxes are
+    returned in reading order along the run axis, decided — as for the
+    connected-components backend — from the spread of all detections."""
+
+    name = "yolo_tflite"
+
+    def __init__(
+        self, model_path: Path, conf_threshold: float = 0.25, iou_threshold: float = 0.5,
+    ) -> None:
+        self._model_path = model_path
+        self._conf_threshold = conf_threshold
+        self._iou_threshold = iou_threshold
+        self._pool: _InterpreterPool[_YoloInterpreter] | None = None
+        self._pool_lock = Lock()
+
+    def _new_interpreter(self) -> _YoloInterpreter:
+        if not self._model_path.exists():
+            raise FileNotFoundError(f"TFLite detector not found at {self._model_path}")
+        try:
+            import tflite_runtime.interpreter as tflite
+            interpreter = tflite.Interpreter(model_path=str(self._model_path))
+        except ImportError:
+            import tensorflow as tf
+            interpreter = tf.lite.Interpreter(model_path=str(self._model_path))
+        interpreter.allocate_tensors()
+        return _YoloInterpreter(interpreter)
+
+    def _get_pool(self) -> _InterpreterPool[_YoloInterpreter]:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = _InterpreterPool(
+                    self._new_interpreter, settings.tflite_interpreter_pool_size,
+                    wait_metric="tflite_detector_pool_wait",
+                )
+            return self._pool
+
+    def segment_boxes(self, image: np.ndarray) -> list[tuple[int, int, int, int]]:
+        image_h, image_w = image.shape[:2]
+        with self._get_pool().checkout() as det:
+            ratio = min(det.input_w / image_w, det.input_h / image_h)
+            new_w, new_h = max(1, round(image_w * ratio)), max(1, round(image_h * ratio))
+            pad_x, pad_y = (det.input_w - new_w) // 2, (det.input_h - new_h) // 2
+            det.letterbox.fill(114)
+            cv2.resize(
+                image, (new_w, new_h), dst=det.letterbox[pad_y:pad_y + new_h, pad_x:pad_x + new_w],
+                interpolation=cv2.INTER_AREA,
+            )
+            det.interpreter.set_tensor(
+                det.input_index, (det.letterbox[np.newaxis].astype(np.float32) / 255.0),
+            )
+            det.interpreter.invoke()
+            output = det.interpreter.get_tensor(det.output_index)[0]
+            input_w, input_h = det.input_w, det.input_h
+
+        # YOLOv8 exports (4 + num_classes, anchors); some converters emit the
+        # transpose. Anchors always outnumber channels.
+        if output.shape[0] < output.shape[1]:
+            output = output.T
+        xywh = output[:, :4].astype(np.float64)
+        scores = output[:, 4:].max(axis=1).astype(np.float64)
+        selected = scores >= self._conf_threshold
+        xywh, scores = xywh[selected], scores[selected]
+        if scores.size == 0:
+            return []
+        # Ultralytics' TFLite export normalizes coordinates to [0, 1].
+        if xywh.max() <= 2.0:
+            xywh *= np.array([input_w, input_h, input_w, input_h])
+        corners = np.column_stack([
+            xywh[:, 0] - xywh[:, 2] / 2, xywh[:, 1] - xywh[:, 3] / 2,
+            xywh[:, 0] + xywh[:, 2] / 2, xywh[:, 1] + xywh[:, 3] / 2,
+        ])
+        keep = _nms(corners, scores, self._iou_threshold)[:max(_HAND_SIZES)]
+        corners = corners[keep]
+
+        # Undo the letterbox.
+        corners -= np.array([pad_x, pad_y, pad_x, pad_y])
+        corners /= ratio
+        corners[:, [0, 2]] = corners[:, [0, 2]].clip(0, image_w)
+        corners[:, [1, 3]] = corners[:, [1, 3]].clip(0, image_h)
+
+        centers_x = (corners[:, 0] + corners[:, 2]) / 2
+        centers_y = (corners[:, 1] + corners[:, 3]) / 2
+        vertical = np.ptp(centers_y) >= np.ptp(centers_x)
+        order = np.argsort(centers_y if vertical else centers_x, kind="stable")
+
+        boxes: list[tuple[int, int, int, int]] = []
+        for x1, y1, x2, y2 in corners[order]:
+            sx, sy, ex, ey = round(x1), round(y1), round(x2), round(y2)
+            if ex > sx and ey > sy:
+                boxes.append((sy, ey, sx, ex))
+        return boxes
+
+
+_SEGMENTATION_BACKENDS: dict[str, _SegmentationBackend] = {
+    backend.name: backend
+    for backend in (_ConnectedComponentsBackend(), _YoloTFLiteBackend(_DETECTOR_PATH))
+}
+
+
+def segmentation_backend_names() -> list[str]:
+    """Names accepted as `segmentation_backend` by the recognize functions."""
+    return list(_SEGMENTATION_BACKENDS)
+
+
+def _segmentation_backend(name: str | None) -> _SegmentationBackend:
+    """Look up a backend by name, defaulting to settings.segmentation_backend."""
+    name = name or settings.segmentation_backend
+    backend = _SEGMENTATION_BACKENDS.get(name)
+    if backend is None:
+        raise ValueError(f"unknown segmentation backend: {name}")
+    return backend
+
+
+def _segment_tile_images(
+    image: np.ndarray, backend: _SegmentationBackend,
+) -> tuple[list[tuple[int, int, int, int]], list[np.ndarray]]:
+    """`backend`'s boxes and their crops out of `image`, recording the
+    backend's latency in `recognition_metrics` as "segmentation.<name>"."""
+    started = time.perf_counter()
+    boxes = backend.segment_boxes(image)
+    recognition_metrics.record_timing(f"segmentation.{backend.name}", time.perf_counter() - started)
+    with timed_stage("crop"):
+        return boxes, _crop_boxes(image, boxes)
+
+
+_HAND_REGION_MARGIN = 0.15
+
+
+def _hand_region(
+    boxes: list[tuple[int, int, int, int]], image_h: int, image_w: int,
+) -> tuple[int, int, int, int] | None:
+    """(sy, ey, sx, ex) around all tile boxes, padded by a fraction of the
+    tile height on every side (tiles are roughly as tall as the hand row),
+    clamped to the image."""
+    if not boxes:
+        return None
+    sy = min(b[0] for b in boxes)
+    ey = max(b[1] for b in boxes)
+    sx = min(b[2] for b in boxes)
+    ex = max(b[3] for b in boxes)
+    tile_h = max(b[1] - b[0] for b in boxes)
+    pad = max(1, round(max(tile_h, 0.25 * max(ey - sy, ex - sx)) * _HAND_REGION_MARGIN))
+    return max(0, sy - pad), min(image_h, ey + pad), max(0, sx - pad), min(image_w, ex + pad)
+
+
+# Decode-size estimate: assume the hand spans at least this fraction of the
+# photo's long side, as 14 tiles of 3:4 (w:h) aspect.
+_DECODE_MIN_HAND_SPAN = 0.8
+_DECODE_TILES_PER_HAND = 14
+_DECODE_TILE_ASPECT = 4 / 3
+# JPEG DCT scaling supports exactly these reductions.
+_DECODE_REDUCTIONS = (8, 4, 2)
+
+
+def _decode_reduction(width: int, height: int, target_tile_px: int) -> int:
+    """Largest of 8/4/2 (else 1) that still leaves an estimated tile height
+    of at least `target_tile_px` pixels; 0 disables reduction."""
+    if target_tile_px <= 0:
+        return 1
+    tile_h = max(width, height) * _DECODE_MIN_HAND_SPAN / _DECODE_TILES_PER_HAND * _DECODE_TILE_ASPECT
+    for reduction in _DECODE_REDUCTIONS:
+        if tile_h / reduction >= target_tile_px:
+            return reduction
+    return 1
+
+
+def _apply_orientation(rgb: np.ndarray, orientation: int) -> np.ndarray:
+    """ImageOps.exif_transpose for an array: one strided view, then a single
+    contiguous copy (none for orientation 1)."""
+    if orientation == 2:
+        rgb = rgb[:, ::-1]
+    elif orientation == 3:
+        rgb = rgb[::-1, ::-1]
+    elif orientation == 4:
+        rgb = rgb[::-1]
+    elif orientation == 5:
+        rgb = rgb.transpose(1, 0, 2)
+    elif orientation == 6:
+        rgb = np.rot90(rgb, k=-1)
+    elif orientation == 7:
+        rgb = rgb[::-1, ::-1].transpose(1, 0, 2)
+    elif orientation == 8:
+        rgb = np.rot90(rgb, k=1)
+    else:
+        return rgb
+    return np.ascontiguousarray(rgb)
+
+
+def decode_rgb(image_bytes: bytes) -> np.ndarray:
+    """Decode image bytes into an EXIF-oriented (H, W, 3) uint8 RGB array.
+
+    Decodes at a reduced size when the photo is large enough that tiles
+    would still be at least settings.decode_target_tile_px tall (see
+    _decode_reduction): JPEGs via draft() — the DCT decodes straight to
+    1/2, 1/4 or 1/8 size. Other formats (HEIC, PNG, ...) get no decode
+    saving: they are decoded at full size and only then shrunk with
+    Image.reduce(), which just makes the downstream arrays smaller
+    (pillow-heif doesn't decode embedded thumbnails, and those are far
+    below the target size anyway). Orientation is applied to the reduced
+    array. The chosen reduction is counted in recognition_metrics as
+    "decode.scale_1_<n>"."""
+    with timed_stage("decode"):
+        pil_img = Image.open(BytesIO(image_bytes))
+        orientation = pil_img.getexif().get(ExifTags.Base.Orientation, 1)
+        full_w, full_h = pil_img.size
+        reduction = _decode_reduction(full_w, full_h, settings.decode_target_tile_px)
+        if reduction > 1:
+            pil_img.draft("RGB", (full_w // reduction, full_h // reduction))
+        pil_img.load()
+        if pil_img.mode not in ("RGB", "L"):
+            pil_img = pil_img.convert("RGB")
+        if reduction > 1 and pil_img.size == (full_w, full_h):
+            pil_img = pil_img.reduce(reduction)
+        reduction = max(1, round(full_w / pil_img.width))
+        rgb = np.asarray(pil_img.convert("RGB"))
+    recognition_metrics.record_count(f"decode.scale_1_{reduction}")
+    with timed_stage("exif"):
+        return _apply_orientation(rgb, orientation)
+
+
+def recognize_tiles_local(image_bytes: bytes, segmentation_backend: str | None = None) -> dict[str, Any] | None:
     """Recognize mahjong tiles from image bytes using local TFLite model.
 
+    `segmentation_backend` picks how tiles are located ("connected_components"
+    or "yolo_tflite"); None uses settings.segmentation_backend.
+
     Returns a dict with keys: tiles_count, slots, warnings, model_name
     or None if recognition fails.
     """
+    try:
+        rgb = decode_rgb(image_bytes)
+    except Exception as exc:
+        logger.warning("Failed to load image for TFLite: %s", exc)
+        return None
+    return recognize_tiles_rgb(rgb, segmentation_backend=segmentation_backend)
+
+
+def recognize_tiles_rgb(rgb: np.ndarray, segmentation_backend: str | None = None) -> dict[str, Any] | None:
+    """recognize_tiles_local for an already-decoded RGB array (see
+    decode_rgb); the entry point for callers that decode elsewhere."""
+    local = recognize_tiles_rgb_detailed(rgb, segmentation_backend)
+    return local.result if local is not None else None
+
+
+@dataclass
+class LocalRecognition:
+    """Outcome of local recognition for callers that can use a result that
+    failed the confidence gates (see hand_extraction's hybrid fallback)."""
+
+    result: dict[str, Any] | None  # set when the gates passed
+    slots: list[dict[str, Any]]  # every classified slot, re-indexed
+    # Tile crop per slot (aligned with `slots`); only kept when `result` is
+    # None, so accepted results don't carry pixels around.
+    crops: list[np.ndarray]
+    # (sy, ey, sx, ex) around every tile segmentation found, padded, for
+    # cropping remote requests.
+    hand_box: tuple[int, int, int, int] | None = None
+    # Warnings from building `slots` (e.g. unmapped labels), for callers
+    # that go on to use them when `result` is None.
+    warnings: list[str] = field(default_factory=list)
+
+
+def recognize_tiles_rgb_detailed(
+    rgb: np.ndarray, segmentation_backend: str | None = None,
+) -> LocalRecognition | None:
+    """recognize_tiles_rgb, also returning the classified slots and their
+    crops when the confidence gates fail, and the hand region segmentation
+    found. None when there is nothing to return (no model, or no tiles)."""
+    try:
+        backend = _segmentation_backend(segmentation_backend)
+    except ValueError as exc:
+        logger.warning("%s", exc)
+        return None
     try:
         _load_model()
     except (FileNotFoundError, Exception) as exc:
@@ -493,54 +1187,92 @@ def recognize_tiles_local(image_bytes: bytes) -> dict[str, Any] | None:
         return None
 
     try:
-        pil_img = Image.open(__import__("io").BytesIO(image_bytes))
-        pil_img = ImageOps.exif_transpose(pil_img)
-        rgb = np.array(pil_img.convert("RGB"))
-    except Exception as exc:
-        logger.warning("Failed to load image for TFLite: %s", exc)
+        boxes, tile_images = _segment_tile_images(rgb, backend)
+    except FileNotFoundError as exc:
+        logger.warning("Segmentation backend %s not available: %s", backend.name, exc)
         return None
-
-    tile_images = _segment_tiles(rgb)
     if not tile_images or len(tile_images) not in (13, 14):
+        # A partial segmentation's box may cut off the tiles it missed, so
+        # remote passes get the full frame instead.
         logger.info("TFLite segmentation found %d tiles (need 13-14)", len(tile_images) if tile_images else 0)
         return None
-
+    hand_box = _hand_region(boxes, rgb.shape[0], rgb.shape[1])
+
+    with timed_stage("classify"):
+        predictions = _classify_tiles_top_k(
+            tile_images, top_k=settings.local_top_k, cumulative=settings.local_top_k_cumulative,
+        )
+    with timed_stage("postprocess"):
+        slots, kept, warnings = _local_slots(predictions)
+        result = _gate_local_result(slots, warnings)
+    if result is not None:
+        return LocalRecognition(result=result, slots=slots, crops=[], hand_box=hand_box)
+    # Copies, not views: the result may outlive `rgb` (a recognition worker
+    # pickles it after closing the shared-memory image).
+    return LocalRecognition(
+        result=None,
+        slots=slots,
+        crops=[tile_images[i].copy() for i in kept],
+        hand_box=hand_box,
+        warnings=warnings,
+    )
+
+
+def _local_slots(
+    predictions: list[list[tuple[str, float]]],
+) -> tuple[list[dict[str, Any]], list[int], list[str]]:
+    """Slots for the predictions whose top label maps to a tile code, the
+    input index each slot came from, and warnings for the dropped ones."""
     slots: list[dict[str, Any]] = []
-    confidences: list[float] = []
+    kept: list[int] = []
     warnings: list[str] = []
 
-    for idx, tile_img in enumerate(tile_images):
-        label, confidence = _classify_tile(tile_img)
+    for idx, candidates in enumerate(predictions):
+        label, confidence = candidates[0]
         tile_code = _LABEL_TO_TILE.get(label)
         if tile_code is None:
             warnings.append(f"slot {idx}: label '{label}' not mapped to tile code")
             continue
 
-        confidences.append(confidence)
+        kept.append(idx)
         slots.append({
-            "index": idx,
+            "index": len(slots),
             "top": tile_code,
-            "candidates": [{"tile": tile_code, "confidence": confidence}],
+            "candidates": [
+                {"tile": _LABEL_TO_TILE[cand_label], "confidence": cand_conf}
+                for cand_label, cand_conf in candidates
+                if cand_label in _LABEL_TO_TILE
+            ],
             "ambiguous": confidence < 0.7,
             "top_confidence": confidence,
         })
+    return slots, kept, warnings
 
+
+def _gate_local_result(slots: list[dict[str, Any]], warnings: list[str]) -> dict[str, Any] | None:
+    """The result dict for `slots`, or None when the 13/14-tile /
+    confidence gates fail.
+
+    A low average top-1 confidence is still accepted when the slots'
+    candidates combine into a winning hand (pick_winning_tiles), since
+    that is what hand_shape_from_estimate will resolve them to anyway."""
     if len(slots) not in (13, 14):
         logger.info("TFLite classified only %d valid tiles (need 13-14)", len(slots))
         return None
 
-    avg_confidence = sum(confidences) / len(confidences) if confidences else 0
+    warnings = list(warnings)
+    avg_confidence = sum(slot["top_confidence"] for slot in slots) / len(slots)
     if avg_confidence < 0.5:
-        logger.info("TFLite average confidence %.2f too low", avg_confidence)
-        return None
-
-    # Re-index slots
-    for i, slot in enumerate(slots):
-        slot["index"] = i
+        if len(slots) != 14 or pick_winning_tiles(slots) is None:
+            logger.info("TFLite average confidence %.2f too low", avg_confidence)
+            return None
+        warnings.append(
+            f"Low average confidence ({avg_confidence:.2f}) accepted: top-k candidates form a winning hand."
+        )
 
     return {
         "tiles_count": len(slots),
         "slots": slots,
         "warnings": warnings,
-        "model_name": "tflite-mobilenetv2",
+        "model_name": LOCAL_MODEL_NAME,
     }
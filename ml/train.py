@@ -7,7 +7,10 @@ Data sources (merged):
   2. GCS training data (training-data/index.json) — user uploads + public datasets
 
 Outputs:
-  - tile_classifier.tflite  (float16 quantized)
+  - tile_classifier.tflite       (float16 quantized)
+  - tile_classifier_int8.tflite  (full-integer int8, only when it passes the
+                                  accuracy gate against float16 on the
+                                  validation split)
   - labels.txt
 
 Usage:
@@ -42,6 +45,11 @@ IMG_SIZE = 224
 BATCH_SIZE = 32
 DEFAULT_EPOCHS = 50
 SEED = 42
+# Calibration samples drawn from the training split for int8 export.
+INT8_CALIBRATION_SAMPLES = 200
+# Max validation-accuracy drop (absolute) int8 may show vs. float16 before
+# it is withheld from serving.
+INT8_MAX_ACCURACY_DROP = 0.01
 
 BASE_DIR = Path(__file__).parent
 TILES_DIR = BASE_DIR / "tiles-resized"
@@ -211,9 +219,64 @@ def build_model(num_classes: int):
     return model, base
 
 
+# ──────────── TFLite export ────────────
+
+def export_float16_tflite(model) -> bytes:
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.target_spec.supported_types = [tf.float16]
+    return converter.convert()
+
+
+def export_int8_tflite(model, calibration_images: np.ndarray) -> bytes:
+    """Full-integer (uint8 in/out, int8 weights+activations) export,
+    calibrated on a random sample of training images."""
+    rng = np.random.default_rng(SEED)
+    count = min(INT8_CALIBRATION_SAMPLES, len(calibration_images))
+    sample = calibration_images[rng.choice(len(calibration_images), size=count, replace=False)]
+
+    def representative_dataset():
+        for image in sample:
+            yield [np.expand_dims(image / 127.5 - 1.0, axis=0).astype(np.float32)]
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_dataset
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    converter.inference_input_type = tf.uint8
+    converter.inference_output_type = tf.uint8
+    return converter.convert()
+
+
+def evaluate_tflite(tflite_model: bytes, images: np.ndarray, labels: np.ndarray) -> float:
+    """Top-1 accuracy of a TFLite model, feeding inputs the way
+    app/tile_recognizer_local.py does (quantized for integer inputs)."""
+    interpreter = tf.lite.Interpreter(model_content=tflite_model)
+    interpreter.allocate_tensors()
+    input_detail = interpreter.get_input_details()[0]
+    output_detail = interpreter.get_output_details()[0]
+
+    correct = 0
+    for image, label in zip(images, labels):
+        normalized = image / 127.5 - 1.0
+        if input_detail["dtype"] == np.float32:
+            input_data = normalized.astype(np.float32)
+        else:
+            scale, zero_point = input_detail["quantization"]
+            info = np.iinfo(input_detail["dtype"])
+            input_data = np.clip(np.round(normalized / scale + zero_point), info.min, info.max)
+            input_data = input_data.astype(input_detail["dtype"])
+        interpreter.set_tensor(input_detail["index"], np.expand_dims(input_data, axis=0))
+        interpreter.invoke()
+        output = interpreter.get_tensor(output_detail["index"])[0]
+        if int(np.argmax(output)) == int(label):
+            correct += 1
+    return correct / max(len(images), 1)
+
+
 # ──────────── Training ────────────
 
-def train(epochs: int, gcs_bucket: str | None = None, upload: bool = False):
+def train(epochs: int, gcs_bucket: str | None = None, upload: bool = False, int8: bool = True):
     # Build label index from label.csv (canonical)
     label_map = load_label_map()
     # label_map: {1: "dots-1", 2: "dots-2", ...}
@@ -316,15 +379,38 @@ def train(epochs: int, gcs_bucket: str | None = None, upload: bool = False):
     print(f"Keras model saved: {keras_path}")
 
     # Convert to TFLite (float16 quantized)
-    converter = tf.lite.TFLiteConverter.from_keras_model(model)
-    converter.optimizations = [tf.lite.Optimize.DEFAULT]
-    converter.target_spec.supported_types = [tf.float16]
-    tflite_model = converter.convert()
+    tflite_model = export_float16_tflite(model)
 
     tflite_path = OUTPUT_DIR / "tile_classifier.tflite"
     tflite_path.write_bytes(tflite_model)
     print(f"TFLite model saved: {tflite_path} ({len(tflite_model) / 1024 / 1024:.1f} MB)")
 
+    # Full-integer int8 export, gated on validation accuracy vs. float16
+    int8_path = OUTPUT_DIR / "tile_classifier_int8.tflite"
+    int8_model = None
+    int8_report = None
+    if int8:
+        fp16_acc = evaluate_tflite(tflite_model, X_val, y_val)
+        candidate = export_int8_tflite(model, X_train)
+        int8_acc = evaluate_tflite(candidate, X_val, y_val)
+        approved = int8_acc >= fp16_acc - INT8_MAX_ACCURACY_DROP
+        int8_report = {
+            "float16_tflite_val_accuracy": fp16_acc,
+            "int8_tflite_val_accuracy": int8_acc,
+            "int8_approved": approved,
+        }
+        print(f"TFLite accuracy: float16={fp16_acc:.4f}, int8={int8_acc:.4f}")
+        if approved:
+            int8_model = candidate
+            int8_path.write_bytes(int8_model)
+            print(f"Int8 model saved: {int8_path} ({len(int8_model) / 1024 / 1024:.1f} MB)")
+        else:
+            print(f"Int8 model rejected: accuracy drop exceeds {INT8_MAX_ACCURACY_DROP:.2%}")
+    if int8_model is None and int8_path.exists():
+        # Never leave a stale int8 model next to a newer float16 one; the
+        # server prefers int8 whenever the file exists.
+        int8_path.unlink()
+
     # Save labels
     labels_path = OUTPUT_DIR / "labels.txt"
     with open(labels_path, "w") as f:
@@ -345,10 +431,20 @@ def train(epochs: int, gcs_bucket: str | None = None, upload: bool = False):
 
     # Upload to GCS for dynamic model loading
     if upload and gcs_bucket:
-        _upload_model_to_gcs(gcs_bucket, tflite_model, labels_path.read_text(), val_acc)
-
-
-def _upload_model_to_gcs(bucket_name: str, tflite_bytes: bytes, labels_txt: str, val_acc: float):
+        _upload_model_to_gcs(
+            gcs_bucket, tflite_model, labels_path.read_text(), val_acc,
+            int8_bytes=int8_model, int8_report=int8_report,
+        )
+
+
+def _upload_model_to_gcs(
+    bucket_name: str,
+    tflite_bytes: bytes,
+    labels_txt: str,
+    val_acc: float,
+    int8_bytes: bytes | None = None,
+    int8_report: dict | None = None,
+):
     from google.cloud import storage
     client = storage.Client()
     bucket = client.bucket(bucket_name)
@@ -363,11 +459,16 @@ def _upload_model_to_gcs(bucket_name: str, tflite_bytes: bytes, labels_txt: str,
     blob = bucket.blob(f"models/{version}/labels.txt")
     blob.upload_from_string(labels_txt, content_type="text/plain")
 
+    if int8_bytes is not None:
+        blob = bucket.blob(f"models/{version}/tile_classifier_int8.tflite")
+        blob.upload_from_string(int8_bytes, content_type="application/octet-stream")
+
     # Upload model metadata
     meta = {
         "version": version,
         "val_accuracy": val_acc,
         "created_at": now.isoformat(),
+        **(int8_report or {}),
     }
     blob = bucket.blob(f"models/{version}/meta.json")
     blob.upload_from_string(json.dumps(meta), content_type="application/json")
@@ -387,5 +488,7 @@ if __name__ == "__main__":
                         help="GCS bucket to load training data from")
     parser.add_argument("--upload", action="store_true",
                         help="Upload trained model to GCS")
+    parser.add_argument("--skip-int8", action="store_true",
+                        help="Skip the full-integer int8 export and its accuracy gate")
     args = parser.parse_args()
-    train(args.epochs, gcs_bucket=args.gcs_bucket, upload=args.upload)
+    train(args.epochs, gcs_bucket=args.gcs_bucket, upload=args.upload, int8=not args.skip_int8)
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""Benchmark the recognition pipeline end to end, with a per-stage breakdown.
+
+Runs `recognize_tiles_local` and/or `extract_hand_from_image` over real
+images (default: data/eval_images) and/or synthetic hands generated with
+ml/yolo/generate_synthetic.py, at several concurrency levels, and reports:
+
+  - per-stage wall time (decode, exif, mask, morphology,
+    connected_components, pitch, counts, crop, classify, postprocess; see
+    `timed_stage` in app/recognition_metrics.py)
+  - end-to-end latency percentiles and throughput per concurrency level
+  - successes and, separately, the rate of fallback placeholder results
+    (`_fallback_result` in app/hand_extraction.py), which count as failures
+  - peak RSS of this process
+
+Usage:
+  python scripts/benchmark_recognition.py --images data/eval_images --synthetic 20 \\
+      --concurrency 1,2,4,8 --output benchmark.json
+
+`extract_hand_from_image` calls the OpenAI API when local recognition
+fails and OPENAI_API_KEY is set; pass --offline to benchmark the local path
+plus fallback only. Its result cache (app/recognition_cache.py) is
+disabled unless --cache is given: after warmup every call would otherwise be
+a cache hit, and the numbers would measure lookups, not recognition.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import resource
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Callable
+
+from PIL import Image
+
+try:  # pragma: no cover
+    from pillow_heif import register_heif_opener
+
+    register_heif_opener()
+except Exception:  # pragma: no cover
+    pass
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from app import hand_extraction  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.hand_extraction import extract_hand_from_image, is_fallback_result  # noqa: E402
+from app.recognition_cache import RecognitionCache  # noqa: E402
+from app.recognition_metrics import collect_stage_timings, recognition_metrics  # noqa: E402
+from app.tile_recognizer_local import recognize_tiles_local  # noqa: E402
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".heic", ".heif", ".webp"}
+TARGETS: dict[str, Callable[[bytes], Any]] = {
+    "local": recognize_tiles_local,
+    "extract": extract_hand_from_image,
+}
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Benchmark recognition latency per stage and concurrency.")
+    p.add_argument("--images", nargs="*", default=["data/eval_images"], help="Image files or directories")
+    p.add_argument("--synthetic", type=int, default=0, help="Number of synthetic hands to add")
+    p.add_argument("--synthetic-long-side", type=int, default=3024, help="Upscale synthetic images to this long side (0 keeps 640px)")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--target", choices=["local", "extract", "both"], default="both")
+    p.add_argument("--concurrency", default="1,2,4,8", help="Comma-separated worker counts")
+    p.add_argument("--repeat", type=int, default=1, help="Passes over the image set per concurrency level")
+    p.add_argument("--warmup", type=int, default=1, help="Untimed calls before measuring (model load etc.)")
+    p.add_argument("--offline", action="store_true", help="Ignore OPENAI_API_KEY for this run")
+    p.add_argument("--cache", action="store_true", help="Keep the recognition result cache on (measures cache hits)")
+    p.add_argument("--output", default="", help="Write the JSON report here (stdout otherwise)")
+    return p.parse_args()
+
+
+def _load_image_files(paths: list[str]) -> list[tuple[str, bytes]]:
+    files: list[Path] = []
+    for raw in paths:
+        path = (BASE_DIR / raw) if not Path(raw).is_absolute() else Path(raw)
+        if path.is_dir():
+            files.extend(sorted(p for p in path.rglob("*") if p.suffix.lower() in IMAGE_SUFFIXES))
+        elif path.is_file():
+            files.append(path)
+        else:
+            print(f"warning: not found: {path}", file=sys.stderr)
+    return [(str(p.relative_to(BASE_DIR) if p.is_relative_to(BASE_DIR) else p), p.read_bytes()) for p in files]
+
+
+def _synthetic_images(count: int, long_side: int, seed: int) -> list[tuple[str, bytes]]:
+    if count <= 0:
+        return []
+    sys.path.insert(0, str(BASE_DIR / "ml" / "yolo"))
+    import generate_synthetic
+
+    random.seed(seed)
+    generate_synthetic.np.random.seed(seed)
+    tiles = generate_synthetic.load_tile_images()
+    if not tiles:
+        print("warning: no tile images for synthetic generation (ml/tiles-resized)", file=sys.stderr)
+        return []
+    images: list[tuple[str, bytes]] = []
+    for idx in range(count):
+        image, _bboxes = generate_synthetic.generate_one(tiles, idx)
+        if long_side > 0:
+            factor = long_side / max(image.size)
+            image = image.resize((round(image.width * factor), round(image.height * factor)), Image.Resampling.BICUBIC)
+        buf = BytesIO()
+        image.save(buf, format="JPEG", quality=90)
+        images.append((f"synthetic/{idx:04d}.jpg", buf.getvalue()))
+    return images
+
+
+def _configure_recognition_cache(enabled: bool) -> None:
+    """Unless `enabled`, swap extract_hand_from_image's result cache for a
+    disabled one, so every call runs recognition."""
+    if not enabled:
+        hand_extraction.recognition_cache = RecognitionCache(max_entries=0, max_bytes=0, ttl_seconds=0)
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if platform.system() == "Darwin" else peak / 1024
+
+
+def _timed_call(fn: Callable[[bytes], Any], image_bytes: bytes) -> tuple[float, dict[str, float], str]:
+    """Latency, stage timings and outcome: "ok", "fallback" (the placeholder
+    hand extract_hand_from_image returns when recognition failed) or
+    "failed"."""
+    with collect_stage_timings() as stages:
+        started = time.perf_counter()
+        try:
+            result = fn(image_bytes)
+            if result is None:
+                outcome = "failed"
+            elif is_fallback_result(result):
+                outcome = "fallback"
+            else:
+                outcome = "ok"
+        except Exception:
+            outcome = "failed"
+        elapsed = time.perf_counter() - started
+    return elapsed, dict(stages), outcome
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def _run_level(fn: Callable[[bytes], Any], images: list[tuple[str, bytes]], workers: int, repeat: int) -> dict[str, Any]:
+    jobs = [image_bytes for _ in range(repeat) for _name, image_bytes in images]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda b: _timed_call(fn, b), jobs))
+    wall = time.perf_counter() - started
+
+    latencies = [elapsed for elapsed, _stages, _outcome in results]
+    fallbacks = sum(1 for _e, _s, outcome in results if outcome == "fallback")
+    stage_totals: dict[str, list[float]] = {}
+    for _elapsed, stages, _outcome in results:
+        for name, seconds in stages.items():
+            stage_totals.setdefault(name, []).append(seconds)
+    return {
+        "workers": workers,
+        "calls": len(results),
+        "succeeded": sum(1 for _e, _s, outcome in results if outcome == "ok"),
+        "fallbacks": fallbacks,
+        "fallback_rate": fallbacks / len(results) if results else 0.0,
+        "wall_seconds": wall,
+        "throughput_per_second": len(results) / wall if wall > 0 else 0.0,
+        "latency_ms": {
+            "mean": statistics.mean(latencies) * 1000 if latencies else 0.0,
+            "p50": _percentile(latencies, 0.5) * 1000,
+            "p90": _percentile(latencies, 0.9) * 1000,
+            "max": max(latencies, default=0.0) * 1000,
+        },
+        # Mean per call over the calls that reached the stage.
+        "stages_ms": {
+            name: {"mean": statistics.mean(values) * 1000, "calls": len(values)}
+            for name, values in sorted(stage_totals.items())
+        },
+        # Cumulative for the process: ru_maxrss never goes down.
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def main() -> None:
+    args = parse_args()
+    if args.offline:
+        settings.openai_api_key = ""
+    _configure_recognition_cache(args.cache)
+
+    images = _load_image_files(args.images) + _synthetic_images(args.synthetic, args.synthetic_long_side, args.seed)
+    if not images:
+        raise SystemExit("no images to benchmark (see --images / --synthetic)")
+    levels = [int(v) for v in args.concurrency.split(",") if v.strip()]
+    targets = ["local", "extract"] if args.target == "both" else [args.target]
+
+    report: dict[str, Any] = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "images": len(images),
+        "image_bytes_mean": statistics.mean(len(b) for _n, b in images),
+        "settings": {
+            "segmentation_backend": settings.segmentation_backend,
+            "decode_target_tile_px": settings.decode_target_tile_px,
+            "segmentation_max_side": settings.segmentation_max_side,
+            "tflite_interpreter_pool_size": settings.tflite_interpreter_pool_size,
+            "tflite_use_int8": settings.tflite_use_int8,
+            "recognition_process_workers": settings.recognition_process_workers,
+            "remote_enabled": bool(settings.openai_api_key),
+            "recognition_cache": hand_extraction.recognition_cache.enabled,
+        },
+        "targets": {},
+    }
+    for target in targets:
+        fn = TARGETS[target]
+        for _name, image_bytes in images[: args.warmup]:
+            _timed_call(fn, image_bytes)
+        recognition_metrics.reset()
+        report["targets"][target] = {
+            "levels": [_run_level(fn, images, workers, args.repeat) for workers in levels],
+            "metrics": recognition_metrics.snapshot(),
+        }
+        for level in report["targets"][target]["levels"]:
+            print(
+                f"{target:>7} x{level['workers']}: {level['throughput_per_second']:.2f} img/s, "
+                f"p50 {level['latency_ms']['p50']:.0f} ms, ok {level['succeeded']}/{level['calls']}, "
+                f"fallback {level['fallback_rate']:.0%}",
+                file=sys.stderr,
+            )
+    report["peak_rss_mb"] = _peak_rss_mb()
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+        print(f"wrote {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
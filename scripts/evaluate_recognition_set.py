@@ -3,11 +3,8 @@ from __future__ import annotations
 
 import argparse
 import json
-from io import BytesIO
 from pathlib import Path
 
-from PIL import Image
-
 try:  # pragma: no cover
     from pillow_heif import register_heif_opener
 
@@ -15,7 +12,9 @@ try:  # pragma: no cover
 except Exception:  # pragma: no cover
     pass
 
+from app.config import settings
 from app.hand_extraction import extract_hand_from_image
+from app.remote_response_cache import get_remote_response_cache
 from app.validators import validate_tile
 
 
@@ -23,6 +22,14 @@ def parse_args() -> argparse.Namespace:
     p = argparse.ArgumentParser(description="Evaluate recognition accuracy on labeled eval set.")
     p.add_argument("--input", default="data/recognition_eval_set.jsonl", help="Eval JSONL path")
     p.add_argument("--top", type=int, default=20, help="Top confusion pairs to print")
+    p.add_argument(
+        "--remote-cache",
+        default="",
+        help=(
+            "SQLite remote response cache to read and fill (replays OpenAI answers on reruns without new API"
+            " calls). OPENAI_API_KEY must still be set: without it recognition falls back before reaching the cache"
+        ),
+    )
     return p.parse_args()
 
 
@@ -39,14 +46,6 @@ def _load_rows(path: Path) -> list[dict]:
     return rows
 
 
-def _to_jpeg_bytes(image_path: Path) -> bytes:
-    with Image.open(image_path) as img:
-        rgb = img.convert("RGB")
-        out = BytesIO()
-        rgb.save(out, format="JPEG", quality=95)
-        return out.getvalue()
-
-
 def _validate_gt(gt: list[str]) -> bool:
     if len(gt) != 14:
         return False
@@ -60,6 +59,8 @@ def _validate_gt(gt: list[str]) -> bool:
 
 def main() -> int:
     args = parse_args()
+    if args.remote_cache:
+        settings.remote_recognition_cache_path = args.remote_cache
     rows = _load_rows(Path(args.input))
     if not rows:
         print(f"no rows found: {args.input}")
@@ -84,7 +85,7 @@ def main() -> int:
             continue
 
         try:
-            payload = extract_hand_from_image(_to_jpeg_bytes(image_path))
+            payload = extract_hand_from_image(image_path.read_bytes())
             pred = [slot["top"] for slot in payload.get("slots", [])]
         except Exception:
             failed_cases += 1
@@ -113,6 +114,10 @@ def main() -> int:
     print(f"cases_total={len(valid_rows)} cases_scored={exact_total} cases_failed={failed_cases}")
     print(f"tile_accuracy={(tile_correct / tile_total) * 100:.2f}%")
     print(f"exact_match_rate={(exact_correct / exact_total) * 100:.2f}%")
+    cache = get_remote_response_cache()
+    if cache is not None:
+        stats = cache.stats()
+        print(f"remote_cache hits={stats['hits']} misses={stats['misses']} entries={stats['entries']}")
     print("top confusions (ground_truth -> predicted):")
     for (g, p), c in sorted(confusion.items(), key=lambda x: x[1], reverse=True)[: args.top]:
         print(f"{g:>3} -> {p:<3} : {c}")
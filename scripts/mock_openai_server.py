@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""Local stand-in for the OpenAI endpoints used by app/hand_extraction.py.
+
+Serves POST /v1/responses and POST /v1/chat/completions with slot payloads
+in the shape `_call_model_for_slots` expects. Each request sleeps for a
+latency drawn from the chosen distribution and fails with the given rate,
+so ensemble, concurrency, caching and timeout behavior can be measured
+reproducibly without network access or cost. The draws are seeded by
+--seed, the image and how many times that image was sent before, so a
+run gets the same delays and failures whatever order concurrent requests
+arrive in (and a retried request gets a fresh draw). GET /stats reports how many
+calls arrived (e.g. to count passes saved by the adaptive ensemble or the
+caches); POST /stats/reset clears it.
+
+Payloads are either derived from the request (default: a winning hand
+seeded by a hash of the image, so the same image always gets the same
+answer; crop-mosaic requests get as many slots as the prompt asks for) or
+canned from a JSON file.
+
+Usage:
+  python scripts/mock_openai_server.py --port 8001 --latency-ms 1500 \\
+      --latency-distribution lognormal --failure-rate 0.05
+  OPENAI_API_KEY=mock OPENAI_BASE_URL=http://127.0.0.1:8001/v1 uvicorn app.main:app
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import re
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+SUITS = ("m", "p", "s")
+HONORS = ("E", "S", "W", "N", "P", "F", "C")
+_COUNT_PATTERN = re.compile(r"strip of (\d+)")
+
+
+@dataclass
+class MockConfig:
+    latency_ms: float = 800.0
+    latency_spread_ms: float = 300.0
+    latency_distribution: str = "lognormal"  # fixed | uniform | normal | lognormal
+    failure_rate: float = 0.0
+    failure_status: int = 500
+    ambiguous_rate: float = 0.1
+    canned_payload: dict[str, Any] | None = None
+    seed: int = 0
+
+
+@dataclass
+class _Stats:
+    requests: int = 0
+    failures: int = 0
+    by_endpoint: dict[str, int] = field(default_factory=dict)
+    lock: Lock = field(default_factory=Lock)
+
+    def record(self, endpoint: str, failed: bool) -> None:
+        with self.lock:
+            self.requests += 1
+            self.failures += int(failed)
+            self.by_endpoint[endpoint] = self.by_endpoint.get(endpoint, 0) + 1
+
+    def snapshot(self) -> dict[str, Any]:
+        with self.lock:
+            return {"requests": self.requests, "failures": self.failures, "by_endpoint": dict(self.by_endpoint)}
+
+
+def _latency_seconds(config: MockConfig, rng: random.Random) -> float:
+    mean, spread = config.latency_ms, config.latency_spread_ms
+    if config.latency_distribution == "fixed" or spread <= 0:
+        value = mean
+    elif config.latency_distribution == "uniform":
+        value = rng.uniform(mean - spread, mean + spread)
+    elif config.latency_distribution == "normal":
+        value = rng.gauss(mean, spread)
+    else:
+        # Median `mean`, right-skewed like real API latency.
+        value = mean * rng.lognormvariate(0.0, spread / mean if mean > 0 else 0.0)
+    return max(0.0, value) / 1000
+
+
+def _winning_tiles(rng: random.Random) -> list[str]:
+    counts: dict[str, int] = {}
+
+    def take(tiles: list[str]) -> bool:
+        if any(counts.get(t, 0) + tiles.count(t) > 4 for t in set(tiles)):
+            return False
+        for t in tiles:
+            counts[t] = counts.get(t, 0) + 1
+        return True
+
+    tiles: list[str] = []
+    while len(tiles) < 12:
+        if rng.random() < 0.7:
+            suit, start = rng.choice(SUITS), rng.randint(1, 7)
+            meld = [f"{start + i}{suit}" for i in range(3)]
+        else:
+            tile = rng.choice(HONORS) if rng.random() < 0.4 else f"{rng.randint(1, 9)}{rng.choice(SUITS)}"
+            meld = [tile] * 3
+        if take(meld):
+            tiles += meld
+    while True:
+        tile = rng.choice(HONORS) if rng.random() < 0.3 else f"{rng.randint(1, 9)}{rng.choice(SUITS)}"
+        if take([tile, tile]):
+            return tiles + [tile, tile]
+
+
+def _any_tile(rng: random.Random) -> str:
+    return rng.choice(HONORS) if rng.random() < 0.25 else f"{rng.randint(1, 9)}{rng.choice(SUITS)}"
+
+
+def _image_seed(image: bytes, config: MockConfig) -> int:
+    return int.from_bytes(hashlib.blake2b(image, digest_size=8).digest(), "big") ^ config.seed
+
+
+def _derived_payload(image: bytes, system_prompt: str, config: MockConfig) -> dict[str, Any]:
+    rng = random.Random(_image_seed(image, config))
+    match = _COUNT_PATTERN.search(system_prompt)
+    tiles = [_any_tile(rng) for _ in range(int(match.group(1)))] if match else _winning_tiles(rng)
+    slots = []
+    for index, tile in enumerate(tiles):
+        if rng.random() < config.ambiguous_rate:
+            confidence = round(rng.uniform(0.35, 0.6), 2)
+            candidates = [
+                {"tile": tile, "confidence": confidence},
+                {"tile": _any_tile(rng), "confidence": round(confidence / 2, 2)},
+            ]
+        else:
+            candidates = [{"tile": tile, "confidence": round(rng.uniform(0.85, 0.99), 2)}]
+        slots.append({"index": index, "top": tile, "candidates": candidates, "ambiguous": len(candidates) > 1})
+    return {"tiles_count": len(slots), "slots": slots, "warnings": []}
+
+
+def _image_from_url(url: str) -> bytes:
+    _, _, data = url.partition("base64,")
+    try:
+        return base64.b64decode(data)
+    except ValueError:
+        return url.encode()
+
+
+def _parse_responses_request(body: dict[str, Any]) -> tuple[str, bytes]:
+    system_prompt, image = "", b""
+    for message in body.get("input") or []:
+        for part in message.get("content") or []:
+            if part.get("type") == "input_text" and message.get("role") == "system":
+                system_prompt += part.get("text", "")
+            elif part.get("type") == "input_image":
+                image = _image_from_url(part.get("image_url", ""))
+    return system_prompt, image
+
+
+def _parse_chat_request(body: dict[str, Any]) -> tuple[str, bytes]:
+    system_prompt, image = "", b""
+    for message in body.get("messages") or []:
+        content = message.get("content")
+        if message.get("role") == "system" and isinstance(content, str):
+            system_prompt += content
+        for part in content if isinstance(content, list) else []:
+            if part.get("type") == "image_url":
+                image = _image_from_url((part.get("image_url") or {}).get("url", ""))
+    return system_prompt, image
+
+
+def create_app(config: MockConfig) -> FastAPI:
+    app = FastAPI(title="Mock OpenAI recognition API")
+    stats = _Stats()
+    sends: dict[int, int] = {}  # image seed -> requests seen for it
+    sends_lock = Lock()
+
+    def request_rng(image: bytes) -> random.Random:
+        image_seed = _image_seed(image, config)
+        with sends_lock:
+            attempt = sends.get(image_seed, 0)
+            sends[image_seed] = attempt + 1
+        return random.Random(f"{image_seed}:{attempt}")
+
+    async def answer(endpoint: str, request: Request) -> tuple[str, str] | JSONResponse:
+        body = await request.json()
+        parse = _parse_responses_request if endpoint == "responses" else _parse_chat_request
+        system_prompt, image = parse(body)
+        rng = request_rng(image)
+        await asyncio.sleep(_latency_seconds(config, rng))
+        if rng.random() < config.failure_rate:
+            stats.record(endpoint, failed=True)
+            return JSONResponse(
+                status_code=config.failure_status,
+                content={"error": {"message": "mock failure", "type": "server_error", "code": None}},
+            )
+        stats.record(endpoint, failed=False)
+        payload = config.canned_payload or _derived_payload(image, system_prompt, config)
+        return json.dumps(payload, ensure_ascii=False), str(body.get("model", "mock"))
+
+    @app.post("/v1/responses")
+    async def responses(request: Request):
+        answered = await answer("responses", request)
+        if isinstance(answered, JSONResponse):
+            return answered
+        text, model = answered
+        return {
+            "id": f"resp_{uuid.uuid4().hex}",
+            "object": "response",
+            "created_at": int(time.time()),
+            "model": model,
+            "status": "completed",
+            "output": [
+                {
+                    "id": f"msg_{uuid.uuid4().hex}",
+                    "type": "message",
+                    "role": "assistant",
+                    "status": "completed",
+                    "content": [{"type": "output_text", "text": text, "annotations": []}],
+                }
+            ],
+            "parallel_tool_calls": False,
+            "tool_choice": "auto",
+            "tools": [],
+        }
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        answered = await answer("chat.completions", request)
+        if isinstance(answered, JSONResponse):
+            return answered
+        text, model = answered
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [
+                {"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}
+            ],
+        }
+
+    @app.get("/stats")
+    def get_stats() -> dict[str, Any]:
+        return stats.snapshot()
+
+    @app.post("/stats/reset")
+    def reset_stats() -> dict[str, Any]:
+        with stats.lock:
+            stats.requests = stats.failures = 0
+            stats.by_endpoint.clear()
+        return stats.snapshot()
+
+    return app
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Local stand-in for the OpenAI recognition API.")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8001)
+    p.add_argument("--latency-ms", type=float, default=800.0, help="Mean (median for lognormal) latency")
+    p.add_argument("--latency-spread-ms", type=float, default=300.0, help="Half-width / standard deviation")
+    p.add_argument("--latency-distribution", choices=["fixed", "uniform", "normal", "lognormal"], default="lognormal")
+    p.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of calls answered with an error")
+    p.add_argument("--failure-status", type=int, default=500, help="HTTP status of failed calls (429/5xx are retried by the SDK)")
+    p.add_argument("--ambiguous-rate", type=float, default=0.1, help="Fraction of derived slots with low confidence")
+    p.add_argument("--payload", default="", help="JSON file with a canned slot payload (default: derived per image)")
+    p.add_argument("--seed", type=int, default=0)
+    return p.parse_args()
+
+
+def main() -> None:
+    import uvicorn
+
+    args = parse_args()
+    config = MockConfig(
+        latency_ms=args.latency_ms,
+        latency_spread_ms=args.latency_spread_ms,
+        latency_distribution=args.latency_distribution,
+        failure_rate=args.failure_rate,
+        failure_status=args.failure_status,
+        ambiguous_rate=args.ambiguous_rate,
+        canned_payload=json.loads(Path(args.payload).read_text(encoding="utf-8")) if args.payload else None,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -89,7 +89,7 @@ def test_recognize_only_endpoint_success(monkeypatch):
         for idx, tile in enumerate(["1m", "2m", "3m", "4p", "5p", "6p", "7s", "8s", "9s", "E", "E", "E", "2p", "2p"])
     ]
 
-    def fake_extract(_image_bytes):
+    def fake_extract(_image_bytes, segmentation_backend=None):
         return {"tiles_count": 14, "slots": slots, "warnings": ["recognizer warning"]}
 
     monkeypatch.setattr(main_module, "extract_hand_from_image", fake_extract)
@@ -107,6 +107,40 @@ def test_recognize_only_endpoint_success(monkeypatch):
     assert "recognizer warning" in body["warnings"]
 
 
+def test_recognize_passes_upload_bytes_through_without_reencoding(monkeypatch):
+    received = []
+
+    def fake_extract(image_bytes, segmentation_backend=None):
+        received.append(image_bytes)
+        return {"tiles_count": 0, "slots": [], "warnings": []}
+
+    monkeypatch.setattr(main_module, "extract_hand_from_image", fake_extract)
+    upload = sample_image_bytes()
+
+    response = client.post("/api/v1/recognize", files={"image": ("hand.png", upload, "image/png")})
+
+    assert response.status_code == 200
+    assert received == [upload], "the recognizer decodes the original bytes itself, EXIF included"
+
+
+def test_recognize_selects_segmentation_backend(monkeypatch):
+    received = []
+
+    def fake_extract(_image_bytes, segmentation_backend=None):
+        received.append(segmentation_backend)
+        return {"tiles_count": 0, "slots": [], "warnings": []}
+
+    monkeypatch.setattr(main_module, "extract_hand_from_image", fake_extract)
+    files = {"image": ("hand.png", sample_image_bytes(), "image/png")}
+
+    ok = client.post("/api/v1/recognize-only", files=files, data={"segmentation_backend": "yolo_tflite"})
+    unknown = client.post("/api/v1/recognize-only", files=files, data={"segmentation_backend": "nope"})
+
+    assert ok.status_code == 200
+    assert received == ["yolo_tflite"]
+    assert unknown.status_code == 422
+
+
 def test_recognize_only_heic_returns_guidance_when_heif_not_enabled(monkeypatch):
     monkeypatch.setattr(main_module, "HEIC_ENABLED", False)
     response = client.post(
@@ -123,7 +157,7 @@ def test_recognize_job_lifecycle_completed(monkeypatch):
         for idx, tile in enumerate(["1m", "2m", "3m", "4p", "5p", "6p", "7s", "8s", "9s", "E", "E", "E", "2p", "2p"])
     ]
 
-    def fake_extract(_image_bytes, should_cancel=None):
+    def fake_extract(_image_bytes, should_cancel=None, segmentation_backend=None):
         if should_cancel and should_cancel():
             raise RuntimeError("canceled")
         return {"tiles_count": 14, "slots": slots, "warnings": []}
@@ -158,7 +192,7 @@ def test_recognize_job_can_be_canceled(monkeypatch):
         for idx, tile in enumerate(["1m", "2m", "3m", "4p", "5p", "6p", "7s", "8s", "9s", "E", "E", "E", "2p", "2p"])
     ]
 
-    def fake_extract(_image_bytes, should_cancel=None):
+    def fake_extract(_image_bytes, should_cancel=None, segmentation_backend=None):
         for _ in range(30):
             if should_cancel and should_cancel():
                 raise RecognitionCancelledError("canceled")
@@ -718,7 +752,7 @@ def test_recognize_and_score_adjusts_from_candidates(monkeypatch):
             candidates.append({"tile": "2p", "confidence": 0.89})
         slots.append({"index": idx, "top": tile, "candidates": candidates, "ambiguous": idx in {12, 13}})
 
-    def fake_extract(_image_bytes):
+    def fake_extract(_image_bytes, segmentation_backend=None):
         return {"tiles_count": 14, "slots": slots, "warnings": ["recognizer warning"]}
 
     monkeypatch.setattr(main_module, "extract_hand_from_image", fake_extract)
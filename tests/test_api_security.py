@@ -39,3 +39,38 @@ def test_oversized_recognition_image_is_rejected(monkeypatch):
         files={"image": ("hand.jpg", b"four", "image/jpeg")},
     )
     assert response.status_code == 413
+
+
+def test_recognition_rate_limit_returns_retry_after(monkeypatch):
+    from app import main
+    from app.rate_limiter import MemoryRateLimiter
+
+    monkeypatch.setattr(main, "recognition_rate_limiter", MemoryRateLimiter(requests_per_minute=1, max_keys=10))
+    first = client.post("/api/v1/recognize", files={"image": ("hand.jpg", b"jpeg", "image/jpeg")})
+    second = client.post("/api/v1/recognize", files={"image": ("hand.jpg", b"jpeg", "image/jpeg")})
+    assert first.status_code == 400
+    assert second.status_code == 429
+    assert int(second.headers["Retry-After"]) >= 59
+
+
+def test_recognition_rate_limit_is_checked_off_the_event_loop(monkeypatch):
+    import asyncio
+
+    from app import main
+
+    loops = []
+
+    class _Limiter:
+        def acquire(self, _key: str) -> float:
+            try:
+                loops.append(asyncio.get_running_loop())
+            except RuntimeError:
+                loops.append(None)
+            return 0.0
+
+        def close(self) -> None:
+            pass
+
+    monkeypatch.setattr(main, "recognition_rate_limiter", _Limiter())
+    client.post("/api/v1/recognize", files={"image": ("hand.jpg", b"jpeg", "image/jpeg")})
+    assert loops == [None]
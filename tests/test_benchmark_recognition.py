@@ -0,0 +1,35 @@
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from app import hand_extraction, tile_recognizer_local
+from app.recognition_cache import RecognitionCache
+from scripts import benchmark_recognition
+
+
+def _fake_local_recognizer(monkeypatch) -> None:
+    boxes = [(100, 160, 40 + col * 50, 85 + col * 50) for col in range(14)]
+    monkeypatch.setattr(tile_recognizer_local, "_load_model", lambda: None)
+    monkeypatch.setattr(
+        tile_recognizer_local, "_segment_tile_images",
+        lambda rgb, _backend: (boxes, tile_recognizer_local._crop_boxes(rgb, boxes)),
+    )
+    monkeypatch.setattr(
+        tile_recognizer_local, "_classify_tiles_top_k",
+        lambda tiles, top_k, cumulative: [[("dots-1", 0.9)] for _ in tiles],
+    )
+
+
+def test_extract_target_runs_recognition_on_every_call_by_default(monkeypatch):
+    _fake_local_recognizer(monkeypatch)
+    monkeypatch.setattr(hand_extraction, "recognition_cache", RecognitionCache(16, 1_000_000, 60))
+    benchmark_recognition._configure_recognition_cache(enabled=False)
+    buf = BytesIO()
+    Image.fromarray(np.zeros((480, 800, 3), dtype=np.uint8)).save(buf, format="PNG")
+
+    for _ in range(2):
+        _elapsed, stages, _outcome = benchmark_recognition._timed_call(
+            benchmark_recognition.TARGETS["extract"], buf.getvalue(),
+        )
+        assert "classify" in stages
@@ -1,10 +1,28 @@
+import base64
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from app import hand_extraction, openai_client
 from app.hand_extraction import (
     _fallback_result,
+    _hybrid_recognition,
     _merge_slot_estimates,
     _normalize_candidates,
     _slot_options,
     hand_shape_from_estimate_with_warnings,
+    is_fallback_result,
 )
+from app.openai_client import set_openai_client_override
+from app.recognition_cache import RecognitionCache
+from app.tile_recognizer_local import LocalRecognition
 
 
 def _slots_from_tiles(tiles: list[str]) -> list[dict]:
@@ -97,6 +115,14 @@ def test_fallback_result_can_omit_missing_api_key_warning():
     assert "x" in result["warnings"]
 
 
+def test_is_fallback_result_recognizes_the_placeholder_hand():
+    assert is_fallback_result(_fallback_result())
+    assert is_fallback_result(_fallback_result(include_missing_api_key_warning=False)), "fixed hand, no warnings"
+    recognized = {"tiles_count": 14, "slots": _slots_from_tiles(["1m"] * 14), "warnings": []}
+    assert not is_fallback_result(recognized)
+    assert not is_fallback_result(None)
+
+
 def test_slot_options_allows_candidate_to_beat_low_confidence_top():
     slot = {
         "index": 0,
@@ -110,3 +136,276 @@ def test_slot_options_allows_candidate_to_beat_low_confidence_top():
     }
     ranked = sorted(_slot_options(slot), key=lambda x: x["confidence"], reverse=True)
     assert ranked[0]["tile"] == "4s"
+
+
+class _FakeResponses:
+    def __init__(self, output_text: str) -> None:
+        self.output_text = output_text
+        self.requests: list[dict] = []
+
+    def create(self, **kwargs):
+        self.requests.append(kwargs)
+        return self
+
+
+class _FakeClient:
+    def __init__(self, output_text: str) -> None:
+        self.responses = _FakeResponses(output_text)
+
+
+def _local_recognition(tiles: list[str], ambiguous: set[int]) -> LocalRecognition:
+    slots = []
+    for idx, tile in enumerate(tiles):
+        conf = 0.4 if idx in ambiguous else 0.95
+        slots.append(
+            {
+                "index": idx,
+                "top": tile,
+                "candidates": [{"tile": tile, "confidence": conf}],
+                "ambiguous": idx in ambiguous,
+                "top_confidence": conf,
+            }
+        )
+    crops = [np.full((60, 45, 3), 200, dtype=np.uint8) for _ in tiles]
+    return LocalRecognition(result=None, slots=slots, crops=crops)
+
+
+def test_hybrid_recognition_sends_only_ambiguous_crops_and_merges_answers():
+    tiles = ["1m", "2m", "3m", "4p", "5p", "6p", "7s", "8s", "9s", "E", "E", "E", "3p", "9p"]
+    local = _local_recognition(tiles, ambiguous={12, 13})
+    client = _FakeClient(json.dumps({"slots": [{"top": "2p", "candidates": []}, {"top": "2p", "candidates": []}]}))
+
+    result = _hybrid_recognition(client, local)
+
+    assert result is not None
+    assert [slot["top"] for slot in result["slots"]] == tiles[:12] + ["2p", "2p"]
+    assert [slot["index"] for slot in result["slots"]] == list(range(14))
+    prompt = client.responses.requests[0]["input"][0]["content"][0]["text"]
+    assert "strip of 2 separate mahjong tiles" in prompt
+    assert any("Hybrid recognition" in warning for warning in result["warnings"])
+
+
+def test_hybrid_recognition_keeps_local_warnings():
+    tiles = ["1m", "2m", "3m", "4p", "5p", "6p", "7s", "8s", "9s", "E", "E", "E", "3p", "9p"]
+    local = _local_recognition(tiles, ambiguous={13})
+    local.warnings = ["slot 14: label 'flower' not mapped to tile code"]
+    client = _FakeClient(json.dumps({"slots": [{"top": "2p", "candidates": []}]}))
+
+    result = _hybrid_recognition(client, local)
+
+    assert result is not None
+    assert result["warnings"][0] == "slot 14: label 'flower' not mapped to tile code"
+
+
+def test_hybrid_recognition_gives_up_when_remote_slot_count_mismatches():
+    tiles = ["1m", "2m", "3m", "4p", "5p", "6p", "7s", "8s", "9s", "E", "E", "E", "3p", "9p"]
+    local = _local_recognition(tiles, ambiguous={12, 13})
+    client = _FakeClient(json.dumps({"slots": [{"top": "2p", "candidates": []}]}))
+
+    assert _hybrid_recognition(client, local) is None
+
+
+def test_hybrid_recognition_skips_when_too_many_slots_are_ambiguous(monkeypatch):
+    monkeypatch.setattr(hand_extraction.settings, "hybrid_max_ambiguous_slots", 1)
+    tiles = ["1m", "2m", "3m", "4p", "5p", "6p", "7s", "8s", "9s", "E", "E", "E", "3p", "9p"]
+    client = _FakeClient("{}")
+
+    assert _hybrid_recognition(client, _local_recognition(tiles, ambiguous={12, 13})) is None
+    assert client.responses.requests == []
+
+
+class _SlowResponses:
+    """responses.create stand-in: each call sleeps, then answers or fails
+    according to the script for that call's order."""
+
+    def __init__(self, script: list[tuple[float, str | None]]) -> None:
+        self._script = list(script)
+        self._lock = threading.Lock()
+        self.max_concurrent = 0
+        self._active = 0
+
+    def create(self, **_kwargs):
+        with self._lock:
+            delay, outcome = self._script.pop(0)
+            self._active += 1
+            self.max_concurrent = max(self.max_concurrent, self._active)
+        try:
+            time.sleep(delay)
+            if outcome is None:
+                raise RuntimeError("upstream error")
+            return SimpleNamespace(output_text=outcome)
+        finally:
+            with self._lock:
+                self._active -= 1
+
+
+def _jpeg(width: int = 16, height: int = 16) -> bytes:
+    buf = BytesIO()
+    Image.new("RGB", (width, height), (200, 200, 200)).save(buf, format="JPEG")
+    return buf.getvalue()
+
+
+def _remote_only(monkeypatch, responses: _SlowResponses) -> None:
+    monkeypatch.setattr(hand_extraction.settings, "openai_api_key", "test-key")
+    monkeypatch.setattr(hand_extraction.settings, "recognize_ensemble_passes", 3)
+    monkeypatch.setattr(hand_extraction.settings, "recognize_adaptive_ensemble", False)
+    monkeypatch.setattr(hand_extraction, "recognition_cache", RecognitionCache(0, 0, 0))
+    monkeypatch.setattr(hand_extraction, "_recognize_locally", lambda *_args: None)
+    monkeypatch.setattr(openai_client, "_override", None)  # restored at teardown
+    set_openai_client_override(SimpleNamespace(responses=responses))
+
+
+_WINNING_PAYLOAD = json.dumps(
+    {"tiles_count": 14, "slots": _slots_from_tiles(["1m", "2m", "3m", "4p", "5p", "6p", "7s", "8s", "9s", "E", "E", "E", "2p", "2p"])}
+)
+
+
+def test_ensemble_passes_run_concurrently_and_merge_partial_results(monkeypatch):
+    responses = _SlowResponses([(0.3, _WINNING_PAYLOAD), (0.3, None), (0.3, _WINNING_PAYLOAD)])
+    _remote_only(monkeypatch, responses)
+
+    result = hand_extraction.extract_hand_from_image(_jpeg())
+
+    assert responses.max_concurrent == 3
+    assert result["slots"][0]["top"] == "1m"
+    assert any("recognition failed (upstream error)" in w for w in result["warnings"])
+    assert any("Ensemble merge applied across 2 passes" in w for w in result["warnings"])
+
+
+def test_ensemble_pass_over_timeout_is_dropped(monkeypatch):
+    responses = _SlowResponses([(0.0, _WINNING_PAYLOAD), (1.0, _WINNING_PAYLOAD), (0.0, _WINNING_PAYLOAD)])
+    _remote_only(monkeypatch, responses)
+    monkeypatch.setattr(hand_extraction.settings, "remote_pass_timeout_seconds", 0.3)
+
+    result = hand_extraction.extract_hand_from_image(_jpeg())
+
+    assert any("timed out" in w for w in result["warnings"])
+    assert any("across 2 passes" in w for w in result["warnings"])
+
+
+def test_ensemble_pass_timeout_excludes_time_queued_for_a_thread(monkeypatch):
+    responses = _SlowResponses([(0.25, _WINNING_PAYLOAD)] * 3)
+    _remote_only(monkeypatch, responses)
+    monkeypatch.setattr(hand_extraction.settings, "remote_pass_timeout_seconds", 0.4)
+    busy_pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(hand_extraction, "_remote_executor", busy_pool)
+
+    result = hand_extraction.extract_hand_from_image(_jpeg())
+    busy_pool.shutdown()
+
+    assert not any("timed out" in w for w in result["warnings"])
+    assert any("across 3 passes" in w for w in result["warnings"])
+
+
+def test_remote_pass_pool_fits_every_concurrent_recognition(monkeypatch):
+    monkeypatch.setattr(hand_extraction.settings, "remote_pass_workers", 2)
+    monkeypatch.setattr(hand_extraction.settings, "recognition_executor_workers", 4)
+    assert hand_extraction._remote_pass_workers() == 12
+
+
+def test_ensemble_stops_waiting_when_canceled(monkeypatch):
+    responses = _SlowResponses([(1.0, _WINNING_PAYLOAD)] * 3)
+    _remote_only(monkeypatch, responses)
+    cancel_at = time.perf_counter() + 0.2
+
+    started = time.perf_counter()
+    with pytest.raises(hand_extraction.RecognitionCancelledError):
+        hand_extraction.extract_hand_from_image(_jpeg(), should_cancel=lambda: time.perf_counter() > cancel_at)
+    assert time.perf_counter() - started < 0.8
+
+
+def _adaptive(monkeypatch, responses: _SlowResponses) -> None:
+    _remote_only(monkeypatch, responses)
+    monkeypatch.setattr(hand_extraction.settings, "recognize_adaptive_ensemble", True)
+
+
+class _VariantResponses:
+    """responses.create stand-in answering per ensemble variant (see
+    _tag_variants), so concurrent passes get a deterministic script."""
+
+    def __init__(self, script: dict[str, tuple[float, str]]) -> None:
+        self._script = script
+        self.sent: list[str] = []
+
+    def create(self, **kwargs):
+        url = kwargs["input"][1]["content"][1]["image_url"]
+        name = base64.b64decode(url.partition("base64,")[2]).decode()
+        self.sent.append(name)
+        delay, outcome = self._script[name]
+        time.sleep(delay)
+        return SimpleNamespace(output_text=outcome)
+
+
+def _tag_variants(monkeypatch) -> None:
+    """Send each variant's name as its image bytes."""
+    monkeypatch.setattr(
+        hand_extraction,
+        "_image_variants",
+        lambda _image, names=None: [
+            (name, name.encode(), weight)
+            for name, _transform, weight in hand_extraction._VARIANTS
+            if names is None or name in names
+        ],
+    )
+
+
+def _uncertain_payload() -> str:
+    uncertain = json.loads(_WINNING_PAYLOAD)
+    for slot in uncertain["slots"]:
+        slot["candidates"][0]["confidence"] = 0.5
+    return json.dumps(uncertain)
+
+
+def test_adaptive_ensemble_sends_only_the_first_pass_when_it_is_confident(monkeypatch):
+    responses = _VariantResponses(
+        {"orig": (0.0, _WINNING_PAYLOAD), "autocontrast": (0.0, _WINNING_PAYLOAD), "contrast_sharp": (0.0, _WINNING_PAYLOAD)}
+    )
+    _adaptive(monkeypatch, responses)
+    _tag_variants(monkeypatch)
+
+    result = hand_extraction.extract_hand_from_image(_jpeg())
+
+    assert responses.sent == ["orig"]
+    assert "Adaptive ensemble: stopped after 1 of 3 passes." in result["warnings"]
+
+
+def test_adaptive_ensemble_adds_the_remaining_passes_when_uncertain(monkeypatch):
+    responses = _VariantResponses(
+        {"orig": (0.0, _uncertain_payload()), "autocontrast": (0.0, _WINNING_PAYLOAD), "contrast_sharp": (0.0, _WINNING_PAYLOAD)}
+    )
+    _adaptive(monkeypatch, responses)
+    _tag_variants(monkeypatch)
+
+    result = hand_extraction.extract_hand_from_image(_jpeg())
+
+    assert responses.sent[0] == "orig"
+    assert sorted(responses.sent[1:]) == ["autocontrast", "contrast_sharp"]
+    assert any("across 3 passes" in w for w in result["warnings"])
+
+
+def test_speculative_ensemble_drops_pending_passes_on_confident_first_pass(monkeypatch):
+    responses = _VariantResponses(
+        {"orig": (0.0, _WINNING_PAYLOAD), "autocontrast": (2.0, _WINNING_PAYLOAD), "contrast_sharp": (2.0, _WINNING_PAYLOAD)}
+    )
+    _adaptive(monkeypatch, responses)
+    monkeypatch.setattr(hand_extraction.settings, "recognize_speculative_ensemble", True)
+    _tag_variants(monkeypatch)
+
+    result = hand_extraction.extract_hand_from_image(_jpeg())
+
+    assert "Adaptive ensemble: stopped after 1 of 3 passes." in result["warnings"]
+    assert not any("Ensemble merge" in w for w in result["warnings"])
+
+
+def test_remote_image_is_cropped_to_hand_and_sized_for_the_vision_model():
+    rgb = np.random.default_rng(0).integers(0, 256, size=(3024, 4032, 3), dtype=np.uint8)
+
+    full = hand_extraction._remote_image(rgb)
+    hand = hand_extraction._remote_image(rgb, (1000, 1600, 200, 3800))
+
+    assert full.size == (1024, 768)
+    assert hand.size == (2048, 341), "600x3600 crop fitted into 2048 on the long side"
+    assert hand_extraction._vision_input_size(320, 200) == (320, 200), "never upscales"
+    variants = hand_extraction._image_variants(hand)
+    assert [name for name, _data, _w in variants] == ["orig", "autocontrast", "contrast_sharp"]
+    assert len(variants[0][1]) < len(hand_extraction._jpeg_bytes(Image.fromarray(rgb), 95))
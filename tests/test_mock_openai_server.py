@@ -0,0 +1,67 @@
+import base64
+import json
+
+from fastapi.testclient import TestClient
+
+from app.hand_extraction import MOSAIC_PROMPT, SYSTEM_PROMPT
+from app.recognition_postprocess import pick_winning_tiles
+from app.validators import validate_tile
+from scripts.mock_openai_server import MockConfig, create_app
+
+
+def _request(image: bytes, system_prompt: str = SYSTEM_PROMPT) -> dict:
+    url = f"data:image/jpeg;base64,{base64.b64encode(image).decode('ascii')}"
+    return {
+        "model": "gpt-4o-mini",
+        "input": [
+            {"role": "system", "content": [{"type": "input_text", "text": system_prompt}]},
+            {
+                "role": "user",
+                "content": [
+                    {"type": "input_text", "text": "Return strict JSON."},
+                    {"type": "input_image", "image_url": url},
+                ],
+            },
+        ],
+    }
+
+
+def _payload(response) -> dict:
+    return json.loads(response.json()["output"][0]["content"][0]["text"])
+
+
+def _client(**overrides) -> TestClient:
+    config = MockConfig(latency_ms=0, latency_spread_ms=0, ambiguous_rate=0.0, **overrides)
+    return TestClient(create_app(config))
+
+
+def test_derived_payload_is_a_winning_hand_and_stats_count_requests():
+    client = _client()
+
+    payload = _payload(client.post("/v1/responses", json=_request(b"hand-1")))
+    client.post("/v1/responses", json=_request(b"hand-2"))
+
+    tiles = [slot["top"] for slot in payload["slots"]]
+    assert payload["tiles_count"] == len(tiles) == 14
+    for tile in tiles:
+        validate_tile(tile)
+    assert pick_winning_tiles(payload["slots"]) is not None
+    assert client.get("/stats").json() == {"requests": 2, "failures": 0, "by_endpoint": {"responses": 2}}
+
+
+def test_mosaic_requests_get_the_slot_count_from_the_prompt():
+    client = _client()
+
+    payload = _payload(client.post("/v1/responses", json=_request(b"mosaic", MOSAIC_PROMPT.format(count=3))))
+
+    assert payload["tiles_count"] == len(payload["slots"]) == 3
+
+
+def test_failures_per_image_do_not_depend_on_arrival_order():
+    images = [f"image-{i}".encode() for i in range(12)]
+
+    def failed(order: list[bytes]) -> dict[bytes, bool]:
+        client = _client(failure_rate=0.5, seed=7)
+        return {image: client.post("/v1/responses", json=_request(image)).status_code != 200 for image in order}
+
+    assert failed(images) == failed(images[::-1])
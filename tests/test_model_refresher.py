@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from app import tile_recognizer_local
+from app.model_refresher import ModelRefresher, _LocalModelSource, read_current_version
+from app.tile_recognizer_local import _InterpreterPool, _LoadedModel, _PooledInterpreter
+from tests.tflite_fakes import FakeInterpreter
+
+
+def _publish(bucket, version: str, labels: list[str], approve: bool = True) -> None:
+    model_dir = bucket / "models" / version
+    model_dir.mkdir(parents=True)
+    (model_dir / "tile_classifier.tflite").write_bytes(b"tflite-" + version.encode())
+    (model_dir / "labels.txt").write_text("\n".join(labels))
+    if approve:
+        (bucket / "models" / "latest.json").write_text(json.dumps({"version": version}))
+
+
+@pytest.fixture
+def fake_interpreters(monkeypatch):
+    created = []
+
+    def fake_new_interpreter(model_path):
+        created.append(model_path.read_bytes())
+        return _PooledInterpreter(FakeInterpreter(num_classes=3))
+
+    monkeypatch.setattr(tile_recognizer_local, "_new_interpreter", fake_new_interpreter)
+    monkeypatch.setattr(tile_recognizer_local, "_model", None)
+    return created
+
+
+def test_refresher_installs_new_versions_from_local_bucket(tmp_path, fake_interpreters):
+    bucket, downloads = tmp_path / "bucket", tmp_path / "downloads"
+    installed = []
+    refresher = ModelRefresher(_LocalModelSource(bucket), downloads, 60, on_installed=installed.append)
+
+    assert refresher.check_once() is False  # no pointer yet
+
+    _publish(bucket, "20260101000000", ["dots-1", "dots-2", "dots-3"])
+    assert refresher.check_once() is True
+    assert refresher.check_once() is False
+    assert tile_recognizer_local.model_version() == "20260101000000"
+    pool_size = tile_recognizer_local.settings.tflite_interpreter_pool_size
+    assert fake_interpreters == [b"tflite-20260101000000"] * pool_size, "every interpreter is warmed before the swap"
+    stats = tile_recognizer_local.interpreter_pool_stats()
+    assert stats["created"] == stats["idle"] == pool_size
+
+    _publish(bucket, "20260102000000", ["bamboo-1", "bamboo-2", "bamboo-3"])
+    assert refresher.check_once() is True
+    assert tile_recognizer_local._model.labels == ["bamboo-1", "bamboo-2", "bamboo-3"]
+    assert installed == ["20260101000000", "20260102000000"]
+    assert read_current_version(downloads) == "20260102000000"
+
+
+def test_refresher_keeps_serving_old_model_when_download_is_incomplete(tmp_path, fake_interpreters):
+    bucket, downloads = tmp_path / "bucket", tmp_path / "downloads"
+    refresher = ModelRefresher(_LocalModelSource(bucket), downloads, 60)
+    _publish(bucket, "20260101000000", ["dots-1", "dots-2", "dots-3"])
+    refresher.check_once()
+
+    _publish(bucket, "20260102000000", ["dots-1", "dots-2", "dots-3"])
+    (bucket / "models" / "20260102000000" / "labels.txt").unlink()
+    with pytest.raises(FileNotFoundError):
+        refresher.check_once()
+
+    assert tile_recognizer_local.model_version() == "20260101000000"
+    assert not (downloads / "20260102000000").exists()
+    assert read_current_version(downloads) == "20260101000000"
+
+
+def test_in_flight_checkout_finishes_on_previous_model(tmp_path, fake_interpreters):
+    old_pool = _InterpreterPool(lambda: _PooledInterpreter(FakeInterpreter(num_classes=3)), max_size=1)
+    tile_recognizer_local._model = _LoadedModel("old", ["dots-1", "dots-2", "dots-3"], old_pool)
+    bucket, downloads = tmp_path / "bucket", tmp_path / "downloads"
+    _publish(bucket, "20260101000000", ["dots-1", "dots-2", "dots-3"])
+
+    with old_pool.checkout() as pooled:
+        ModelRefresher(_LocalModelSource(bucket), downloads, 60).check_once()
+        assert tile_recognizer_local.model_version() == "20260101000000"
+        pooled.interpreter.invoke()  # still usable
+    assert old_pool.stats()["in_use"] == 0
@@ -0,0 +1,42 @@
+from app import openai_client
+from app.openai_client import close_openai_client, get_openai_client, set_openai_client_override
+
+
+def test_shared_client_is_reused_and_configured_from_settings(monkeypatch):
+    monkeypatch.setattr(openai_client, "_client", None)
+    monkeypatch.setattr(openai_client.settings, "openai_api_key", "test-key")
+    monkeypatch.setattr(openai_client.settings, "openai_base_url", "http://127.0.0.1:9999/v1")
+    monkeypatch.setattr(openai_client.settings, "openai_max_retries", 5)
+
+    client = get_openai_client()
+    try:
+        assert get_openai_client() is client
+        assert str(client.base_url) == "http://127.0.0.1:9999/v1/"
+        assert client.max_retries == 5
+    finally:
+        close_openai_client()
+    assert openai_client._client is None
+
+
+def test_override_replaces_shared_client(monkeypatch):
+    monkeypatch.setattr(openai_client, "_override", None)
+    stub = object()
+    set_openai_client_override(stub)
+    assert get_openai_client() is stub
+    set_openai_client_override(None)
+    assert openai_client._override is None
+
+
+def test_attempts_fit_in_the_remote_pass_timeout(monkeypatch):
+    monkeypatch.setattr(openai_client, "_client", None)
+    monkeypatch.setattr(openai_client.settings, "openai_api_key", "test-key")
+    monkeypatch.setattr(openai_client.settings, "openai_timeout_seconds", 60.0)
+    monkeypatch.setattr(openai_client.settings, "openai_max_retries", 2)
+    monkeypatch.setattr(openai_client.settings, "remote_pass_timeout_seconds", 30.0)
+
+    client = get_openai_client()
+    try:
+        assert client.max_retries == 2
+        assert client.timeout.read == 10.0
+    finally:
+        close_openai_client()
@@ -0,0 +1,29 @@
+import numpy as np
+
+from app.periodicity import autocorrelation, estimate_pitch, find_local_maxima
+
+
+def test_autocorrelation_matches_direct_correlation():
+    rng = np.random.default_rng(0)
+    for n in (1, 2, 7, 64, 333):
+        sig = rng.normal(size=n)
+        direct = np.correlate(sig, sig, mode="full")[n - 1:]
+        assert np.allclose(autocorrelation(sig), direct)
+
+
+def test_find_local_maxima_applies_prominence_against_both_sides():
+    seg = np.array([0.0, 0.5, 0.0, 0.2, 0.21, 0.2, 0.0, 0.9, 0.8, 0.85, 0.0])
+    assert find_local_maxima(seg, prominence=0.02) == [1, 4, 7, 9]
+    assert find_local_maxima(seg, prominence=0.3) == [1, 7, 9]
+
+
+def test_estimate_pitch_finds_fundamental_of_square_wave():
+    pitch = 343
+    profile = ((np.arange(14 * pitch) % pitch) >= 3).astype(np.float64)
+    found, confidence = estimate_pitch(profile, profile.size)
+    assert found == pitch
+    assert confidence > 0.5
+
+
+def test_estimate_pitch_returns_none_for_flat_profile():
+    assert estimate_pitch(np.ones(500), 500) == (None, 0.0)
@@ -0,0 +1,51 @@
+from app.rate_limiter import MemoryRateLimiter, SQLiteRateLimiter, retry_after_header
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_memory_limiter_refills_and_reports_wait():
+    clock = _Clock()
+    limiter = MemoryRateLimiter(requests_per_minute=2, max_keys=10, clock=clock)
+
+    assert limiter.acquire("a") == 0.0
+    assert limiter.acquire("a") == 0.0
+    wait = limiter.acquire("a")
+    assert wait == 30.0
+    assert retry_after_header(wait) == "30"
+
+    clock.now += 30
+    assert limiter.acquire("a") == 0.0
+    assert limiter.acquire("b") == 0.0, "buckets are per key"
+
+
+def test_memory_limiter_evicts_least_recently_used_keys():
+    limiter = MemoryRateLimiter(requests_per_minute=1, max_keys=2, clock=_Clock())
+    limiter.acquire("a")
+    limiter.acquire("b")
+    limiter.acquire("c")
+
+    assert len(limiter) == 2
+    assert limiter.acquire("a") == 0.0, "evicted key starts with a full bucket"
+    assert limiter.acquire("c") > 0
+
+
+def test_sqlite_limiter_is_shared_between_instances(tmp_path):
+    clock = _Clock()
+    path = tmp_path / "rate.sqlite3"
+    first = SQLiteRateLimiter(path, requests_per_minute=2, clock=clock)
+    second = SQLiteRateLimiter(path, requests_per_minute=2, clock=clock)
+
+    assert first.acquire("a") == 0.0
+    assert second.acquire("a") == 0.0
+    assert first.acquire("a") > 0
+    assert second.acquire("a") > 0
+    clock.now += 30
+    assert second.acquire("a") == 0.0
+    first.close()
+    second.close()
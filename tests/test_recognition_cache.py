@@ -0,0 +1,120 @@
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from app import hand_extraction
+from app.recognition_cache import RecognitionCache, pixel_digest
+from app.tile_recognizer_local import LocalRecognition
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_cache_returns_independent_copies_and_expires():
+    clock = _Clock()
+    cache = RecognitionCache(max_entries=4, max_bytes=10_000, ttl_seconds=60, clock=clock)
+    cache.put("k", "v1", {"slots": [1, 2]})
+
+    first = cache.get("k", "v1")
+    first["slots"].append(3)
+    assert cache.get("k", "v1") == {"slots": [1, 2]}
+
+    clock.now = 61
+    assert cache.get("k", "v1") is None
+
+
+def test_cache_evicts_least_recently_used_within_entry_and_byte_caps():
+    cache = RecognitionCache(max_entries=2, max_bytes=10_000, ttl_seconds=60)
+    cache.put("a", "v", {"n": 1})
+    cache.put("b", "v", {"n": 2})
+    cache.get("a", "v")
+    cache.put("c", "v", {"n": 3})
+    assert cache.get("b", "v") is None
+    assert cache.get("a", "v") == {"n": 1}
+
+    small = RecognitionCache(max_entries=10, max_bytes=30, ttl_seconds=60)
+    small.put("a", "v", {"pad": "x" * 10})
+    small.put("b", "v", {"pad": "y" * 10})
+    assert small.get("a", "v") is None
+    assert small.stats()["bytes"] <= 30
+
+
+def test_cache_is_dropped_when_version_changes():
+    cache = RecognitionCache(max_entries=4, max_bytes=10_000, ttl_seconds=60)
+    cache.put("k", "model-1", {"n": 1})
+    assert cache.get("k", "model-2") is None
+    assert cache.get("k", "model-1") is None
+    assert cache.stats()["version"] == "model-1"
+
+
+def test_pixel_digest_ignores_encoding_but_not_content():
+    rgb = np.zeros((4, 5, 3), dtype=np.uint8)
+    assert pixel_digest(rgb) == pixel_digest(rgb.copy())
+    assert pixel_digest(rgb) != pixel_digest(rgb.reshape(5, 4, 3))
+    changed = rgb.copy()
+    changed[0, 0, 0] = 1
+    assert pixel_digest(rgb) != pixel_digest(changed)
+
+
+def _encoded(rgb: np.ndarray, fmt: str) -> bytes:
+    buf = BytesIO()
+    Image.fromarray(rgb).save(buf, format=fmt)
+    return buf.getvalue()
+
+
+def test_extract_hand_from_image_reuses_result_for_same_pixels(monkeypatch):
+    cache = RecognitionCache(max_entries=4, max_bytes=100_000, ttl_seconds=60)
+    monkeypatch.setattr(hand_extraction, "recognition_cache", cache)
+    versions = iter(["model-1", "model-1", "model-2"])
+    monkeypatch.setattr(hand_extraction, "_recognizer_version", lambda: next(versions))
+    calls = []
+
+    def fake_local(rgb, _should_cancel, _backend):
+        calls.append(rgb.shape)
+        result = {"tiles_count": 14, "slots": [], "warnings": [], "model_name": "fake"}
+        return LocalRecognition(result=result, slots=[], crops=[])
+
+    monkeypatch.setattr(hand_extraction, "_recognize_locally", fake_local)
+    rgb = np.random.default_rng(0).integers(0, 256, size=(8, 8, 3), dtype=np.uint8)
+
+    hand_extraction.extract_hand_from_image(_encoded(rgb, "PNG"))
+    hand_extraction.extract_hand_from_image(_encoded(rgb, "BMP"))  # same pixels, different bytes
+    assert len(calls) == 1
+
+    hand_extraction.extract_hand_from_image(_encoded(rgb, "PNG"))  # model changed
+    assert len(calls) == 2
+
+
+def test_cache_key_changes_with_result_affecting_settings(monkeypatch):
+    rgb = np.zeros((8, 8, 3), dtype=np.uint8)
+    keys = {hand_extraction._cache_key(rgb, None)}
+    for name, value in [
+        ("recognize_adaptive_ensemble", False),
+        ("recognize_speculative_ensemble", True),
+        ("hybrid_remote_fallback", False),
+        ("hybrid_max_ambiguous_slots", 2),
+        ("local_top_k", 1),
+        ("local_top_k_cumulative", 0.5),
+        ("segmentation_max_side", 800),
+        ("segmentation_refine_pitch", False),
+    ]:
+        monkeypatch.setattr(hand_extraction.settings, name, value)
+        keys.add(hand_extraction._cache_key(rgb, None))
+    assert len(keys) == 9
+
+
+def test_extract_hand_from_image_does_not_cache_fallback(monkeypatch):
+    cache = RecognitionCache(max_entries=4, max_bytes=100_000, ttl_seconds=60)
+    monkeypatch.setattr(hand_extraction, "recognition_cache", cache)
+    monkeypatch.setattr(hand_extraction, "_recognize_locally", lambda *_args: None)
+    monkeypatch.setattr(hand_extraction.settings, "openai_api_key", "")
+
+    image = _encoded(np.zeros((8, 8, 3), dtype=np.uint8), "PNG")
+    hand_extraction.extract_hand_from_image(image)
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,70 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.recognition_executor import RecognitionExecutor, RecognitionExecutorSaturated
+
+
+def test_executor_rejects_beyond_workers_plus_queue():
+    executor = RecognitionExecutor(max_workers=1, max_queue=1, initial_duration_seconds=3.0)
+    release = threading.Event()
+
+    async def scenario():
+        first = asyncio.ensure_future(executor.run(release.wait))
+        second = asyncio.ensure_future(executor.run(lambda: "queued"))
+        await asyncio.sleep(0.05)
+        with pytest.raises(RecognitionExecutorSaturated) as excinfo:
+            await executor.run(lambda: "rejected")
+        release.set()
+        return excinfo.value, await first, await second
+
+    saturated, first, second = asyncio.run(scenario())
+    executor.shutdown()
+
+    assert saturated.retry_after_seconds == 6
+    assert (first, second) == (True, "queued")
+    assert executor.stats()["in_flight"] == 0
+    assert executor.stats()["rejected"] == 1
+
+
+def test_saturated_recognition_returns_503_with_retry_after(monkeypatch):
+    async def saturated(*_args):
+        raise RecognitionExecutorSaturated(7)
+
+    monkeypatch.setattr(main.recognition_executor, "run", saturated)
+    response = TestClient(main.app).post(
+        "/api/v1/recognize",
+        files={"image": ("hand.jpg", b"jpeg", "image/jpeg")},
+    )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "7"
+
+
+def test_executor_releases_slot_of_job_cancelled_while_queued():
+    executor = RecognitionExecutor(max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(release.wait))
+        queued = asyncio.ensure_future(executor.run(lambda: "never runs"))
+        await asyncio.sleep(0.05)
+        queued.cancel()
+        await asyncio.sleep(0.05)
+        release.set()
+        await running
+        return await executor.run(lambda: "after")
+
+    assert asyncio.run(scenario()) == "after"
+    executor.shutdown()
+    assert executor.stats()["in_flight"] == 0
+
+
+def test_executor_runs_again_after_the_app_restarts():
+    for _ in range(2):
+        with TestClient(main.app):
+            pass
+
+    assert asyncio.run(main.recognition_executor.run(lambda: "ok")) == "ok"
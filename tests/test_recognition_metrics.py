@@ -0,0 +1,19 @@
+from app.recognition_metrics import collect_stage_timings, recognition_metrics, timed_stage
+
+
+def test_timed_stage_feeds_active_collector_and_global_metrics():
+    recognition_metrics.reset()
+    with collect_stage_timings() as stages:
+        with timed_stage("decode"):
+            pass
+        with timed_stage("decode"):
+            pass
+        with timed_stage("classify"):
+            pass
+    with timed_stage("classify"):  # outside any collector
+        pass
+
+    assert set(stages) == {"decode", "classify"}
+    snapshot = recognition_metrics.snapshot()
+    assert snapshot["stage.decode"]["count"] == 2
+    assert snapshot["stage.classify"]["count"] == 2
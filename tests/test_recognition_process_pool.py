@@ -0,0 +1,94 @@
+import time
+from concurrent.futures import CancelledError
+
+import numpy as np
+import pytest
+
+from app import tile_recognizer_local
+from app.recognition_metrics import collect_stage_timings, recognition_metrics, timed_stage
+from app.recognition_process_pool import RecognitionProcessPool
+
+
+def _sleep_then_sum(image: np.ndarray, seconds: float) -> int:
+    time.sleep(seconds)
+    return int(image.sum())
+
+
+def _timed_sum(image: np.ndarray) -> int:
+    with timed_stage("worker_sum"):
+        recognition_metrics.record_count("worker.sums")
+        return int(image.sum())
+
+
+def test_process_pool_passes_image_through_shared_memory():
+    pool = RecognitionProcessPool(max_workers=1)
+    try:
+        image = np.arange(4 * 5 * 3, dtype=np.uint8).reshape(4, 5, 3)
+        assert pool.run(np.sum, image) == int(image.sum())
+        # Non-contiguous inputs are copied into a contiguous segment.
+        assert pool.run(np.sum, image[:, ::2]) == int(image[:, ::2].sum())
+    finally:
+        pool.shutdown()
+
+
+def test_process_pool_stops_waiting_when_canceled():
+    pool = RecognitionProcessPool(max_workers=1)
+    try:
+        image = np.ones((2, 2, 3), dtype=np.uint8)
+        with pytest.raises(CancelledError):
+            pool.run(_sleep_then_sum, image, 5.0, should_cancel=lambda: True)
+    finally:
+        pool.shutdown()
+
+
+_real_recognize_tiles_rgb_detailed = tile_recognizer_local.recognize_tiles_rgb_detailed
+
+
+def _gate_failing_recognition(image: np.ndarray, segmentation_backend: str | None):
+    """recognize_tiles_rgb_detailed in the worker, with segmentation and the
+    classifier faked so the gates fail and crops are returned."""
+    boxes = [(0, 8, col * 4, col * 4 + 4) for col in range(14)]
+    tile_recognizer_local._load_model = lambda: None
+    tile_recognizer_local._segment_tile_images = lambda rgb, _backend: (
+        boxes, tile_recognizer_local._crop_boxes(rgb, boxes),
+    )
+    tile_recognizer_local._classify_tiles_top_k = lambda tiles, top_k, cumulative: [
+        [("dots-1", 0.3), ("dots-2", 0.2)] for _ in tiles
+    ]
+    return _real_recognize_tiles_rgb_detailed(image, segmentation_backend)
+
+
+def test_process_pool_returns_crops_of_gate_failing_recognition(monkeypatch):
+    # recognize() hands this function to the worker in place of the real one.
+    monkeypatch.setattr(tile_recognizer_local, "recognize_tiles_rgb_detailed", _gate_failing_recognition)
+    pool = RecognitionProcessPool(max_workers=1)
+    try:
+        image = np.arange(8 * 56 * 3, dtype=np.uint8).reshape(8, 56, 3)
+        local = pool.recognize(image)
+
+        assert local is not None and local.result is None
+        assert len(local.crops) == 14
+        np.testing.assert_array_equal(local.crops[1], image[0:8, 4:8])
+        # The worker survived returning the crops.
+        assert pool.run(np.sum, image) == int(image.sum())
+    finally:
+        pool.shutdown()
+
+
+def test_process_pool_reports_worker_metrics_to_the_parent():
+    recognition_metrics.reset()
+    pool = RecognitionProcessPool(max_workers=1)
+    try:
+        image = np.ones((2, 2, 3), dtype=np.uint8)
+        with collect_stage_timings() as stages:
+            assert pool.run(_timed_sum, image) == 12
+        pool.run(_timed_sum, image)
+    finally:
+        pool.shutdown()
+        metrics = recognition_metrics.snapshot()
+        counts = recognition_metrics.counts()
+        recognition_metrics.reset()
+
+    assert set(stages) == {"worker_sum"}
+    assert metrics["stage.worker_sum"]["count"] == 2, "each task's timings arrive once"
+    assert counts["worker.sums"] == 2
@@ -0,0 +1,87 @@
+import json
+import sqlite3
+from types import SimpleNamespace
+
+from app import hand_extraction
+from app.remote_response_cache import RemoteResponseCache, close_remote_response_cache, response_key
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        self.now += 1
+        return self.now
+
+
+def test_key_covers_image_prompts_and_model():
+    base = response_key(b"img", ["sys", "user"], "gpt-4.1-mini")
+    assert base == response_key(b"img", ["sys", "user"], "gpt-4.1-mini")
+    assert base != response_key(b"img2", ["sys", "user"], "gpt-4.1-mini")
+    assert base != response_key(b"img", ["sys2", "user"], "gpt-4.1-mini")
+    assert base != response_key(b"img", ["sys", "user"], "gpt-4.1")
+
+
+def test_cache_persists_and_evicts_least_recently_used_by_size(tmp_path):
+    path = tmp_path / "remote.sqlite3"
+    cache = RemoteResponseCache(path, max_bytes=25, clock=_Clock())
+    cache.put("a", "x" * 10)
+    cache.put("b", "y" * 10)
+    assert cache.get("a") == "x" * 10
+    cache.put("c", "z" * 10)
+    assert cache.get("b") is None
+    assert cache.stats()["bytes"] == 20
+    cache.close()
+
+    reopened = RemoteResponseCache(path, max_bytes=25)
+    assert reopened.get("a") == "x" * 10
+    assert reopened.get("c") == "z" * 10
+    reopened.close()
+
+
+def test_running_total_tracks_replacements_and_reopen(tmp_path):
+    path = tmp_path / "remote.sqlite3"
+    cache = RemoteResponseCache(path, max_bytes=100, clock=_Clock())
+    cache.put("a", "x" * 10)
+    cache.put("a", "x" * 30)
+    cache.put("b", "y" * 5)
+    assert cache.stats()["bytes"] == 35
+    cache.close()
+
+    reopened = RemoteResponseCache(path, max_bytes=100)
+    assert reopened.stats()["bytes"] == 35
+    reopened.close()
+
+
+def test_hits_touch_last_used_in_batches(tmp_path):
+    path = tmp_path / "remote.sqlite3"
+    cache = RemoteResponseCache(path, max_bytes=100, clock=_Clock())
+    cache.put("a", "x")
+    cache.get("a")
+    cache.get("a")
+
+    reader = sqlite3.connect(str(path))
+    assert reader.execute("SELECT last_used FROM responses WHERE key = 'a'").fetchone() == (1.0,)
+    cache.close()
+    assert reader.execute("SELECT last_used FROM responses WHERE key = 'a'").fetchone() == (3.0,)
+    reader.close()
+
+
+def test_call_model_for_slots_answers_repeats_from_cache(tmp_path, monkeypatch):
+    calls = []
+    payload = {"tiles_count": 14, "slots": []}
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        return SimpleNamespace(output_text=json.dumps(payload))
+
+    monkeypatch.setattr(hand_extraction.settings, "remote_recognition_cache_path", str(tmp_path / "remote.sqlite3"))
+    client = SimpleNamespace(responses=SimpleNamespace(create=create))
+
+    assert hand_extraction._call_model_for_slots(client, b"jpeg") == payload
+    assert hand_extraction._call_model_for_slots(client, b"jpeg") == payload
+    assert len(calls) == 1
+    hand_extraction._call_model_for_slots(client, b"other")
+    assert len(calls) == 2
+    close_remote_response_cache()
@@ -1,10 +1,33 @@
+import threading
+import time
+from io import BytesIO
 from pathlib import Path
 
 import cv2
 import numpy as np
-from PIL import Image, ImageOps
-
-from app.tile_recognizer_local import _segment_tile_boxes, _segment_tiles
+import pytest
+from PIL import ExifTags, Image, ImageOps
+
+from app import tile_recognizer_local
+from app.tile_recognizer_local import (
+    _classify_tiles_top_k,
+    _decode_reduction,
+    _gate_local_result,
+    _InterpreterPool,
+    _LoadedModel,
+    _local_slots,
+    _min_cost_combination,
+    _moving_median,
+    _nms,
+    _segmentation_backend,
+    _YoloInterpreter,
+    _YoloTFLiteBackend,
+    _PooledInterpreter,
+    _segment_tile_boxes,
+    _segment_tiles,
+    decode_rgb,
+)
+from tests.tflite_fakes import FakeInterpreter
 
 BASE_DIR = Path(__file__).resolve().parents[1]
 CASE_001_IMAGE = BASE_DIR / "data" / "eval_images_cropped" / "case-001.jpg"
@@ -227,3 +250,338 @@ def test_segment_tile_boxes_keeps_each_slot_aligned_to_one_tile_on_curved_row():
                 f"box (sy={sy},ey={ey},sx={sx},ex={ex}) should not substantially contain "
                 f"neighboring tile {t} ({fraction:.0%})"
             )
+
+
+def test_classify_tiles_runs_one_batched_invoke(monkeypatch):
+    labels = ["dots-1", "dots-2", "dots-3"]
+    fake = FakeInterpreter(num_classes=len(labels))
+    pool = _InterpreterPool(lambda: _PooledInterpreter(fake), max_size=1)
+    monkeypatch.setattr(tile_recognizer_local, "_model", _LoadedModel("test", labels, pool))
+    tiles = [np.full((60 + i, 40, 3), 200, dtype=np.uint8) for i in range(14)]
+
+    results = [candidates[0] for candidates in _classify_tiles_top_k(tiles, top_k=1, cumulative=1.0)]
+
+    assert fake.invoke_count == 1
+    assert fake.resize_calls == [[14, 224, 224, 3]]
+    assert [label for label, _conf in results] == [labels[i % 3] for i in range(14)]
+    assert all(abs(conf - 0.9) < 1e-6 for _label, conf in results)
+
+    _classify_tiles_top_k(tiles, top_k=1, cumulative=1.0)
+    assert fake.resize_calls == [[14, 224, 224, 3]], "same batch size must not re-allocate"
+    assert fake.details_calls == 2, "tensor metadata must be resolved once, at interpreter creation"
+
+
+def test_classify_tiles_writes_normalized_pixels_into_input_tensor(monkeypatch):
+    fake = FakeInterpreter(num_classes=3)
+    pool = _InterpreterPool(lambda: _PooledInterpreter(fake), max_size=1)
+    monkeypatch.setattr(tile_recognizer_local, "_model", _LoadedModel("test", ["dots-1", "dots-2", "dots-3"], pool))
+    tiles = [np.full((50, 30, 3), value, dtype=np.uint8) for value in (0, 255)]
+
+    _classify_tiles_top_k(tiles, top_k=1, cumulative=1.0)
+
+    assert fake.input.shape == (2, 224, 224, 3)
+    assert np.allclose(fake.input[0], -1.0)
+    assert np.allclose(fake.input[1], 1.0)
+
+
+def test_classify_tiles_feeds_and_dequantizes_full_integer_model(monkeypatch):
+    fake = FakeInterpreter(num_classes=3, quantized=True)
+    pool = _InterpreterPool(lambda: _PooledInterpreter(fake), max_size=1)
+    monkeypatch.setattr(tile_recognizer_local, "_model", _LoadedModel("test", ["dots-1", "dots-2", "dots-3"], pool))
+    tiles = [np.full((50, 30, 3), value, dtype=np.uint8) for value in (0, 64, 255)]
+
+    results = [candidates[0] for candidates in _classify_tiles_top_k(tiles, top_k=1, cumulative=1.0)]
+
+    assert fake.input.dtype == np.uint8
+    assert fake.input[0].max() == 0
+    assert fake.input[1].min() == fake.input[1].max() == 64
+    assert fake.input[2].min() == 255
+    assert [label for label, _conf in results] == ["dots-1", "dots-2", "dots-3"]
+    assert all(abs(conf - 0.9) < 0.01 for _label, conf in results)
+
+
+def test_interpreter_pool_is_bounded_and_creates_lazily():
+    created: list[_PooledInterpreter] = []
+
+    def factory() -> _PooledInterpreter:
+        item = _PooledInterpreter(FakeInterpreter(num_classes=3))
+        created.append(item)
+        return item
+
+    pool = _InterpreterPool(factory, max_size=2)
+    assert created == []
+
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def worker() -> None:
+        nonlocal active, peak
+        with pool.checkout():
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.02)
+            with lock:
+                active -= 1
+
+    threads = [threading.Thread(target=worker) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    stats = pool.stats()
+    assert len(created) == 2
+    assert peak <= 2
+    assert stats["created"] == 2
+    assert stats["in_use"] == 0
+    assert stats["idle"] == 2
+    assert stats["waits"] >= 1
+
+
+def test_moving_median_matches_truncated_window_median():
+    rng = np.random.default_rng(0)
+    for n in (1, 3, 4, 5, 6, 50):
+        values = rng.normal(size=n)
+        expected = [np.median(values[max(0, r - 2):min(n, r + 3)]) for r in range(n)]
+        assert np.array_equal(_moving_median(values, 5), np.array(expected))
+
+
+def test_segment_tile_boxes_downscaled_pass_matches_full_resolution():
+    """The coarse pass runs on a downscaled copy, but boxes must come back
+    in full-resolution coordinates and agree with a full-resolution run
+    to within the downscale factor."""
+    canvas = _dark_background(4900, 550)
+    tile_w, tile_h, gap = 500, 340, 3
+    boxes = [(25, 20 + i * (tile_h + gap), tile_w, tile_h) for i in range(14)]
+    canvas = _draw_tiles(canvas, boxes)
+
+    full = _segment_tile_boxes(canvas, max_side=0)
+    coarse = _segment_tile_boxes(canvas, max_side=1200)
+
+    assert len(full) == len(coarse) == 14
+    tolerance = 4900 / 1200 + 1
+    for a, b in zip(full, coarse):
+        assert all(abs(p - q) <= tolerance for p, q in zip(a, b)), (a, b)
+
+
+def test_min_cost_combination_scales_to_many_blobs():
+    """Cluttered photos can produce many blobs; the search must stay
+    polynomial (3^400 combinations would never finish) and still return the
+    minimum-cost 13/14-tile combination (ties going to the earliest blobs)."""
+    per_blob_costs = [{1: 0.0, 2: 0.9, 0: 0.05} for _ in range(400)]
+    per_blob_costs[5] = {2: 0.0, 1: 0.6, 0: 0.3}
+
+    combo, cost = _min_cost_combination(per_blob_costs)
+
+    assert combo is not None and len(combo) == 400 and sum(combo) == 14
+    assert combo[:13] == [1, 1, 1, 1, 1, 2, 1, 1, 1, 1, 1, 1, 1]
+    assert all(n == 0 for n in combo[13:])
+    assert abs(cost - 387 * 0.05) < 1e-9
+
+
+def test_min_cost_combination_returns_none_when_no_valid_total():
+    assert _min_cost_combination([{1: 0.0}, {2: 0.0}]) == (None, float("inf"))
+
+
+def test_nms_suppresses_overlapping_lower_scores():
+    boxes = np.array([
+        [0, 0, 10, 10],
+        [1, 1, 11, 11],
+        [20, 0, 30, 10],
+        [21, 0, 31, 10],
+    ], dtype=np.float64)
+    scores = np.array([0.8, 0.9, 0.5, 0.4])
+    assert _nms(boxes, scores, iou_threshold=0.5) == [1, 2]
+
+
+class _FakeDetector:
+    """YOLOv8-style detector stub: (1, 320, 320, 3) input, (1, 5, anchors)
+    output with normalized cx, cy, w, h and one class score."""
+
+    def __init__(self, detections: list[tuple[float, float, float, float, float]]) -> None:
+        out = np.zeros((1, 5, 100), dtype=np.float32)
+        for i, det in enumerate(detections):
+            out[0, :, i] = det
+        self._output = out
+
+    def get_input_details(self):
+        return [{"index": 0, "shape": np.array([1, 320, 320, 3]), "dtype": np.float32}]
+
+    def get_output_details(self):
+        return [{"index": 1, "shape": np.array(self._output.shape), "dtype": np.float32}]
+
+    def set_tensor(self, index, value):
+        assert value.shape == (1, 320, 320, 3)
+
+    def invoke(self):
+        pass
+
+    def get_tensor(self, index):
+        return self._output
+
+
+def test_yolo_backend_decodes_letterboxed_detections_in_reading_order():
+    # A 640x320 (w x h) image letterboxes into 320x160 at ratio 0.5 with 80px
+    # of vertical padding; three tiles in a horizontal row, listed out of
+    # order, plus a duplicate and a below-threshold detection.
+    detections = [
+        (0.75, 0.5, 0.1, 0.2, 0.9),
+        (0.25, 0.5, 0.1, 0.2, 0.9),
+        (0.5, 0.5, 0.1, 0.2, 0.9),
+        (0.51, 0.5, 0.1, 0.2, 0.6),
+        (0.9, 0.9, 0.1, 0.1, 0.1),
+    ]
+    backend = _YoloTFLiteBackend(Path("unused.tflite"))
+    backend._pool = _InterpreterPool(lambda: _YoloInterpreter(_FakeDetector(detections)), max_size=1)
+    image = np.zeros((320, 640, 3), dtype=np.uint8)
+
+    boxes = backend.segment_boxes(image)
+
+    assert boxes == [(96, 224, 128, 192), (96, 224, 288, 352), (96, 224, 448, 512)]
+
+
+def test_segmentation_backend_lookup():
+    assert _segmentation_backend("connected_components").name == "connected_components"
+    assert _segmentation_backend("yolo_tflite").name == "yolo_tflite"
+    with pytest.raises(ValueError):
+        _segmentation_backend("nope")
+
+
+def test_unknown_segmentation_backend_is_treated_like_missing_model():
+    rgb = np.zeros((16, 16, 3), dtype=np.uint8)
+    assert tile_recognizer_local.recognize_tiles_rgb_detailed(rgb, "nope") is None
+    assert tile_recognizer_local.segmentation_backend_names() == ["connected_components", "yolo_tflite"]
+
+
+def _encoded(image: Image.Image, fmt: str, orientation: int = 1) -> bytes:
+    exif = Image.Exif()
+    exif[ExifTags.Base.Orientation] = orientation
+    buf = BytesIO()
+    image.save(buf, format=fmt, exif=exif.tobytes())
+    return buf.getvalue()
+
+
+@pytest.mark.parametrize("orientation", range(1, 9))
+def test_decode_rgb_applies_exif_orientation_like_pillow(monkeypatch, orientation):
+    monkeypatch.setattr(tile_recognizer_local.settings, "decode_target_tile_px", 0)
+    rng = np.random.default_rng(orientation)
+    image = Image.fromarray(rng.integers(0, 256, size=(6, 9, 3), dtype=np.uint8))
+    data = _encoded(image, "PNG", orientation)
+
+    expected = np.array(ImageOps.exif_transpose(Image.open(BytesIO(data))).convert("RGB"))
+    np.testing.assert_array_equal(decode_rgb(data), expected)
+
+
+def test_decode_rgb_reduces_large_jpegs_to_target_tile_height(monkeypatch):
+    image = Image.new("RGB", (2800, 2100), (200, 200, 200))
+    data = _encoded(image, "JPEG", orientation=6)
+
+    # Estimated tile height at full size: 2800 * 0.8 / 14 * 4/3 = 213 px.
+    assert _decode_reduction(2800, 2100, 100) == 2
+    assert _decode_reduction(2800, 2100, 250) == 1
+    assert _decode_reduction(2800, 2100, 0) == 1
+
+    monkeypatch.setattr(tile_recognizer_local.settings, "decode_target_tile_px", 100)
+    assert decode_rgb(data).shape == (1400, 1050, 3)  # halved, then rotated
+
+    monkeypatch.setattr(tile_recognizer_local.settings, "decode_target_tile_px", 0)
+    assert decode_rgb(data).shape == (2800, 2100, 3)
+
+
+def test_decode_rgb_converts_palette_images_before_reducing(monkeypatch):
+    image = Image.new("RGB", (2800, 2100), (200, 30, 30)).convert("P", palette=Image.Palette.ADAPTIVE)
+    buf = BytesIO()
+    image.save(buf, format="PNG")
+
+    monkeypatch.setattr(tile_recognizer_local.settings, "decode_target_tile_px", 100)
+    rgb = decode_rgb(buf.getvalue())
+
+    assert rgb.shape == (1050, 1400, 3)
+    assert tuple(rgb[0, 0]) == (200, 30, 30)
+
+
+def test_classify_tiles_top_k_respects_k_and_cumulative_cutoff(monkeypatch):
+    labels = ["dots-1", "dots-2", "dots-3", "dots-4", "dots-5"]
+    fake = FakeInterpreter(num_classes=len(labels))
+    pool = _InterpreterPool(lambda: _PooledInterpreter(fake), max_size=1)
+    monkeypatch.setattr(tile_recognizer_local, "_model", _LoadedModel("test", labels, pool))
+    tiles = [np.full((50, 30, 3), 200, dtype=np.uint8) for _ in range(2)]
+
+    wide = _classify_tiles_top_k(tiles, top_k=3, cumulative=0.95)
+    assert [len(c) for c in wide] == [3, 3]
+    assert wide[1][0][0] == "dots-2"
+    assert wide[1][0][1] == pytest.approx(0.9)
+    assert all(abs(conf - 0.01) < 1e-6 for _label, conf in wide[1][1:])
+
+    # 0.9 already reaches the cutoff, so the tail is dropped.
+    assert [len(c) for c in _classify_tiles_top_k(tiles, top_k=3, cumulative=0.9)] == [1, 1]
+
+
+_WINNING_LABELS = [
+    "characters-1", "characters-2", "characters-3", "dots-4", "dots-5", "dots-6",
+    "bamboo-7", "bamboo-8", "bamboo-9", "honors-east", "honors-east", "honors-east", "dots-2", "dots-2",
+]
+
+
+def test_gate_local_result_accepts_low_confidence_when_candidates_win():
+    predictions = [[(label, 0.45)] for label in _WINNING_LABELS]
+    predictions[-1] = [("dots-3", 0.45), ("dots-2", 0.40)]
+
+    slots, _kept, warnings = _local_slots(predictions)
+    result = _gate_local_result(slots, warnings)
+
+    assert result is not None
+    assert [c["tile"] for c in result["slots"][-1]["candidates"]] == ["3p", "2p"]
+    assert any("winning hand" in warning for warning in result["warnings"])
+
+
+def test_gate_local_result_rejects_low_confidence_without_winning_candidates():
+    predictions = [[(label, 0.45)] for label in _WINNING_LABELS]
+    predictions[-1] = [("dots-3", 0.45), ("dots-9", 0.40)]
+
+    slots, _kept, warnings = _local_slots(predictions)
+    assert _gate_local_result(slots, warnings) is None
+
+
+def _fake_segmentation(monkeypatch, tile_count: int) -> None:
+    boxes = [(100, 160, 40 + col * 50, 85 + col * 50) for col in range(tile_count)]
+    monkeypatch.setattr(tile_recognizer_local, "_load_model", lambda: None)
+    monkeypatch.setattr(
+        tile_recognizer_local, "_segment_tile_images",
+        lambda rgb, _backend: (boxes, tile_recognizer_local._crop_boxes(rgb, boxes)),
+    )
+    monkeypatch.setattr(
+        tile_recognizer_local, "_classify_tiles_top_k",
+        lambda tiles, top_k, cumulative: [[("dots-1", 0.3), ("dots-2", 0.2)] for _ in tiles],
+    )
+
+
+def test_hand_box_is_only_reported_for_a_full_hand(monkeypatch):
+    rgb = np.zeros((480, 800, 3), dtype=np.uint8)
+
+    _fake_segmentation(monkeypatch, 14)
+    full = tile_recognizer_local.recognize_tiles_rgb_detailed(rgb)
+    assert full is not None and full.hand_box is not None
+
+    # A box around 5 of 14 tiles would crop the rest out of the remote image.
+    _fake_segmentation(monkeypatch, 5)
+    assert tile_recognizer_local.recognize_tiles_rgb_detailed(rgb) is None
+
+
+def test_warm_creates_and_prepares_every_pooled_interpreter():
+    fakes: list[FakeInterpreter] = []
+
+    def factory():
+        fakes.append(FakeInterpreter(num_classes=3))
+        return _PooledInterpreter(fakes[-1])
+
+    pool = _InterpreterPool(factory, max_size=3)
+    pool.warm(tile_recognizer_local._warm_interpreter)
+
+    assert pool.stats()["created"] == pool.stats()["idle"] == 3
+    assert all(f.invoke_count == 1 and f.input_shape[0] == 14 for f in fakes)
+    with pool.checkout(), pool.checkout(), pool.checkout():
+        pass
+    assert len(fakes) == 3, "checkouts reuse the warmed interpreters"
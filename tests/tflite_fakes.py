@@ -0,0 +1,52 @@
+import numpy as np
+
+
+class FakeInterpreter:
+    """Minimal stand-in for a TFLite interpreter with a (batch, 224, 224, 3)
+    float input and a (batch, num_classes) softmax output; the predicted
+    class of each batch row is the row's index modulo num_classes."""
+
+    def __init__(self, num_classes: int, quantized: bool = False) -> None:
+        self.num_classes = num_classes
+        self.quantized = quantized
+        self.input_dtype = np.uint8 if quantized else np.float32
+        self.input_shape = [1, 224, 224, 3]
+        self.invoke_count = 0
+        self.details_calls = 0
+        self.resize_calls: list[list[int]] = []
+        self.input = np.zeros(self.input_shape, dtype=self.input_dtype)
+
+    def get_input_details(self):
+        self.details_calls += 1
+        quantization = (1 / 128, 128) if self.quantized else (0.0, 0)
+        return [{"index": 0, "shape": np.array(self.input_shape), "dtype": self.input_dtype, "quantization": quantization}]
+
+    def get_output_details(self):
+        self.details_calls += 1
+        dtype = np.uint8 if self.quantized else np.float32
+        quantization = (1 / 256, 0) if self.quantized else (0.0, 0)
+        shape = np.array([self.input_shape[0], self.num_classes])
+        return [{"index": 1, "shape": shape, "dtype": dtype, "quantization": quantization}]
+
+    def resize_tensor_input(self, index, shape):
+        self.resize_calls.append(list(shape))
+        self.input_shape = list(shape)
+
+    def allocate_tensors(self):
+        self.input = np.zeros(self.input_shape, dtype=self.input_dtype)
+
+    def tensor(self, index):
+        assert index == 0
+        return lambda: self.input
+
+    def invoke(self):
+        self.invoke_count += 1
+
+    def get_tensor(self, index):
+        n = self.input_shape[0]
+        out = np.full((n, self.num_classes), 0.01, dtype=np.float32)
+        for i in range(n):
+            out[i, i % self.num_classes] = 0.9
+        if self.quantized:
+            return np.round(out * 256).astype(np.uint8)
+        return out